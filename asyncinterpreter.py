@@ -0,0 +1,121 @@
+"""
+Interpreter variant for asyncio, so that many Brewin sessions can share one
+event loop. inputi/inputs await an async input source and printed lines go
+to an async output sink, instead of blocking on stdin and stdout.
+
+Only the bytecode engine can suspend a program: the virtual machine runs
+as a generator (see VirtualMachine.execute) that pauses every
+yield_interval steps, a step being a run of a while loop body or a call. At a
+pause run_async flushes the printed lines and yields to the event loop, so
+a session that computes for a long time only delays the others by one
+interval, and sessions that are ready take turns in order. Runs are
+always metered (see meter.py), with the step and time budgets of
+Interpreter checked at every pause.
+"""
+
+import asyncio
+
+from interpreterv1 import Interpreter
+from meter import Meter
+from vm import PAUSE, VirtualMachine
+
+DEFAULT_YIELD_INTERVAL = 1000
+
+
+class AsyncInterpreter(Interpreter):
+    def __init__(
+        self,
+        read_input=None,
+        write_output=None,
+        yield_interval=DEFAULT_YIELD_INTERVAL,
+        console_output=False,
+        **options,
+    ):
+        """
+        read_input is an async function returning the next input value, or
+        None once there is no more input, or an async iterator of values;
+        without it input comes from inp as for Interpreter. write_output is
+        an async function awaited with every printed line; without it lines
+        go where Interpreter would print them.
+        """
+        engine = options.setdefault("engine", self.BYTECODE_ENGINE)
+        if engine != self.BYTECODE_ENGINE:
+            raise ValueError("AsyncInterpreter needs the bytecode engine")
+        if yield_interval < 1:
+            raise ValueError("yield_interval must be at least 1")
+        options["meter"] = True
+        super().__init__(console_output, **options)
+        self.read_input = read_input
+        self.write_output = write_output
+        self.yield_interval = yield_interval
+        self.pending_output = []  # printed, not yet written by write_output
+
+    def reset(self):
+        super().reset()
+        self.pending_output = []
+
+    def output(self, val):
+        if self.write_output is None:
+            super().output(val)
+            return
+        self.pending_output.append(val)
+        self.output_log.append(val)
+
+    async def run_async(self, program):
+        """Same as run, yielding to the event loop while the program runs."""
+        try:
+            if self.load_program(program):
+                await self.run_main_async()
+        finally:
+            await self.flush_output()
+            if self.output_sink is not None:
+                self.output_sink.close()
+
+    def start_meter(self):
+        # the countdown of the meter is what makes the program pause
+        self.meter = Meter(self.max_steps, self.time_limit, self.yield_interval)
+
+    async def run_main_async(self):
+        self.start_meter()
+        vm = VirtualMachine(self, self.max_call_depth)
+        try:
+            main_class = self.classes[self.MAIN_CLASS_DEF]
+            main_obj = main_class.instantiate_object()
+            execution = vm.start(main_obj, self.MAIN_FUNC_DEF, [])
+            try:
+                await self.drive(execution)
+            finally:
+                vm.close(execution)
+        finally:
+            self.meter.stop()
+
+    async def drive(self, execution):
+        answer = None
+        while True:
+            try:
+                request = execution.send(answer)
+            except StopIteration:
+                return
+            if request is PAUSE:
+                answer = self.meter.check()
+                await self.flush_output()
+                await asyncio.sleep(0)
+            else:
+                # READ_INPUT, after showing what the program printed so far
+                await self.flush_output()
+                answer = await self.next_input()
+
+    async def next_input(self):
+        if self.read_input is None:
+            return self.get_input()
+        if hasattr(self.read_input, "__anext__"):
+            try:
+                return await self.read_input.__anext__()
+            except StopAsyncIteration:
+                return None
+        return await self.read_input()
+
+    async def flush_output(self):
+        lines, self.pending_output = self.pending_output, []
+        for line in lines:
+            await self.write_output(line)
@@ -0,0 +1,187 @@
+"""
+Runs many Brewin test cases in parallel on a process pool.
+
+Every case runs in a fresh Interpreter inside a worker process, and results
+come back in completion order with their run time. A runaway case is stopped
+by a timer signal inside its worker, so one slow program does not hold up the
+rest of the batch.
+
+Usage: python batchrunner.py cases.json [-j WORKERS] [--timeout SECONDS]
+                             [--engine tree|bytecode|python] [--json]
+
+cases.json holds a list of objects with a "program" (a string or a list of
+lines) and optionally a "name", "inputs", "expected_output" and
+"expected_error" (an ErrorType name such as "NAME_ERROR").
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+from intbase import ErrorType
+from interpreterv1 import Interpreter
+
+
+class CaseTimeout(BaseException):
+    # not an Exception, so that no handler inside the interpreter can swallow it
+    pass
+
+
+class BatchCase:
+    def __init__(
+        self, name, program, inputs=None, expected_output=None, expected_error=None
+    ):
+        self.name = name
+        if isinstance(program, str):
+            program = program.split("\n")
+        self.program = program
+        self.inputs = inputs
+        self.expected_output = expected_output
+        self.expected_error = expected_error  # an ErrorType, or None for no error
+
+    @staticmethod
+    def from_dict(index, case):
+        expected_error = case.get("expected_error")
+        if expected_error is not None:
+            expected_error = ErrorType[expected_error]
+        return BatchCase(
+            case.get("name", f"case {index}"),
+            case["program"],
+            case.get("inputs"),
+            case.get("expected_output"),
+            expected_error,
+        )
+
+
+class CaseResult:
+    def __init__(self, case, output, error_type, error_line, exception, elapsed):
+        self.name = case.name
+        self.output = output
+        self.error_type = error_type
+        self.error_line = error_line
+        self.exception = exception  # text of an exception other than a Brewin error
+        self.elapsed = elapsed
+        self.timed_out = isinstance(exception, str) and exception.startswith(
+            CaseTimeout.__name__
+        )
+        self.passed = self.check(case)
+
+    def check(self, case):
+        if self.timed_out:
+            return False
+        if case.expected_output is not None and self.output != case.expected_output:
+            return False
+        if self.error_type != case.expected_error:
+            return False
+        return self.error_type is not None or self.exception is None
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "passed": self.passed,
+            "output": self.output,
+            "error_type": self.error_type.name if self.error_type else None,
+            "error_line": self.error_line,
+            "exception": self.exception,
+            "timed_out": self.timed_out,
+            "elapsed": self.elapsed,
+        }
+
+
+def raise_timeout(signum, frame):
+    raise CaseTimeout("case ran past its time limit")
+
+
+def run_case(case, engine, timeout):
+    interpreter = Interpreter(console_output=False, inp=case.inputs, engine=engine)
+    return run_timed(case, interpreter, partial(interpreter.run, case.program), timeout)
+
+
+def run_timed(case, interpreter, run, timeout):
+    """Calls run() under the time limit and returns the CaseResult of case."""
+    exception = None
+    use_timer = timeout is not None and hasattr(signal, "setitimer")
+    if use_timer:
+        signal.signal(signal.SIGALRM, raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        run()
+    except CaseTimeout as timeout_error:
+        exception = f"{CaseTimeout.__name__}: {timeout_error}"
+    except RecursionError:
+        exception = "RecursionError: maximum recursion depth exceeded"
+    except Exception as error:
+        if interpreter.get_error_type_and_line()[0] is None:
+            exception = f"{type(error).__name__}: {error}"
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    elapsed = time.perf_counter() - start
+
+    error_type, error_line = interpreter.get_error_type_and_line()
+    return CaseResult(
+        case, interpreter.get_output(), error_type, error_line, exception, elapsed
+    )
+
+
+class BatchRunner:
+    def __init__(self, workers=None, timeout=None, engine=Interpreter.TREE_ENGINE):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.engine = engine
+
+    def run(self, cases):
+        """Yields a CaseResult for every case, in completion order."""
+        # one task per case, so each result comes back as soon as its case ends
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(run_case, case, self.engine, self.timeout) for case in cases
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def load_cases(path):
+    with open(path) as case_file:
+        return [BatchCase.from_dict(index, case) for index, case in enumerate(json.load(case_file))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Brewin test cases in parallel.")
+    parser.add_argument("cases", help="JSON file with a list of cases")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per case")
+    parser.add_argument("--engine", choices=Interpreter.ENGINES, default=Interpreter.TREE_ENGINE)
+    parser.add_argument("--json", action="store_true", help="print one JSON result per line")
+    args = parser.parse_args(argv)
+
+    runner = BatchRunner(args.workers, args.timeout, args.engine)
+    cases = load_cases(args.cases)
+    failed = 0
+    start = time.perf_counter()
+    for result in runner.run(cases):
+        if not result.passed:
+            failed += 1
+        if args.json:
+            print(json.dumps(result.to_dict()), flush=True)
+            continue
+        status = "PASS" if result.passed else "TIMEOUT" if result.timed_out else "FAIL"
+        print(f"{status} {result.name} ({result.elapsed * 1000:.1f} ms)", flush=True)
+
+    elapsed = time.perf_counter() - start
+    if not args.json:
+        print(
+            f"{len(cases) - failed}/{len(cases)} passed in {elapsed:.2f}s "
+            f"on {runner.workers} workers"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
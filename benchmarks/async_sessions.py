@@ -0,0 +1,93 @@
+"""
+Runs many Brewin sessions on one asyncio event loop with AsyncInterpreter.
+Every session reads numbers from a queue and prints their squares after a
+busy loop, and a short session is started last. Reports the total time
+against running the same sessions one after another with Interpreter, and
+how long the short session waited behind the others.
+
+Usage: python benchmarks/async_sessions.py [sessions] [yield_interval]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asyncinterpreter import AsyncInterpreter
+from interpreterv1 import Interpreter
+
+PROGRAM = """
+(class main
+  (field n 0)
+  (field i 0)
+  (method main ()
+    (while true
+      (begin
+        (inputi n)
+        (if (== n 0) (return))
+        (set i 0)
+        (while (< i 200) (set i (+ i 1)))
+        (print (* n n))
+      )
+    )
+  )
+)
+""".split("\n")
+
+SHORT_PROGRAM = ['(class main (method main () (print "short")))']
+
+INPUTS = ["1", "2", "3", "4", "5", "0"]
+
+
+async def run_session(program, yield_interval):
+    inputs = asyncio.Queue()
+    for value in INPUTS:
+        inputs.put_nowait(value)
+    output = []
+
+    async def write_output(line):
+        output.append(line)
+
+    interpreter = AsyncInterpreter(inputs.get, write_output, yield_interval)
+    await interpreter.run_async(program)
+    return output
+
+
+async def run_sessions(session_count, yield_interval):
+    start = time.perf_counter()
+
+    async def run_short():
+        await run_session(SHORT_PROGRAM, yield_interval)
+        return time.perf_counter() - start
+
+    sessions = [run_session(PROGRAM, yield_interval) for _ in range(session_count)]
+    results = await asyncio.gather(*sessions, run_short())
+    expected = [str(int(value) ** 2) for value in INPUTS[:-1]]
+    if any(output != expected for output in results[:-1]):
+        raise AssertionError("a session printed the wrong output")
+    return results[-1]
+
+
+def main():
+    session_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    yield_interval = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    start = time.perf_counter()
+    for _ in range(session_count):
+        Interpreter(console_output=False, inp=INPUTS, engine="bytecode").run(PROGRAM)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    short_wait = asyncio.run(run_sessions(session_count, yield_interval))
+    concurrent = time.perf_counter() - start
+
+    print(f"{session_count} sessions, yield_interval {yield_interval}")
+    print(f"  one after another  {sequential * 1000:9.1f} ms")
+    print(f"  on one event loop  {concurrent * 1000:9.1f} ms")
+    print(f"  short session done after {short_wait * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
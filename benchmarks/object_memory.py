@@ -0,0 +1,55 @@
+"""
+Measures the cost of (new X) for a class with several methods and fields:
+time per instantiation and retained memory per object.
+
+Usage: python benchmarks/object_memory.py [object_count]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bparser import BParser
+from interpreterv1 import Interpreter
+
+PROGRAM = """
+(class point
+  (field x 0)
+  (field y 0)
+  (field label "p")
+  (field visible true)
+  (method get_x () (return x))
+  (method get_y () (return y))
+  (method set_xy (a b) (begin (set x a) (set y b)))
+  (method norm1 () (return (+ (* x x) (* y y))))
+  (method describe () (print label " " x " " y))
+  (method step (n) (while (> n 0) (begin (set x (+ x 1)) (set n (- n 1)))))
+)
+(class main (method main () (print "unused")))
+"""
+
+
+def main(object_count=20000):
+    interpreter = Interpreter(console_output=False)
+    _, parsed_program = BParser.parse(PROGRAM.split("\n"))
+    interpreter.add_classes(parsed_program)
+    point_class = interpreter.get_classes()["point"]
+
+    tracemalloc.start()
+    start_memory, _ = tracemalloc.get_traced_memory()
+    start_time = time.perf_counter()
+    objects = [point_class.instantiate_object() for _ in range(object_count)]
+    elapsed = time.perf_counter() - start_time
+    end_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"objects:            {len(objects)}")
+    print(f"time per object:    {elapsed / object_count * 1e6:.2f} us")
+    print(f"memory per object:  {(end_memory - start_memory) / object_count:.0f} bytes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
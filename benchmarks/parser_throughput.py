@@ -0,0 +1,89 @@
+"""
+Compares FastParser.parse against BParser.parse: first checks that both return
+identical results (tokens, line numbers and error strings) on a set of
+programs, then reports parsing throughput in MB/s on a large generated source.
+
+Usage: python benchmarks/parser_throughput.py [class_count]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bparser import BParser
+from fastparser import FastParser
+
+CLASS_TEMPLATE = """
+# generated class {index}
+(class worker{index}
+  (field count 0)
+  (field name "worker {index} (with parens) # and a hash")
+  (method run (n)  # trailing comment
+    (begin
+      (while (< count n) (begin (set count (+ count 1)) (print name " " count)))
+      (if (== count {index}) (return true) (return false))
+    )
+  )
+)
+"""
+
+PARITY_CASES = [
+    ['(class main (method main () (print "hi")))'],
+    ['(a b', 'c) d e)'],
+    ['(a "unclosed'],
+    ['(a b))'],
+    ['(a', '(b'],
+    ['x"y"z "a#b" # c', '(  )', '', '\t(q\r)\n'],
+    ['"# not a comment" # comment "quoted"', '(f "a""b")'],
+    ['(bad ") (still string"', ')'],
+]
+
+
+def generate_source(class_count):
+    lines = []
+    for index in range(class_count):
+        lines.extend(CLASS_TEMPLATE.format(index=index).split("\n"))
+    lines.extend('(class main (method main () (print "done")))'.split("\n"))
+    return lines
+
+
+def line_numbers(tokens):
+    if isinstance(tokens, list):
+        return [line_numbers(token) for token in tokens]
+    return tokens.line_num
+
+
+def check_parity(cases):
+    for lines in cases:
+        expected = BParser.parse(lines)
+        actual = FastParser.parse(lines)
+        if expected != actual or (
+            expected[0] and line_numbers(expected[1]) != line_numbers(actual[1])
+        ):
+            raise AssertionError(f"FastParser differs from BParser on {lines!r}")
+
+
+def throughput(parse, lines, size, repeat=5):
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        parse(lines)
+        elapsed = min(elapsed, time.perf_counter() - start_time)
+    return size / elapsed / 1e6, elapsed
+
+
+def main(class_count=2000):
+    lines = generate_source(class_count)
+    size = sum(len(line) + 1 for line in lines)
+    check_parity(PARITY_CASES + [lines])
+    print(f"parity:      ok ({len(PARITY_CASES) + 1} sources)")
+    print(f"source size: {size / 1e6:.2f} MB")
+    for name, parse in (("BParser", BParser.parse), ("FastParser", FastParser.parse)):
+        mb_per_second, elapsed = throughput(parse, lines, size)
+        print(f"{name:11s}  {mb_per_second:7.2f} MB/s  (best of 5: {elapsed:.3f}s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,52 @@
+"""
+Measures how the time to build a string with (set s (+ s "abcde")) in a loop
+grows with the number of appends. With ropes (rope.py) the time per append
+stays flat; with plain str concatenation it grows with the string's length.
+
+Usage: python benchmarks/string_building.py [engine]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreterv1 import Interpreter
+
+PROGRAM = """
+(class main
+  (field i 0)
+  (field text "")
+  (method main ()
+    (begin
+      (while (< i {appends})
+        (begin
+          (set text (+ text "abcde"))
+          (set i (+ i 1))
+        )
+      )
+      (print (== text ""))
+    )
+  )
+)
+"""
+
+APPEND_COUNTS = (10000, 20000, 40000, 80000)
+
+
+def main(engine=Interpreter.TREE_ENGINE):
+    for appends in APPEND_COUNTS:
+        program = PROGRAM.format(appends=appends).split("\n")
+        interpreter = Interpreter(console_output=False, engine=engine)
+        start_time = time.perf_counter()
+        interpreter.run(program)
+        elapsed = time.perf_counter() - start_time
+        print(
+            f"{appends:6d} appends  {elapsed * 1000:9.1f} ms"
+            f"  {elapsed / appends * 1e6:6.2f} us per append"
+        )
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
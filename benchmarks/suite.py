@@ -0,0 +1,183 @@
+"""
+Runs the standard Brewin workloads in benchmarks/workloads and reports wall
+time, statements per second and peak memory for each of them, plus a parsing
+workload on a large generated source.
+
+Results can be saved as JSON and compared against an earlier run; any
+workload that got slower than the threshold counts as a regression.
+
+Usage: python benchmarks/suite.py [--engine tree|bytecode|python] [--optimize] [--repeat N]
+                                  [--save results.json] [--baseline base.json]
+                                  [--threshold 0.10] [workload ...]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from bparser import BParser
+from interpreterv1 import Interpreter
+from object import ObjectDefinition
+from parser_throughput import generate_source
+
+WORKLOAD_DIR = os.path.join(BENCHMARK_DIR, "workloads")
+PARSE_WORKLOAD = "parse"
+PARSE_CLASS_COUNT = 500
+
+
+def load_workload(name):
+    with open(os.path.join(WORKLOAD_DIR, name + ".brewin")) as workload_file:
+        return workload_file.read().split("\n")
+
+
+def get_workload_names():
+    names = sorted(
+        file_name[: -len(".brewin")]
+        for file_name in os.listdir(WORKLOAD_DIR)
+        if file_name.endswith(".brewin")
+    )
+    return names + [PARSE_WORKLOAD]
+
+
+def run_program(program, engine, optimize=False):
+    interpreter = Interpreter(console_output=False, engine=engine, optimize=optimize)
+    interpreter.run(program)
+    return interpreter
+
+
+def count_statements(program):
+    # every executed statement goes through STATEMENT_HANDLERS, so counting
+    # there once on the tree engine gives the work done by any engine
+    counter = [0]
+    original_handlers = ObjectDefinition.STATEMENT_HANDLERS
+
+    def counting(handler):
+        def count_and_run(obj, statement, parameter_values):
+            counter[0] += 1
+            return handler(obj, statement, parameter_values)
+
+        return count_and_run
+
+    ObjectDefinition.STATEMENT_HANDLERS = {
+        kind: counting(handler) for kind, handler in original_handlers.items()
+    }
+    try:
+        run_program(program, Interpreter.TREE_ENGINE)
+    finally:
+        ObjectDefinition.STATEMENT_HANDLERS = original_handlers
+    return counter[0]
+
+
+def measure(run, repeat):
+    wall_time = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        run()
+        wall_time = min(wall_time, time.perf_counter() - start_time)
+
+    # tracing slows everything down, so memory gets a run of its own
+    tracemalloc.start()
+    run()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return wall_time, peak_memory
+
+
+def run_workload(name, engine, repeat, optimize=False):
+    if name == PARSE_WORKLOAD:
+        lines = generate_source(PARSE_CLASS_COUNT)
+        wall_time, peak_memory = measure(lambda: BParser.parse(lines), repeat)
+        work, unit = len(lines), "lines"
+    else:
+        program = load_workload(name)
+        wall_time, peak_memory = measure(
+            lambda: run_program(program, engine, optimize), repeat
+        )
+        work, unit = count_statements(program), "statements"
+    return {
+        "wall_time": wall_time,
+        "work": work,
+        "unit": unit,
+        "rate": work / wall_time,
+        "peak_memory": peak_memory,
+    }
+
+
+def run_suite(names, engine, repeat, optimize=False):
+    results = {}
+    for name in names:
+        results[name] = run_workload(name, engine, repeat, optimize)
+        print_result(name, results[name])
+    return {
+        "engine": engine,
+        "optimize": optimize,
+        "python": platform.python_version(),
+        "timestamp": time.time(),
+        "workloads": results,
+    }
+
+
+def print_result(name, result):
+    print(
+        f"{name:8s} {result['wall_time'] * 1000:9.1f} ms"
+        f"  {result['rate']:12,.0f} {result['unit']}/s"
+        f"  {result['peak_memory'] / 1024:9.0f} KiB peak"
+    )
+
+
+def compare(results, baseline, threshold):
+    """Prints the change against baseline and returns the regressed workloads."""
+    regressions = []
+    print(f"\ncompared with baseline ({baseline['engine']} engine):")
+    for name, result in results["workloads"].items():
+        if name not in baseline["workloads"]:
+            print(f"{name:8s}  not in baseline")
+            continue
+        base = baseline["workloads"][name]
+        time_ratio = result["wall_time"] / base["wall_time"]
+        memory_ratio = result["peak_memory"] / max(base["peak_memory"], 1)
+        status = ""
+        if time_ratio > 1 + threshold:
+            status = "  REGRESSION"
+            regressions.append(name)
+        print(
+            f"{name:8s} time x{time_ratio:5.2f}  memory x{memory_ratio:5.2f}{status}"
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Brewin benchmark suite.")
+    parser.add_argument("workloads", nargs="*", help="default: all workloads")
+    parser.add_argument("--engine", choices=Interpreter.ENGINES, default=Interpreter.TREE_ENGINE)
+    parser.add_argument("--optimize", action="store_true", help="run the optimizer")
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown")
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        args.workloads or get_workload_names(), args.engine, args.repeat, args.optimize
+    )
+    if args.save:
+        with open(args.save, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
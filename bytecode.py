@@ -0,0 +1,257 @@
+"""
+Compiler that turns the lowered body of a MethodDefinition (see nodes.py) into
+a flat list of instructions for the VirtualMachine in vm.py.
+
+Every instruction is an (opcode, argument) tuple. The generated code keeps the
+exact semantics of the tree-walking ObjectDefinition, including how the result
+of a nested statement ends the enclosing method.
+"""
+
+from object import ObjectDefinition
+from operations import to_print_string
+import nodes
+
+# opcodes, roughly ordered by how often they run
+LOAD_PARAMETER = 0
+LOAD_FIELD = 1
+LOAD_CONST = 2
+STORE_PARAMETER = 3
+STORE_FIELD = 4
+BINARY = 5
+JUMP = 6
+JUMP_IF_FALSE = 7
+CALL = 8
+RETURN = 9
+JUMP_IF_NOT_NONE = 10
+CHECK_VALUE = 11
+NOT = 12
+NEW = 13
+PRINT = 14
+TO_STRING = 15
+TO_PRINT_STRING = 16
+BUILD_STRING = 17
+INPUT = 18
+CHECK_IF_CONDITION = 19
+CHECK_WHILE_CONDITION = 20
+POP = 21
+SYNTAX_ERROR = 22
+INVALID_EXPRESSION = 23
+INPUT_INT = 24
+TAIL_CALL = 25
+LOOP_IF_TRUE = 26  # back-edges of while loops, where the VM may pause
+LOAD_CACHED = 27
+STORE_CACHED = 28
+CLEAR_CACHED = 29
+NAME_ERROR = 30
+LOOP = 31
+
+OPCODE_NAMES = {
+    value: name
+    for name, value in list(globals().items())
+    if name.isupper() and isinstance(value, int)
+}
+
+
+class CodeObject:
+    def __init__(self, name, parameters, instructions):
+        self.name = name
+        self.parameters = parameters
+        self.instructions = instructions
+
+    def disassemble(self):
+        lines = []
+        for index, (opcode, argument) in enumerate(self.instructions):
+            line = f"{index:4d} {OPCODE_NAMES[opcode]}"
+            if opcode == BINARY:
+                argument = argument.operator
+            elif opcode == NEW:
+                argument = argument.class_name
+            if argument is not None:
+                line += f" {argument!r}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+class Compiler:
+    def __init__(self):
+        self.instructions = []
+
+    def compile_method(self, method):
+        self.instructions = []
+        exits = []
+        self.compile_statement(method.get_body(), exits)
+        self.emit(LOAD_CONST, None)
+        for index in exits:
+            self.patch(index, len(self.instructions))
+        self.emit(RETURN)
+        return CodeObject(method.get_name(), method.get_parameters(), self.instructions)
+
+    def emit(self, opcode, argument=None):
+        self.instructions.append((opcode, argument))
+        return len(self.instructions) - 1
+
+    def patch(self, index, target):
+        opcode, _ = self.instructions[index]
+        self.instructions[index] = (opcode, target)
+
+    def emit_statement_result(self, exits):
+        # A statement that produces a value ends the enclosing method, or the
+        # enclosing statement when it is being evaluated as an expression.
+        exits.append(self.emit(JUMP_IF_NOT_NONE))
+
+    def compile_statement(self, statement, exits):
+        kind = statement.kind
+
+        if kind == nodes.PRINT:
+            self.compile_expression(statement.value)
+            self.emit(PRINT)
+        elif kind == nodes.SET:
+            self.compile_expression(statement.value)
+            if statement.scope == nodes.SCOPE_PARAMETER:
+                self.emit(STORE_PARAMETER, statement.index)
+            elif statement.scope == nodes.SCOPE_FIELD:
+                self.emit(STORE_FIELD, statement.index)
+            else:
+                self.emit(NAME_ERROR)
+        elif kind == nodes.WHILE:
+            self.compile_while(statement, exits)
+        elif kind == nodes.INPUT:
+            self.emit(
+                INPUT_INT if statement.is_int else INPUT,
+                (statement.scope, statement.index),
+            )
+        elif kind == nodes.RETURN:
+            if statement.value is None:
+                self.emit(LOAD_CONST, ObjectDefinition.NO_RETURN_VALUE)
+            elif statement.value.kind == nodes.TAIL_CALL:
+                self.compile_tail_call(statement.value)
+                return  # never falls through
+            else:
+                self.compile_expression(statement.value)
+            self.emit_statement_result(exits)
+        elif kind == nodes.CALL:
+            self.compile_call(statement)
+            self.emit_statement_result(exits)
+        elif kind == nodes.TAIL_CALL:
+            self.compile_tail_call(statement)
+        elif kind == nodes.IF:
+            self.compile_if(statement, exits)
+        elif kind == nodes.BEGIN:
+            for nested_statement in statement.statements:
+                self.compile_statement(nested_statement, exits)
+        elif kind == nodes.SYNTAX_ERROR:
+            self.emit(SYNTAX_ERROR)
+        elif kind == nodes.INVALID:
+            self.emit(INVALID_EXPRESSION, statement.expression)
+
+    def compile_while(self, statement, exits):
+        if statement.cache_slots:
+            self.emit(CLEAR_CACHED, statement.cache_slots)
+        self.compile_expression(statement.condition)
+        self.emit(CHECK_WHILE_CONDITION)
+        if statement.single_condition:
+            exit_jump = self.emit(JUMP_IF_FALSE)
+            loop_start = len(self.instructions)
+            self.compile_statement(statement.body, exits)
+            self.compile_expression(statement.condition)
+            self.emit(LOOP_IF_TRUE, loop_start)
+            self.patch(exit_jump, len(self.instructions))
+            return
+
+        self.emit(POP)
+        loop_start = len(self.instructions)
+        self.compile_expression(statement.condition)
+        exit_jump = self.emit(JUMP_IF_FALSE)
+        self.compile_statement(statement.body, exits)
+        self.emit(LOOP, loop_start)
+        self.patch(exit_jump, len(self.instructions))
+
+    def compile_if(self, statement, exits):
+        self.compile_expression(statement.condition)
+        self.emit(CHECK_IF_CONDITION)
+        else_jump = self.emit(JUMP_IF_FALSE)
+        self.compile_statement(statement.then_statement, exits)
+        if statement.else_statement is not None:
+            end_jump = self.emit(JUMP)
+            self.patch(else_jump, len(self.instructions))
+            self.compile_statement(statement.else_statement, exits)
+            self.patch(end_jump, len(self.instructions))
+        else:
+            self.patch(else_jump, len(self.instructions))
+
+    def compile_tail_call(self, statement):
+        self.compile_call(statement, TAIL_CALL)
+        # only reached when the callee is memoized and ran as a plain call
+        self.emit(RETURN)
+
+    def compile_call(self, statement, opcode=CALL):
+        if statement.target_kind == nodes.CALL_EXPRESSION:
+            self.compile_expression(statement.target)
+        for arg in statement.args:
+            self.compile_expression(arg)
+        # the node itself carries the inline cache of the call site
+        argument = (
+            statement.target_kind,
+            statement.target,
+            statement.target_scope,
+            statement.target_index,
+            len(statement.args),
+            statement,
+        )
+        if opcode == TAIL_CALL:
+            # the expression is checked for a value at the end of the frame
+            argument += (statement.expression if statement.check_result else None,)
+        self.emit(opcode, argument)
+
+    def compile_expression(self, expression):
+        kind = expression.kind
+
+        if kind == nodes.CONST:
+            self.emit(LOAD_CONST, expression.value)
+        elif kind == nodes.NAME:
+            if expression.scope == nodes.SCOPE_PARAMETER:
+                self.emit(LOAD_PARAMETER, expression.index)
+            elif expression.scope == nodes.SCOPE_FIELD:
+                self.emit(LOAD_FIELD, expression.index)
+            else:
+                self.emit(NAME_ERROR)
+        elif kind == nodes.BINARY:
+            self.compile_expression(expression.left)
+            self.compile_expression(expression.right)
+            self.emit(BINARY, expression)  # the node keeps the quickening state
+        elif kind == nodes.CALL:
+            self.compile_call(expression)
+            self.emit(CHECK_VALUE, expression.expression)
+        elif kind == nodes.NOT:
+            self.compile_expression(expression.operand)
+            self.emit(NOT)
+        elif kind == nodes.NEW:
+            self.emit(NEW, expression)  # bound to its class by checker.py
+        elif kind == nodes.STATEMENT:
+            # a statement used as an expression evaluates to its result
+            exits = []
+            self.compile_statement(expression.statement, exits)
+            self.emit(LOAD_CONST, None)
+            for index in exits:
+                self.patch(index, len(self.instructions))
+            self.emit(CHECK_VALUE, expression.expression)
+        elif kind == nodes.CACHED:
+            # skips the computation once the slot holds the value
+            cached_jump = self.emit(LOAD_CACHED)
+            self.compile_expression(expression.expression)
+            self.emit(STORE_CACHED, expression.slot)
+            self.patch(cached_jump, (expression.slot, len(self.instructions)))
+        elif kind == nodes.CONCAT:
+            for part, formatter in zip(expression.parts, expression.formatters):
+                self.compile_expression(part)
+                if formatter is to_print_string:
+                    self.emit(TO_PRINT_STRING)
+                else:
+                    self.emit(TO_STRING)
+            self.emit(BUILD_STRING, len(expression.parts))
+        else:
+            self.emit(INVALID_EXPRESSION, expression.expression)
+
+
+def compile_method(method):
+    return Compiler().compile_method(method)
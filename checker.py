@@ -0,0 +1,82 @@
+"""
+Static check of a method body, run by ClassDefinition.prepare_method before
+the method first runs, once every class of the program is known. It binds
+what is known before the body runs, so the engines skip the checks that
+would otherwise run every time:
+
+- a (new ...) of an existing class gets its ClassDefinition, and
+- a (call me ...) of an existing method with the right number of arguments
+  gets its MethodDefinition, bypassing the lookup and the inline cache.
+
+Every site it cannot prove safe is left alone and still fails with the same
+error once the program reaches it. Those sites, along with unknown variables
+and malformed if statements, are also returned as diagnostics, so all of
+them can be reported at once (see Interpreter.check_program).
+"""
+
+from operations import (
+    arity_error,
+    malformed_if_error,
+    unknown_class_error,
+    unknown_method_error,
+    unknown_name_error,
+)
+from nodes import (
+    CALL,
+    CALL_ME,
+    CALL_NAME,
+    INPUT,
+    NAME,
+    NEW,
+    SET,
+    SYNTAX_ERROR,
+    TAIL_CALL,
+    SCOPE_UNRESOLVED,
+    walk,
+)
+
+
+class Checker:
+    def __init__(self, classes):
+        self.classes = classes  # class name -> ClassDefinition
+
+    def check_method(self, class_def, method):
+        """
+        Annotates the body of method and returns its diagnostics, a list of
+        (line number, ErrorType, message, class name, method name).
+        """
+        diagnostics = []
+        methods = class_def.get_methods()
+        for node in walk(method.get_body()):
+            kind = node.kind
+            if kind == NEW:
+                node.class_def = self.classes.get(node.class_name)
+                if node.class_def is None:
+                    diagnostics.append((node.line_num, *unknown_class_error(node.class_name)))
+            elif kind in (CALL, TAIL_CALL) and node.target_kind == CALL_ME:
+                called = methods.get(node.method_name)
+                if called is None:
+                    diagnostics.append((node.line_num, *unknown_method_error(node.method_name)))
+                elif len(called.get_parameters()) != len(node.args):
+                    diagnostics.append(
+                        (
+                            node.line_num,
+                            *arity_error(
+                                node.method_name, len(called.get_parameters()), len(node.args)
+                            ),
+                        )
+                    )
+                else:
+                    node.static_method = called
+            elif kind in (CALL, TAIL_CALL) and node.target_kind == CALL_NAME:
+                if node.target_scope == SCOPE_UNRESOLVED:
+                    diagnostics.append((node.line_num, *unknown_name_error(node.target)))
+            elif kind in (NAME, SET, INPUT):
+                if node.scope == SCOPE_UNRESOLVED:
+                    diagnostics.append((node.line_num, *unknown_name_error(node.name)))
+            elif kind == SYNTAX_ERROR:
+                diagnostics.append((node.line_num, *malformed_if_error()))
+        return [
+            (line_num, error_type, message, class_def.name, method.get_name())
+            for line_num, error_type, message in diagnostics
+        ]
@@ -1,15 +1,28 @@
 from intbase import InterpreterBase, ErrorType
 from fields import FieldDefinition
 from method import MethodDefinition
-from object import ObjectDefinition
+from bytecode import compile_method
+from lowering import Lowerer
+from resolver import Resolver
+from memoizer import MethodMemo, find_pure_methods
 
 class ClassDefinition:
-    def __init__(self, name, class_decleration, interpreter_obj):
+    # A class keeps its parsed declaration and is only built by load() when
+    # its first object is created; a method is only lowered, resolved and
+    # checked by prepare_method when it is first called.
+    def __init__(self, name, class_decleration, interpreter_obj, method_bodies=None):
         self.name = name
+        self.class_declaration = class_decleration  # parsed fields and methods
+        self.loaded = False
         self.methods = {}
         self.fields = {}
+        self.field_index = {}  # field name -> index into an object's field list
+        self.field_template = []  # initial values, copied into each object
+        self.unresolved_names = []  # (method name, name, line number)
         self.interpreter_obj = interpreter_obj
-        self.initiate_class(class_decleration)
+        # method name -> lowered body, from the cache or lowered on demand
+        self.method_bodies = {} if method_bodies is None else method_bodies
+        self.check_names(class_decleration)
 
     def get_methods(self):
         return self.methods
@@ -17,39 +30,97 @@ class ClassDefinition:
     def get_fields(self):
         return self.fields
 
-    def initiate_class(self, class_declaration):
+    def get_field_template(self):
+        return self.field_template
+
+    def get_unresolved_names(self):
+        return self.unresolved_names
+
+    def get_method_bodies(self):
+        # lowers every method, called before the bodies are cached
+        for item in self.class_declaration:
+            if item[0] == InterpreterBase.METHOD_DEF:
+                self.lower_method(MethodDefinition(item[1], item[2], item[3]))
+        return self.method_bodies
+
+    def check_names(self, class_declaration):
         has_main_func = False  # check whether a main method exist in class Main
+        method_names = set()
 
         for item in class_declaration:
             if item[0] == InterpreterBase.FIELD_DEF:
                 field_name = item[1]
-                if field_name in self.fields:
+                if field_name in self.field_index:
                     self.interpreter_obj.error(
                         ErrorType.NAME_ERROR,
                         f"Field name {field_name} already exist in class {self.name}",
                     )  # check for duplicate field name
-                initial_value = item[2]
-                self.fields[field_name] = FieldDefinition(field_name, initial_value)
+                self.field_index[field_name] = len(self.field_index)
 
             elif item[0] == InterpreterBase.METHOD_DEF:
                 method_name = item[1]
                 if method_name == InterpreterBase.MAIN_FUNC_DEF:
                     has_main_func = True
-                if method_name in self.methods:
+                if method_name in method_names:
                     self.interpreter_obj.error(
                         ErrorType.NAME_ERROR,
                         f"Method name {method_name} already exist in class {self.name}",
                     )  # check for duplicate method name
-                parameters = item[2]
-                statements = item[3]
-                self.methods[method_name] = MethodDefinition(
-                    method_name, parameters, statements
-                )
+                method_names.add(method_name)
 
         if self.name == InterpreterBase.MAIN_CLASS_DEF and not has_main_func:
             self.interpreter_obj.error(
                 ErrorType.SYNTAX_ERROR, "Main Class must have a main method"
             )
 
+    def load(self):
+        self.loaded = True
+        for item in self.class_declaration:
+            if item[0] == InterpreterBase.FIELD_DEF:
+                field_name = item[1]
+                self.fields[field_name] = FieldDefinition(field_name, item[2])
+                self.field_template.append(self.fields[field_name].get_initial_value())
+            elif item[0] == InterpreterBase.METHOD_DEF:
+                method_name = item[1]
+                self.methods[method_name] = MethodDefinition(method_name, item[2], item[3])
+
+        if self.interpreter_obj.memoize:
+            # whether a method is pure depends on the methods it calls
+            for method in self.methods.values():
+                self.prepare_method(method)
+            for method_name in find_pure_methods(self.methods):
+                self.methods[method_name].memo = MethodMemo(self.interpreter_obj.memo_size)
+
+    def load_all(self):
+        """Builds the class and prepares all of its methods."""
+        if not self.loaded:
+            self.load()
+        for method in self.methods.values():
+            if method.body is None:
+                self.prepare_method(method)
+
+    def lower_method(self, method):
+        body = self.method_bodies.get(method.name)
+        if body is None:
+            method.body = Lowerer().lower_method(method)
+            if self.interpreter_obj.optimizer is not None:
+                self.interpreter_obj.optimizer.optimize_method(method)
+            body = self.method_bodies[method.name] = method.body
+        return body
+
+    def prepare_method(self, method):
+        method.body = self.lower_method(method)
+        # fields may be declared after the methods that use them
+        for name, line_num in Resolver(self.field_index).resolve_method(method):
+            self.unresolved_names.append((method.name, name, line_num))
+        self.interpreter_obj.diagnostics.extend(
+            self.interpreter_obj.checker.check_method(self, method)
+        )
+        if self.interpreter_obj.engine == self.interpreter_obj.BYTECODE_ENGINE:
+            method.code = compile_method(method)
+        return method.body
+
     def instantiate_object(self):
-        return ObjectDefinition(self.interpreter_obj, self.methods, self.fields)
+        if not self.loaded:
+            self.load()
+        return self.interpreter_obj.object_definition(self.interpreter_obj, self)
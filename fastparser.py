@@ -0,0 +1,134 @@
+"""
+Drop-in replacement for BParser.parse that tokenizes each line with a compiled
+regular expression instead of walking it one character at a time.
+
+It returns the same nested lists of StringWithLineNumber tokens, the same line
+numbers and the same error strings as BParser.parse. parse_buffers does the
+same for a source in bytes, such as a memory-mapped file.
+"""
+
+import gc
+import re
+
+from bparser import BParser, StringWithLineNumber
+
+# quoted string, parenthesis, bare token, or a quote that never closes
+TOKEN_REGEX = re.compile(r'"[^"]*"|[()]|[^ \t\r\n()"]+|"')
+# the same tokens in UTF-8 bytes holding many lines, plus comments and newlines
+BUFFER_TOKEN_REGEX = re.compile(rb'"[^"\n]*"|[()]|[^ \t\r\n()"#]+|#[^\n]*|\n|"')
+
+
+class FastParser:
+    """
+    Static class that wraps FastParser.parse. Do not initialize this class!
+    """
+
+    @staticmethod
+    def parse(lines):
+        """
+        Same contract as BParser.parse: returns (True, nested token lists) or
+        (False, error message).
+        """
+        # the parser only allocates lists and strings and never creates cycles,
+        # so the cyclic garbage collector would just rescan the growing tree
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return FastParser.tokenize(lines)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    @staticmethod
+    def parse_buffers(windows):
+        """
+        Same as parse, for a source given as (buffer, start, end) windows of
+        whole lines of UTF-8 bytes, such as those of programsource.py.
+        """
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return FastParser.tokenize_buffers(windows)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    @staticmethod
+    def tokenize_buffers(windows):
+        # line numbers are counted from the newline tokens, instead of
+        # splitting the source into lines first
+        output = []
+        output_stack = [output]
+        current = output
+        find_tokens = BUFFER_TOKEN_REGEX.findall
+        new_string = str.__new__
+        line_no = 0
+        for buffer, start, end in windows:
+            for token in find_tokens(buffer, start, end):
+                if token == b"\n":
+                    line_no += 1
+                elif token == b"(":
+                    nested = []
+                    current.append(nested)
+                    output_stack.append(nested)
+                    current = nested
+                elif token == b")":
+                    if len(output_stack) < 2:
+                        return False, "Extra closing parenthesis"
+                    output_stack.pop()
+                    current = output_stack[-1]
+                elif token == b'"':
+                    return False, "Unclosed string"
+                elif not token.startswith(b"#"):  # comments are skipped
+                    token = new_string(StringWithLineNumber, token, "utf-8")
+                    token.line_num = line_no
+                    current.append(token)
+        if len(output_stack) > 1:
+            return False, "Unclosed parenthesis"
+        return True, output
+
+    @staticmethod
+    def tokenize(lines):
+        output = []
+        output_stack = [output]
+        current = output
+        find_tokens = TOKEN_REGEX.findall
+        new_string = str.__new__
+        for line_no, line in enumerate(lines):
+            if BParser.COMMENT_CHAR in line:
+                line = FastParser.remove_comment(line)
+            for token in find_tokens(line):
+                if token == BParser.OPEN_PAREN_CHAR:
+                    nested = []
+                    current.append(nested)
+                    output_stack.append(nested)
+                    current = nested
+                elif token == BParser.CLOSE_PAREN_CHAR:
+                    if len(output_stack) < 2:
+                        return False, "Extra closing parenthesis"
+                    output_stack.pop()
+                    current = output_stack[-1]
+                elif token == BParser.QUOTE_CHAR:
+                    return False, "Unclosed string"
+                else:
+                    # same as StringWithLineNumber(token, line_no), minus a Python call
+                    token = new_string(StringWithLineNumber, token)
+                    token.line_num = line_no
+                    current.append(token)
+        if len(output_stack) > 1:
+            return False, "Unclosed parenthesis"
+        return True, output
+
+    @staticmethod
+    def remove_comment(line):
+        # a comment starts at the first # outside of a string
+        position = 0
+        in_string = False
+        for part in line.split(BParser.QUOTE_CHAR):
+            if not in_string:
+                comment_start = part.find(BParser.COMMENT_CHAR)
+                if comment_start != -1:
+                    return line[: position + comment_start]
+            position += len(part) + 1
+            in_string = not in_string
+        return line
@@ -0,0 +1,152 @@
+"""
+Client of forkserver.py, and the wire protocol both of them use. It only
+imports the standard library, so it starts much faster than the interpreter.
+
+Usage: python forkclient.py PROGRAM [--socket PATH] [--inputs VALUE ...]
+                            [--repeat N] [--json]
+       python forkclient.py --preloaded NAME [...]
+
+PROGRAM is a Brewin source file; --preloaded runs a program the server
+loaded at startup instead. The output and any error of the run are printed,
+followed by the request latency: the round trip as seen by the client and
+the time the interpreter ran. With --repeat N the program runs N times and
+the latency is summarized.
+
+Every message is a JSON object preceded by its length as a 4-byte big-endian
+integer. A request holds a "program" (a string or a list of lines) or the
+name of a "preloaded" one, and optionally a "name", "inputs" (a list of
+values, never a file name), "expected_output" and "expected_error", as the
+cases of batchrunner.py. The response is the CaseResult.to_dict() of the run, plus the server's "latency"
+from reading the request to sending the response, or an "error" string.
+"""
+
+import argparse
+import json
+import socket
+import statistics
+import struct
+import sys
+import time
+
+DEFAULT_SOCKET_PATH = "/tmp/brewin-forkserver.sock"
+
+LENGTH = struct.Struct("!I")
+
+
+def send_message(connection, message):
+    data = json.dumps(message).encode("utf-8")
+    connection.sendall(LENGTH.pack(len(data)) + data)
+
+
+def receive_message(connection):
+    """The next message, or None if the other side closed the connection."""
+    header = receive_exactly(connection, LENGTH.size)
+    if header is None:
+        return None
+    data = receive_exactly(connection, LENGTH.unpack(header)[0])
+    if data is None:
+        return None
+    return json.loads(data.decode("utf-8"))
+
+
+def receive_exactly(connection, size):
+    chunks = []
+    while size:
+        chunk = connection.recv(min(size, 1 << 16))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class ForkClient:
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH):
+        self.socket_path = socket_path
+
+    def request(self, request):
+        """Sends one request and returns (response, round trip in seconds)."""
+        start = time.perf_counter()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(self.socket_path)
+            send_message(connection, request)
+            response = receive_message(connection)
+        round_trip = time.perf_counter() - start
+        if response is None:
+            raise ConnectionError("the server closed the connection without a response")
+        return response, round_trip
+
+    def run(self, program, inputs=None, name=None):
+        request = {"program": program, "inputs": inputs}
+        if name is not None:
+            request["name"] = name
+        return self.request(request)
+
+    def run_preloaded(self, preloaded, inputs=None):
+        return self.request({"preloaded": preloaded, "inputs": inputs})
+
+
+def print_response(response):
+    if "error" in response:
+        print(f"server error: {response['error']}", file=sys.stderr)
+        return
+    for line in response["output"]:
+        print(line)
+    if response["error_type"] is not None:
+        print(f"{response['error_type']} on line {response['error_line']}", file=sys.stderr)
+    elif response["exception"] is not None:
+        print(response["exception"], file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a Brewin program on a forkserver.")
+    parser.add_argument("program", nargs="?", help="Brewin source file")
+    parser.add_argument("--preloaded", help="name of a program the server preloaded")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    parser.add_argument("--inputs", nargs="*", default=None, help="values for inputs/inputi")
+    parser.add_argument("--repeat", type=int, default=1, help="run the program N times")
+    parser.add_argument("--json", action="store_true", help="print the responses as JSON")
+    args = parser.parse_args(argv)
+    if (args.program is None) == (args.preloaded is None):
+        parser.error("give either a program file or --preloaded NAME")
+
+    client = ForkClient(args.socket)
+    if args.program is not None:
+        with open(args.program, encoding="utf-8") as program_file:
+            program = program_file.read()
+
+    round_trips = []
+    run_times = []
+    for _ in range(args.repeat):
+        if args.program is not None:
+            response, round_trip = client.run(program, args.inputs, args.program)
+        else:
+            response, round_trip = client.run_preloaded(args.preloaded, args.inputs)
+        round_trips.append(round_trip)
+        run_times.append(response.get("elapsed", 0.0))
+
+    if args.json:
+        print(json.dumps(dict(response, round_trip=round_trip)))
+    else:
+        print_response(response)
+        if args.repeat == 1:
+            print(
+                f"latency {round_trip * 1000:.2f} ms (run {run_times[0] * 1000:.2f} ms)",
+                file=sys.stderr,
+            )
+        else:
+            round_trips.sort()
+            p99 = round_trips[min(len(round_trips) - 1, int(len(round_trips) * 0.99))]
+            print(
+                f"{args.repeat} runs: latency median {statistics.median(round_trips) * 1000:.2f} ms"
+                f", p99 {p99 * 1000:.2f} ms, min {round_trips[0] * 1000:.2f} ms"
+                f" (run median {statistics.median(run_times) * 1000:.2f} ms)",
+                file=sys.stderr,
+            )
+    if "error" in response or response["exception"] is not None:
+        return 1
+    return 0 if response["error_type"] is None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Daemon that runs Brewin programs sent over a UNIX domain socket, so a job
+pays for starting Python and importing the interpreter once instead of once
+per program. It can also parse programs at startup that requests then run by
+name. forkclient.py is its client and describes the protocol.
+
+Usage: python forkserver.py [--socket PATH] [--mode fork|reuse]
+                            [--engine tree|bytecode|python] [--timeout SECONDS]
+                            [--preload NAME=PATH ...]
+
+In fork mode, the default, every request is served by a child forked from
+the server, which runs the program in a fresh Interpreter and exits; runs
+are isolated from each other and from the server and can overlap. In reuse
+mode the server serves one request at a time with a single Interpreter,
+reset between runs, which saves the fork. Both log one line per request
+with its run time and latency. POSIX only.
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from functools import partial
+from pathlib import Path
+
+from batchrunner import BatchCase, run_timed
+from forkclient import DEFAULT_SOCKET_PATH, receive_message, send_message
+from interpreterv1 import Interpreter
+from programsource import open_program
+
+FORK_MODE = "fork"
+REUSE_MODE = "reuse"
+MODES = (FORK_MODE, REUSE_MODE)
+
+INPUT_TYPES = (str, int, float, bool)  # values a JSON list of inputs may hold
+
+
+def check_request(request):
+    """
+    Raises ValueError unless request has the types forkclient.py describes.
+    Inputs must be a list of values: a string would be opened as a file on
+    the server by Interpreter(inp=...).
+    """
+    if not isinstance(request, dict):
+        raise ValueError("a request must be a JSON object")
+    program = request.get("program", [])
+    if not isinstance(program, (str, list)) or (
+        isinstance(program, list) and not all(isinstance(line, str) for line in program)
+    ):
+        raise ValueError("program must be a string or a list of strings")
+    inputs = request.get("inputs")
+    if inputs is not None and (
+        not isinstance(inputs, list)
+        or not all(isinstance(value, INPUT_TYPES) for value in inputs)
+    ):
+        raise ValueError("inputs must be a list of strings or numbers")
+    for key in ("name", "preloaded"):
+        if not isinstance(request.get(key, ""), str):
+            raise ValueError(f"{key} must be a string")
+
+
+class ForkServer:
+    def __init__(
+        self,
+        socket_path=DEFAULT_SOCKET_PATH,
+        mode=FORK_MODE,
+        engine=Interpreter.TREE_ENGINE,
+        timeout=None,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode}, expected one of {MODES}")
+        self.socket_path = socket_path
+        self.mode = mode
+        self.engine = engine
+        self.timeout = timeout  # seconds per run
+        self.programs = {}  # name -> parsed program, see preload
+        self.interpreter = None  # reused between runs in reuse mode
+        self.listener = None
+        self.request_count = 0
+
+    def preload(self, name, program):
+        """Parses program, a pathlib.Path or source lines, for the requests that name it."""
+        result, parsed_program = Interpreter.parse_program(open_program(program))
+        if not result:
+            raise ValueError(f"Cannot preload {name}: {parsed_program}")
+        self.programs[name] = parsed_program
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # left behind by a server that was killed
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.socket_path)
+        self.listener.listen(128)
+        if self.mode == FORK_MODE:
+            signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # children reap themselves
+            gc.freeze()  # the collector would copy the children's shared pages
+        try:
+            while True:
+                connection, _ = self.listener.accept()
+                self.request_count += 1
+                if self.mode == FORK_MODE:
+                    self.fork_worker(connection)
+                else:
+                    with connection:
+                        self.serve(connection)
+        finally:
+            self.listener.close()
+            os.unlink(self.socket_path)
+
+    def fork_worker(self, connection):
+        if os.fork():
+            connection.close()
+            return
+
+        status = 0
+        try:
+            self.listener.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            with connection:
+                self.serve(connection)
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+        finally:
+            os._exit(status)  # never returns into the server's accept loop
+
+    def serve(self, connection):
+        request = receive_message(connection)
+        if request is None:
+            return
+        start = time.perf_counter()
+        try:
+            response = self.run_request(request)
+        except Exception as error:  # a malformed request, not a failing program
+            response = {"error": f"{type(error).__name__}: {error}"}
+        response["latency"] = time.perf_counter() - start
+        send_message(connection, response)
+        self.log(response)
+
+    def run_request(self, request):
+        check_request(request)
+        case = BatchCase.from_dict(self.request_count, {"program": [], **request})
+        interpreter = self.get_interpreter(case.inputs)
+        preloaded = request.get("preloaded")
+        if preloaded is not None:
+            if preloaded not in self.programs:
+                raise KeyError(f"no preloaded program named {preloaded}")
+            run = partial(interpreter.run_parsed, self.programs[preloaded])
+        else:
+            run = partial(interpreter.run, case.program)
+        return run_timed(case, interpreter, run, self.timeout).to_dict()
+
+    def get_interpreter(self, inputs):
+        if self.mode == FORK_MODE:
+            return Interpreter(console_output=False, inp=inputs, engine=self.engine)
+        if self.interpreter is None:
+            self.interpreter = Interpreter(console_output=False, engine=self.engine)
+        self.interpreter.reset()
+        self.interpreter.set_input(inputs)
+        return self.interpreter
+
+    def log(self, response):
+        if "error" in response:
+            status = "ERROR"
+            run_time = 0.0
+        else:
+            status = "OK" if response["exception"] is None else "EXCEPTION"
+            if response["timed_out"]:
+                status = "TIMEOUT"
+            elif response["error_type"] is not None:
+                status = response["error_type"]
+            run_time = response["elapsed"]
+        print(
+            f"{status} {response.get('name', 'request')} (run {run_time * 1000:.2f} ms,"
+            f" latency {response['latency'] * 1000:.2f} ms)",
+            flush=True,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Brewin runs over a UNIX socket.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    parser.add_argument("--mode", choices=MODES, default=FORK_MODE)
+    parser.add_argument("--engine", choices=Interpreter.ENGINES, default=Interpreter.TREE_ENGINE)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per run")
+    parser.add_argument(
+        "--preload", action="append", default=[], metavar="NAME=PATH",
+        help="parse a program at startup, to be run by name",
+    )
+    args = parser.parse_args(argv)
+
+    server = ForkServer(args.socket, args.mode, args.engine, args.timeout)
+    for preload in args.preload:
+        name, separator, path = preload.partition("=")
+        if not separator:
+            parser.error(f"--preload takes NAME=PATH, not {preload}")
+        server.preload(name, Path(path))
+
+    # a program that reads past its inputs gets no input, not the server's terminal
+    sys.stdin = open(os.devnull)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(
+        f"serving on {args.socket} in {args.mode} mode"
+        f" with {len(server.programs)} preloaded programs",
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
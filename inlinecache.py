@@ -0,0 +1,32 @@
+"""
+Inline caches for method dispatch. Every call site, a CallNode, remembers the
+class of its last receiver and the method it resolved to, so a call that
+sees the same class again skips the method lookup and the arity check; the
+number of arguments of a call site never changes.
+
+The engines check that entry themselves and call lookup_method when it
+misses. Sites that see several receiver classes keep up to
+POLYMORPHIC_LIMIT of them in receiver_classes, any further class is looked
+up again every time it comes back.
+"""
+
+POLYMORPHIC_LIMIT = 4
+
+
+def lookup_method(call, receiver, evaluated_args):
+    class_def = receiver.class_def
+    receiver_classes = call.receiver_classes
+    if receiver_classes is not None and class_def in receiver_classes:
+        method = receiver_classes[class_def]
+        call.hits += 1
+    else:
+        # raises the same errors as an uncached call
+        method = receiver.get_method(call.method_name, evaluated_args)
+        call.misses += 1
+        if receiver_classes is None:
+            receiver_classes = call.receiver_classes = {}
+        if len(receiver_classes) < POLYMORPHIC_LIMIT:
+            receiver_classes[class_def] = method
+    call.cached_class = class_def
+    call.cached_method = method
+    return method
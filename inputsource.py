@@ -0,0 +1,78 @@
+"""
+Streams the values read by inputs/inputi from a file path, a file object or
+any iterator, so a program can consume more input than fits in memory.
+"""
+
+import os
+
+BLOCK_SIZE = 1 << 16
+
+
+class InputSource:
+    def __init__(self, source, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self.file = None
+        self.owns_file = False
+        self.values = None
+        if isinstance(source, (str, os.PathLike)):
+            self.file = open(source, "rb")
+            self.owns_file = True
+        elif hasattr(source, "read"):
+            self.file = source
+        else:
+            self.values = iter(source)
+
+        self.lines = []  # complete lines of the current block
+        self.line_index = 0
+        self.partial_line = None  # text after the last newline of the block
+        self.exhausted = False
+
+    def next_value(self):
+        """The next value, or None once the input is used up."""
+        if self.values is not None:
+            value = next(self.values, None)
+            # read as text, like the lines of a file
+            return None if value is None else str(value)
+
+        if self.line_index == len(self.lines) and not self.read_block():
+            return None
+        line = self.lines[self.line_index]
+        self.line_index += 1
+        return line
+
+    def read_block(self):
+        # lines are split lazily, one block of the file at a time
+        while not self.exhausted:
+            block = self.file.read(self.block_size)
+            if not block:
+                self.exhausted = True
+                self.close()
+                if not self.partial_line:
+                    return False
+                self.set_lines(self.partial_line)
+                self.partial_line = None
+                return True
+
+            if self.partial_line:
+                block = self.partial_line + block
+            newline = b"\n" if isinstance(block, bytes) else "\n"
+            complete, separator, self.partial_line = block.rpartition(newline)
+            if separator:
+                self.set_lines(complete)
+                return True
+        return False
+
+    def set_lines(self, text):
+        # a block only holds whole lines, so no character is split in two
+        if isinstance(text, bytes):
+            text = text.decode("utf-8")
+        lines = text.split("\n")
+        if "\r" in text:
+            lines = [line[:-1] if line.endswith("\r") else line for line in lines]
+        self.lines = lines
+        self.line_index = 0
+
+    def close(self):
+        if self.owns_file and self.file is not None:
+            self.file.close()
+            self.file = None
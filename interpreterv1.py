@@ -1,30 +1,363 @@
-from bparser import BParser, StringWithLineNumber
+from collections import deque
+
+from fastparser import FastParser
 from intbase import InterpreterBase, ErrorType
 from classes import ClassDefinition
+from vm import VirtualMachine, DEFAULT_MAX_CALL_DEPTH
+from transpiler import PythonProgram
+from programcache import ProgramCache
+from object import ObjectDefinition
+from profiler import Profiler, ProfiledObjectDefinition
+from meter import Meter, MeteredObjectDefinition
+from inputsource import InputSource
+from optimizer import Optimizer
+from memoizer import DEFAULT_MEMO_SIZE
+from checker import Checker
+from programsource import ProgramSource, open_program
+import nodes
 
 class Interpreter(InterpreterBase):
-    def __init__(self, console_output=True, inp=None, trace_output=False):
+    TREE_ENGINE = "tree"
+    BYTECODE_ENGINE = "bytecode"
+    PYTHON_ENGINE = "python"
+    ENGINES = (TREE_ENGINE, BYTECODE_ENGINE, PYTHON_ENGINE)
+
+    def __init__(
+        self,
+        console_output=True,
+        inp=None,
+        trace_output=False,
+        engine=TREE_ENGINE,
+        dump_source=None,
+        cache_dir=None,
+        cache_max_bytes=ProgramCache.DEFAULT_MAX_BYTES,
+        output_sink=None,
+        output_log_size=None,
+        max_call_depth=DEFAULT_MAX_CALL_DEPTH,
+        optimize=False,
+        memoize=False,
+        memo_size=DEFAULT_MEMO_SIZE,
+        meter=False,
+        max_steps=None,
+        time_limit=None,
+    ):
         super().__init__(console_output, inp)  # call InterpreterBase’s constructor
+        self.input_source = None
+        self.set_input(inp)
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine {engine}, expected one of {self.ENGINES}")
+        self.engine = engine
+        self.profiler = None
+        self.object_definition = ObjectDefinition  # class of every Brewin object
+        if trace_output:
+            if engine != self.TREE_ENGINE:
+                raise ValueError("trace_output profiling needs the tree engine")
+            self.profiler = Profiler()
+            self.object_definition = ProfiledObjectDefinition
+        # counts steps and allocations of every run, see meter.py
+        self.metering = meter or max_steps is not None or time_limit is not None
+        if self.metering:
+            if trace_output:
+                raise ValueError("trace_output cannot be combined with metering")
+            if max_steps is not None and max_steps < 0:
+                raise ValueError("max_steps cannot be negative")
+            self.object_definition = MeteredObjectDefinition
+        self.max_steps = max_steps
+        self.time_limit = time_limit  # seconds per run
+        self.meter = None  # of the last run
+        self.optimizer = Optimizer() if optimize else None
+        if memoize and engine == self.PYTHON_ENGINE:
+            raise ValueError("memoize needs the tree or bytecode engine")
+        self.memoize = memoize  # cache results of pure methods, see memoizer.py
+        self.memo_size = memo_size
+        self.max_call_depth = max_call_depth  # Brewin calls deep, bytecode engine
+        self.dump_source = dump_source  # file path for the python engine's source
         self.classes = {}
+        self.diagnostics = []  # found by checker.py as methods are prepared
+        self.checker = Checker(self.classes)
+        self.python_program = None
+        self.program_cache = None
+        if cache_dir is not None:
+            self.program_cache = ProgramCache(cache_dir, cache_max_bytes)
+        self.output_sink = output_sink  # replaces printing to stdout, see outputsink.py
+        self.output_log_size = output_log_size  # None keeps every line, N the last N
+        self.output_log = self.new_output_log()
+
+    def new_output_log(self):
+        if self.output_log_size is None:
+            return []
+        return deque(maxlen=self.output_log_size)
+
+    def reset(self):
+        super().reset()
+        self.output_log = self.new_output_log()
+        # forget the loaded program as well, so another one can run
+        self.classes.clear()
+        self.diagnostics = []
+        self.python_program = None
+        self.meter = None
+
+    def set_input(self, inp):
+        if self.input_source is not None:
+            self.input_source.close()
+        self.inp = inp
+        self.input_cursor = 0
+        self.input_source = None
+        if inp is not None and not isinstance(inp, list):
+            # a path, file object or iterator is streamed instead of indexed
+            self.input_source = InputSource(inp)
+            self.inp = None
+
+    def output(self, val):
+        if self.output_sink is not None:
+            self.output_sink.write(val)
+        elif self.console_output:
+            print(val)
+        self.output_log.append(val)
+
+    def get_input(self):
+        if self.input_source is None:
+            return super().get_input()
+        return self.input_source.next_value()
+
+    def get_int_input(self):
+        return self.to_int_input(self.get_input())
+
+    def to_int_input(self, value):
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            super().error(ErrorType.TYPE_ERROR, f"Invalid integer input {value}")
+
+    def get_output(self):
+        if self.output_log_size is None:
+            return self.output_log
+        return list(self.output_log)
 
     def get_classes(self):
         return self.classes
 
+    def get_diagnostics(self):
+        """(line, ErrorType, message, class, method) for every error checker.py found."""
+        return sorted(self.diagnostics, key=lambda diagnostic: diagnostic[0])
+
+    def get_unresolved_names(self):
+        """(class, method, name, line) for every name that is neither a parameter nor a field."""
+        return [
+            (class_name, method_name, name, line_num)
+            for class_name, class_def in self.classes.items()
+            for method_name, name, line_num in class_def.get_unresolved_names()
+        ]
+
+    def get_inline_cache_stats(self):
+        """Hits and misses of the method dispatch caches, see inlinecache.py."""
+        sites = []
+        for class_name, class_def in self.classes.items():
+            for method_name, method in class_def.get_methods().items():
+                if method.get_body() is None:
+                    continue  # never called
+                for node in nodes.walk(method.get_body()):
+                    # a site that ran has missed at least once
+                    if node.kind in (nodes.CALL, nodes.TAIL_CALL) and node.misses:
+                        sites.append(
+                            {
+                                "class": class_name,
+                                "method": method_name,
+                                "line": node.line_num,
+                                "called_method": node.method_name,
+                                "hits": node.hits,
+                                "misses": node.misses,
+                                "receiver_classes": len(node.receiver_classes),
+                            }
+                        )
+        sites.sort(key=lambda site: site["misses"], reverse=True)
+        return {
+            "hits": sum(site["hits"] for site in sites),
+            "misses": sum(site["misses"] for site in sites),
+            "sites": sites,
+        }
+
+    def get_quickening_stats(self):
+        """Specializations and deoptimizations of operators, see quickening.py."""
+        stats = {"specializations": 0, "deoptimizations": 0, "specialized": {}}
+        for class_def in self.classes.values():
+            for method in class_def.get_methods().values():
+                if method.get_body() is None:
+                    continue  # never called
+                for node in nodes.walk(method.get_body()):
+                    if node.kind != nodes.BINARY:
+                        continue
+                    stats["specializations"] += node.specializations
+                    stats["deoptimizations"] += node.deoptimizations
+                    if node.specialized is not None:
+                        name = node.specialized.__name__
+                        stats["specialized"][name] = stats["specialized"].get(name, 0) + 1
+        return stats
+
+    def get_memo_stats(self):
+        """Hits, misses and evictions per memoized "class.method", with memoize=True."""
+        stats = {}
+        for class_name, class_def in self.classes.items():
+            for method_name, method in class_def.get_methods().items():
+                memo = method.memo
+                if memo is None:
+                    continue
+                calls = memo.hits + memo.misses
+                stats[f"{class_name}.{method_name}"] = {
+                    "hits": memo.hits,
+                    "misses": memo.misses,
+                    "evictions": memo.evictions,
+                    "hit_rate": memo.hits / calls if calls else 0.0,
+                }
+        return stats
+
+    def get_optimizer_stats(self):
+        """What each optimizer pass did, with optimize=True (nothing on a cache hit)."""
+        if self.optimizer is None:
+            return None
+        return dict(self.optimizer.stats)
+
+    def get_profile_report(self, limit=None):
+        """Per-method and per-line profile of the last run, with trace_output=True."""
+        if self.profiler is None:
+            return None
+        return self.profiler.report(limit)
+
+    def get_meter_report(self):
+        """Steps, loops, calls, allocations and elapsed seconds of the last run."""
+        if self.meter is None:
+            return None
+        return self.meter.report()
+
+    def get_generated_source(self):
+        """Python source generated by the python engine for the last run."""
+        if self.python_program is None:
+            return None
+        return self.python_program.get_source()
+
     def run(self, program):
-        result, parsed_program = BParser.parse(program)  # parse the program
+        try:
+            self.run_program(program)
+        finally:
+            if self.output_sink is not None:
+                self.output_sink.close()
+
+    def run_parsed(self, parsed_program):
+        """Same as run, for a program parsed by FastParser.parse or BParser.parse."""
+        try:
+            self.add_classes(parsed_program)
+            self.run_main()
+        finally:
+            if self.output_sink is not None:
+                self.output_sink.close()
+
+    def run_program(self, program):
+        if self.load_program(program):
+            self.run_main()
+
+    def load_program(self, program):
+        """Parses program and adds its classes; False after a syntax error."""
+        program = open_program(program)  # a path or a binary file is not split into lines
+        if self.program_cache is not None and self.is_rereadable(program):
+            return self.load_classes(program)
+        result, parsed_program = self.parse_program(program)  # parse the program
         if not result:
-            return  # error with parsing
+            return False  # error with parsing
+        self.add_classes(parsed_program)
+        return True
+
+    def run_main(self):
+        if self.profiler is not None:
+            self.profiler = Profiler()
+        self.start_meter()
+        try:
+            if self.engine == self.PYTHON_ENGINE:
+                self.run_python_program()
+                return
+            main_class = self.classes[super().MAIN_CLASS_DEF]  # get the main class
+            main_obj = main_class.instantiate_object()
+            if self.engine == self.BYTECODE_ENGINE:
+                VirtualMachine(self, self.max_call_depth).call_method(
+                    main_obj, super().MAIN_FUNC_DEF, []
+                )
+            else:
+                main_obj.call_method(super().MAIN_FUNC_DEF, [])
+        finally:
+            if self.meter is not None:
+                self.meter.stop()
+
+    def start_meter(self):
+        self.meter = None
+        if self.metering:
+            self.meter = Meter(self.max_steps, self.time_limit)
 
+    def validate_program(self, program):
+        result, _ = self.parse_program(open_program(program))
+        return result
+
+    def check_program(self, program):
+        """Loads every class and method without running them and returns the diagnostics."""
+        result, parsed_program = self.parse_program(open_program(program))
+        if result:
+            self.add_classes(parsed_program)
+            for class_def in self.classes.values():
+                class_def.load_all()
+        return self.get_diagnostics()
+
+    @staticmethod
+    def parse_program(program):
+        if isinstance(program, ProgramSource):
+            return program.parse()
+        return FastParser.parse(program)
+
+    @staticmethod
+    def is_rereadable(program):
+        # the cache reads a program once for its key and again to parse it
+        return not isinstance(program, ProgramSource) or program.is_rereadable()
+
+    def run_python_program(self):
+        # the whole program is translated at once
+        for class_def in self.classes.values():
+            class_def.load_all()
+        self.python_program = PythonProgram(self, self.classes)
+        if self.dump_source:
+            with open(self.dump_source, "w") as source_file:
+                source_file.write(self.python_program.get_source())
+
+        main_obj = self.python_program.instantiate_object(super().MAIN_CLASS_DEF)
+        self.python_program.call_method(main_obj, super().MAIN_FUNC_DEF, [])
+
+    def load_classes(self, program):
+        # a cache hit skips both parsing and lowering
+        variant = f"optimize={self.optimizer is not None}"
+        key = self.program_cache.get_key(program, variant)
+        cached = self.program_cache.load(key)
+        if cached is not None:
+            parsed_program, method_bodies = cached
+            self.add_classes(parsed_program, method_bodies)
+            return True
+
+        result, parsed_program = self.parse_program(program)
+        if not result:
+            return False
         self.add_classes(parsed_program)
-        main_class = self.classes[super().MAIN_CLASS_DEF]  # get the main class
-        main_obj = main_class.instantiate_object()
-        main_obj.call_method(super().MAIN_FUNC_DEF, [])
+        method_bodies = {
+            name: class_def.get_method_bodies()
+            for name, class_def in self.classes.items()
+        }
+        self.program_cache.store(key, (parsed_program, method_bodies))
+        return True
 
-    def add_classes(self, parsed_program):
+    def add_classes(self, parsed_program, method_bodies=None):
         has_main_class = False  # check if main class exist
 
         for class_decleration in parsed_program:
             class_name = class_decleration[1]
+            cached_bodies = None
+            if method_bodies is not None:
+                cached_bodies = method_bodies[class_name]
             if class_name in self.classes:
                 super().error(
                     ErrorType.TYPE_ERROR, f"Duplicate class name {class_name}"
@@ -34,7 +367,10 @@ class Interpreter(InterpreterBase):
                 has_main_class = True
 
             self.classes[class_name] = ClassDefinition(
-                class_name, class_decleration[1:], self
+                class_name,
+                class_decleration[1:],
+                self,
+                cached_bodies,
             )  # create a new class
 
         if not has_main_class:  # if main class doesn't exist
@@ -0,0 +1,246 @@
+from intbase import InterpreterBase
+from operations import (
+    ARITHMATIC_OPERATIONS,
+    LOGIC_OPERATIONS,
+    NOT_OPERATION,
+    evaluate_arithmatic,
+    evaluate_logic,
+    to_print_string,
+)
+from nodes import (
+    BEGIN,
+    CALL,
+    IF,
+    RETURN,
+    WHILE,
+    CALL_ME,
+    CALL_NAME,
+    CALL_EXPRESSION,
+    PrintNode,
+    SetNode,
+    WhileNode,
+    InputNode,
+    ReturnNode,
+    CallNode,
+    TailCallNode,
+    IfNode,
+    BeginNode,
+    NoopNode,
+    SyntaxErrorNode,
+    InvalidNode,
+    ConstNode,
+    NameNode,
+    NewNode,
+    BinaryNode,
+    NotNode,
+    StatementNode,
+    ConcatNode,
+)
+
+STATEMENT_DEFS = (
+    InterpreterBase.PRINT_DEF,
+    InterpreterBase.SET_DEF,
+    InterpreterBase.WHILE_DEF,
+    InterpreterBase.INPUT_STRING_DEF,
+    InterpreterBase.INPUT_INT_DEF,
+    InterpreterBase.RETURN_DEF,
+    InterpreterBase.CALL_DEF,
+    InterpreterBase.IF_DEF,
+    InterpreterBase.BEGIN_DEF,
+)
+
+
+def line_of(expression):
+    while isinstance(expression, list) and len(expression) != 0:
+        expression = expression[0]
+    return getattr(expression, "line_num", None)
+
+
+class Lowerer:
+    # statements shorter than this are malformed and fail once they are reached
+    MINIMUM_LENGTHS = {
+        InterpreterBase.PRINT_DEF: 2,
+        InterpreterBase.SET_DEF: 3,
+        InterpreterBase.WHILE_DEF: 3,
+        InterpreterBase.INPUT_STRING_DEF: 2,
+        InterpreterBase.INPUT_INT_DEF: 2,
+        InterpreterBase.CALL_DEF: 3,
+    }
+
+    def lower_method(self, method):
+        body = self.lower_statement(method.get_top_level_statement())
+        return self.mark_tail_calls(body, True)
+
+    def mark_tail_calls(self, statement, in_tail_position):
+        # A value returned by a statement ends the method, so (return (call ...))
+        # is a tail call anywhere outside of a statement used as an expression.
+        # A call statement is one only when nothing can run after it. Calls on
+        # an evaluated expression drop their result and are left alone.
+        kind = statement.kind
+        if kind == BEGIN:
+            last_index = len(statement.statements) - 1
+            statement.statements = [
+                self.mark_tail_calls(nested, in_tail_position and index == last_index)
+                for index, nested in enumerate(statement.statements)
+            ]
+        elif kind == IF:
+            statement.then_statement = self.mark_tail_calls(
+                statement.then_statement, in_tail_position
+            )
+            if statement.else_statement is not None:
+                statement.else_statement = self.mark_tail_calls(
+                    statement.else_statement, in_tail_position
+                )
+        elif kind == WHILE:
+            statement.body = self.mark_tail_calls(statement.body, False)
+        elif kind == RETURN:
+            value = statement.value
+            if value is not None and self.is_tail_call_candidate(value):
+                statement.value = TailCallNode(value, True)
+        elif kind == CALL and in_tail_position and self.is_tail_call_candidate(statement):
+            return TailCallNode(statement, False)
+        return statement
+
+    def is_tail_call_candidate(self, node):
+        return node.kind == CALL and node.target_kind != CALL_EXPRESSION
+
+    def lower_statement(self, statement):
+        line_num = line_of(statement)
+        if not isinstance(statement, list) or len(statement) == 0:
+            return NoopNode(line_num)
+
+        keyword = statement[0]
+        if len(statement) < self.MINIMUM_LENGTHS.get(keyword, 1):
+            return InvalidNode(line_num, statement)
+
+        if keyword == InterpreterBase.PRINT_DEF:
+            return PrintNode(line_num, self.lower_print_arguments(statement[1:]))
+        elif keyword == InterpreterBase.SET_DEF:
+            return SetNode(line_num, statement[1], self.lower_expression(statement[2]))
+        elif keyword == InterpreterBase.WHILE_DEF:
+            return WhileNode(
+                line_num,
+                self.lower_expression(statement[1]),
+                self.lower_statement(statement[2]),
+            )
+        elif keyword in (InterpreterBase.INPUT_STRING_DEF, InterpreterBase.INPUT_INT_DEF):
+            return InputNode(
+                line_num, statement[1], keyword == InterpreterBase.INPUT_INT_DEF
+            )
+        elif keyword == InterpreterBase.RETURN_DEF:
+            if len(statement) == 1:
+                return ReturnNode(line_num, None)
+            return ReturnNode(line_num, self.lower_expression(statement[1]))
+        elif keyword == InterpreterBase.CALL_DEF:
+            return self.lower_call(statement)
+        elif keyword == InterpreterBase.IF_DEF:
+            if len(statement) < 3:
+                return SyntaxErrorNode(line_num)
+            else_statement = None
+            if len(statement) > 3:
+                else_statement = self.lower_statement(statement[3])
+            return IfNode(
+                line_num,
+                self.lower_expression(statement[1]),
+                self.lower_statement(statement[2]),
+                else_statement,
+            )
+        elif keyword == InterpreterBase.BEGIN_DEF:
+            return BeginNode(
+                line_num, [self.lower_statement(nested) for nested in statement[1:]]
+            )
+        return NoopNode(line_num)  # anything else does nothing as a statement
+
+    def lower_call(self, statement):
+        target = statement[1]
+        if isinstance(target, list):
+            target_kind = CALL_EXPRESSION
+            target = self.lower_expression(target)
+        elif target == InterpreterBase.ME_DEF:
+            target_kind = CALL_ME
+        else:
+            target_kind = CALL_NAME
+        args = [self.lower_expression(arg) for arg in statement[3:]]
+        return CallNode(
+            line_of(statement), target_kind, target, statement[2], args, statement
+        )
+
+    def lower_print_arguments(self, expression):
+        line_num = line_of(expression)
+        if isinstance(expression[0], list):
+            # only the value of a leading nested expression gets printed
+            return self.lower_expression(expression[0])
+        if self.is_operator(expression[0]):
+            return self.lower_expression(expression)
+
+        parts = []
+        formatters = []
+        for value in expression:
+            if isinstance(value, list):
+                parts.append(self.lower_expression(value))
+                formatters.append(str)
+            else:
+                parts.append(self.lower_expression(value))
+                formatters.append(to_print_string)
+        return ConcatNode(line_num, parts, formatters)
+
+    def is_operator(self, token):
+        return (
+            token == InterpreterBase.NEW_DEF
+            or token == NOT_OPERATION
+            or token in ARITHMATIC_OPERATIONS
+            or token in LOGIC_OPERATIONS
+            or token in STATEMENT_DEFS
+        )
+
+    def lower_expression(self, expression):
+        line_num = line_of(expression)
+        if isinstance(expression, str):
+            return self.lower_token(expression)
+        if not isinstance(expression, list) or len(expression) == 0:
+            return InvalidNode(line_num, expression)
+
+        operator = expression[0]
+        operands = expression[1:]
+
+        if operator == InterpreterBase.NEW_DEF and len(operands) >= 1:
+            return NewNode(line_num, operands[0])
+        elif operator == InterpreterBase.CALL_DEF and len(operands) >= 2:
+            return self.lower_call(expression)
+        elif operator in STATEMENT_DEFS:
+            return StatementNode(line_num, self.lower_statement(expression), expression)
+        elif isinstance(operator, list):
+            return self.lower_expression(operator)
+        elif operator in ARITHMATIC_OPERATIONS and len(operands) >= 2:
+            return BinaryNode(
+                line_num,
+                operator,
+                evaluate_arithmatic,
+                self.lower_expression(operands[0]),
+                self.lower_expression(operands[1]),
+            )
+        elif operator in LOGIC_OPERATIONS and len(operands) >= 2:
+            return BinaryNode(
+                line_num,
+                operator,
+                evaluate_logic,
+                self.lower_expression(operands[0]),
+                self.lower_expression(operands[1]),
+            )
+        elif operator == NOT_OPERATION and len(operands) >= 1:
+            return NotNode(line_num, self.lower_expression(operands[0]))
+        return InvalidNode(line_num, expression)
+
+    def lower_token(self, token):
+        line_num = line_of(token)
+        if token.startswith('"') and token.endswith('"'):  # String literal
+            return ConstNode(line_num, token[1:-1])
+        elif token.isdigit():  # Integer literal
+            return ConstNode(line_num, int(token))
+        elif token == InterpreterBase.NULL_DEF:
+            return ConstNode(line_num, None)
+        elif token == InterpreterBase.TRUE_DEF:
+            return ConstNode(line_num, True)
+        elif token == InterpreterBase.FALSE_DEF:
+            return ConstNode(line_num, False)
+        return NameNode(line_num, token)  # Assume the token is a variable name
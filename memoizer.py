@@ -0,0 +1,92 @@
+"""
+Memoization of pure methods, turned on with Interpreter(memoize=True).
+
+When a class is loaded, find_pure_methods picks the methods that neither read
+nor set fields, print, read input or create objects, and only call pure
+methods of their own object. What they return depends on their arguments
+alone, so calls with int, string and bool arguments are answered from a
+per-method LRU cache of the last memo_size results. Calls that raise an
+error are not cached and raise it again.
+"""
+
+from collections import OrderedDict
+
+import nodes
+
+DEFAULT_MEMO_SIZE = 1024
+
+MISSING = object()
+
+
+def is_pure_node(node):
+    kind = node.kind
+    if kind in (nodes.PRINT, nodes.INPUT, nodes.NEW):
+        return False
+    elif kind in (nodes.NAME, nodes.SET):
+        return node.scope == nodes.SCOPE_PARAMETER
+    elif kind in (nodes.CALL, nodes.TAIL_CALL):
+        return node.target_kind == nodes.CALL_ME
+    return True
+
+
+def find_pure_methods(methods):
+    """The names of the pure methods in methods, a name -> MethodDefinition dict."""
+    callees = {}
+    for name, method in methods.items():
+        called = set()
+        for node in nodes.walk(method.get_body()):
+            if not is_pure_node(node):
+                break
+            if node.kind in (nodes.CALL, nodes.TAIL_CALL):
+                called.add(node.method_name)
+        else:
+            callees[name] = called
+
+    # a method stops being pure once it calls one that is not
+    pure = set(callees)
+    changed = True
+    while changed:
+        changed = False
+        for name in list(pure):
+            if not callees[name] <= pure:
+                pure.discard(name)
+                changed = True
+    return pure
+
+
+def get_memo_key(evaluated_args):
+    has_bool = False
+    for arg in evaluated_args:
+        arg_class = arg.__class__
+        if arg_class is bool:
+            has_bool = True
+        elif arg_class is not int and arg_class is not str:
+            return None
+    if has_bool:
+        # True == 1 in Python, but not in Brewin
+        return tuple((arg.__class__, arg) for arg in evaluated_args)
+    return tuple(evaluated_args)
+
+
+class MethodMemo:
+    def __init__(self, size=DEFAULT_MEMO_SIZE):
+        self.size = max(1, size)
+        self.results = OrderedDict()  # memo key -> result, least recent first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        result = self.results.get(key, MISSING)
+        if result is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.results.move_to_end(key)
+        return result
+
+    def store(self, key, result):
+        self.results[key] = result
+        if len(self.results) > self.size:
+            self.results.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,114 @@
+"""
+Metering of a run, turned on with Interpreter(meter=True) or by giving it a
+max_steps or time_limit budget. A step is a run of a while loop body or a
+method call: the code run between two steps is bounded by the size of the
+program, so counting steps instead of statements costs next to nothing and
+still stops every runaway loop or recursion. The budgets are only checked
+every check_interval steps, when the countdown runs out, which is also
+the only time the clock is read.
+
+The tree engine counts through MeteredObjectDefinition, the bytecode
+engine with the ticks of VirtualMachine.execute and the python engine with
+calls the transpiler adds to the code of a metered run. All three count the
+same steps for the same program, optimized or not. get_meter_report() on the
+interpreter returns the counters of the last run, also after it failed.
+"""
+
+import time
+
+from object import ObjectDefinition
+
+CHECK_INTERVAL = 1000  # steps between two checks of the budgets
+
+
+class StepLimitExceeded(Exception):
+    pass
+
+
+class TimeLimitExceeded(Exception):
+    pass
+
+
+class Meter:
+    def __init__(self, max_steps=None, time_limit=None, check_interval=CHECK_INTERVAL):
+        self.max_steps = max_steps  # None for no limit
+        self.time_limit = time_limit  # seconds, None for no limit
+        self.check_interval = check_interval
+        self.calls = 0
+        self.allocations = 0
+        self.checked_steps = 0  # steps counted before the current countdown
+        self.granted = 0  # steps the current countdown started from
+        self.countdown = 0  # steps until the next check
+        self.start_time = time.perf_counter()
+        self.deadline = None
+        if time_limit is not None:
+            self.deadline = self.start_time + time_limit
+        self.elapsed = None
+        self.grant()
+
+    def grant(self):
+        # stops one step past the limit, so a run of exactly max_steps finishes
+        granted = self.check_interval
+        if self.max_steps is not None:
+            granted = min(granted, self.max_steps + 1 - self.checked_steps)
+        self.granted = self.countdown = granted
+        return granted
+
+    def check(self):
+        """Called when the countdown runs out; returns the next countdown."""
+        self.checked_steps += self.granted
+        self.granted = self.countdown = 0
+        if self.max_steps is not None and self.checked_steps > self.max_steps:
+            raise StepLimitExceeded(
+                f"Brewin program ran past its limit of {self.max_steps} steps"
+            )
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise TimeLimitExceeded(
+                f"Brewin program ran past its time limit of {self.time_limit} seconds"
+            )
+        return self.grant()
+
+    def count_step(self):
+        self.countdown -= 1
+        if self.countdown == 0:
+            self.check()
+
+    def count_call(self):
+        self.calls += 1
+        self.count_step()
+
+    def count_allocation(self):
+        self.allocations += 1
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.start_time
+
+    def get_steps(self):
+        return self.checked_steps + self.granted - self.countdown
+
+    def report(self):
+        steps = self.get_steps()
+        return {
+            "steps": steps,
+            "loops": steps - self.calls,
+            "calls": self.calls,
+            "allocations": self.allocations,
+            "elapsed": self.elapsed,
+        }
+
+
+class MeteredObjectDefinition(ObjectDefinition):
+    __slots__ = ()
+
+    HOOKS = True
+
+    def __init__(self, interpreter_obj, class_def):
+        super().__init__(interpreter_obj, class_def)
+        interpreter_obj.meter.count_allocation()
+
+    def enter_method(self, method):
+        self.interpreter_obj.meter.count_call()
+
+    def back_edge(self):
+        # after every run of the body, where the VM ticks LOOP and LOOP_IF_TRUE
+        self.interpreter_obj.meter.count_step()
@@ -3,10 +3,19 @@ class MethodDefinition:
         self.name = name
         self.parameters = parameters
         self.statements = statements
+        # lowered statement and bytecode, set by ClassDefinition.prepare_method
+        # on the first call
+        self.body = None
+        self.code = None
+        self.frame_padding = []  # UNSET values for the cache slots, see resolver.py
+        self.memo = None  # MethodMemo of a pure method, see memoizer.py
 
     def get_top_level_statement(self):
         return self.statements
 
+    def get_body(self):
+        return self.body
+
     def get_name(self):
         return self.name
 
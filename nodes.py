@@ -0,0 +1,362 @@
+"""
+Node types for lowered method bodies. lowering.py turns the nested lists from
+BParser.parse into these nodes once, when a class is loaded, so the engines no
+longer re-inspect raw tokens while a program runs.
+
+Every node records the line number of the token it was built from.
+"""
+
+from quickening import WARMUP
+
+# node kinds
+PRINT = 0
+SET = 1
+WHILE = 2
+INPUT = 3
+RETURN = 4
+CALL = 5
+IF = 6
+BEGIN = 7
+NOOP = 8
+SYNTAX_ERROR = 9
+INVALID = 10
+CONST = 11
+NAME = 12
+NEW = 13
+BINARY = 14
+NOT = 15
+STATEMENT = 16
+CONCAT = 17
+TAIL_CALL = 18
+CACHED = 19
+
+# call targets
+CALL_ME = 0
+CALL_NAME = 1
+CALL_EXPRESSION = 2
+
+# where a variable lives, set by resolver.py
+SCOPE_UNRESOLVED = 0
+SCOPE_PARAMETER = 1  # index into the frame list
+SCOPE_FIELD = 2  # index into the object's field list
+
+UNSET = object()  # frame value of a CachedNode slot that has not been computed
+
+
+class Node:
+    __slots__ = ("line_num",)
+    kind = None
+
+    def __init__(self, line_num):
+        self.line_num = line_num
+
+
+class PrintNode(Node):
+    __slots__ = ("value",)
+    kind = PRINT
+
+    def __init__(self, line_num, value):
+        super().__init__(line_num)
+        self.value = value
+
+
+class SetNode(Node):
+    __slots__ = ("name", "value", "scope", "index")
+    kind = SET
+
+    def __init__(self, line_num, name, value):
+        super().__init__(line_num)
+        self.name = name
+        self.value = value
+        self.scope = SCOPE_UNRESOLVED
+        self.index = None
+
+
+class WhileNode(Node):
+    __slots__ = ("condition", "body", "single_condition", "cache_slots")
+    kind = WHILE
+
+    def __init__(self, line_num, condition, body):
+        super().__init__(line_num)
+        self.condition = condition
+        self.body = body
+        # set by optimizer.py: a pure condition is evaluated once per iteration,
+        # and cache_slots are the CachedNode slots to clear when the loop starts
+        self.single_condition = False
+        self.cache_slots = ()
+
+
+class InputNode(Node):
+    __slots__ = ("name", "is_int", "scope", "index")
+    kind = INPUT
+
+    def __init__(self, line_num, name, is_int):
+        super().__init__(line_num)
+        self.name = name
+        self.is_int = is_int
+        self.scope = SCOPE_UNRESOLVED
+        self.index = None
+
+
+class ReturnNode(Node):
+    __slots__ = ("value",)  # None for a bare (return)
+    kind = RETURN
+
+    def __init__(self, line_num, value):
+        super().__init__(line_num)
+        self.value = value
+
+
+class CallNode(Node):
+    # target is a name for CALL_ME/CALL_NAME and a node for CALL_EXPRESSION
+    __slots__ = (
+        "target_kind",
+        "target",
+        "method_name",
+        "args",
+        "expression",
+        "target_scope",
+        "target_index",
+        "cached_class",
+        "cached_method",
+        "receiver_classes",
+        "hits",
+        "misses",
+        "static_method",
+    )
+    kind = CALL
+
+    def __init__(self, line_num, target_kind, target, method_name, args, expression):
+        super().__init__(line_num)
+        self.target_kind = target_kind
+        self.target = target
+        self.method_name = method_name
+        self.args = args
+        self.expression = expression  # the parsed call, for error messages
+        self.target_scope = SCOPE_UNRESOLVED  # where a CALL_NAME target lives
+        self.target_index = None
+        # inline cache of the method dispatch, see inlinecache.py
+        self.cached_class = None
+        self.cached_method = None
+        self.receiver_classes = None
+        self.hits = 0
+        self.misses = 0
+        # the method of a call on me, bound by checker.py when it exists and
+        # takes as many arguments as the call passes
+        self.static_method = None
+
+
+class TailCallNode(CallNode):
+    """
+    A call whose result becomes the result of the method, either
+    (return (call ...)) or a call statement in tail position. The engines run
+    it in the caller's frame instead of nesting a new one.
+    """
+
+    __slots__ = ("check_result",)
+    kind = TAIL_CALL
+
+    def __init__(self, call, check_result):
+        super().__init__(
+            call.line_num,
+            call.target_kind,
+            call.target,
+            call.method_name,
+            call.args,
+            call.expression,
+        )
+        self.target_scope = call.target_scope
+        self.target_index = call.target_index
+        self.check_result = check_result  # a returned call must produce a value
+
+
+class IfNode(Node):
+    __slots__ = ("condition", "then_statement", "else_statement")
+    kind = IF
+
+    def __init__(self, line_num, condition, then_statement, else_statement):
+        super().__init__(line_num)
+        self.condition = condition
+        self.then_statement = then_statement
+        self.else_statement = else_statement  # None when there is no else branch
+
+
+class BeginNode(Node):
+    __slots__ = ("statements",)
+    kind = BEGIN
+
+    def __init__(self, line_num, statements):
+        super().__init__(line_num)
+        self.statements = statements
+
+
+class NoopNode(Node):
+    __slots__ = ()
+    kind = NOOP
+
+
+class SyntaxErrorNode(Node):
+    __slots__ = ()
+    kind = SYNTAX_ERROR
+
+
+class InvalidNode(Node):
+    __slots__ = ("expression",)
+    kind = INVALID
+
+    def __init__(self, line_num, expression):
+        super().__init__(line_num)
+        self.expression = expression
+
+
+class ConstNode(Node):
+    __slots__ = ("value",)
+    kind = CONST
+
+    def __init__(self, line_num, value):
+        super().__init__(line_num)
+        self.value = value
+
+
+class NameNode(Node):
+    __slots__ = ("name", "scope", "index")
+    kind = NAME
+
+    def __init__(self, line_num, name):
+        super().__init__(line_num)
+        self.name = name
+        self.scope = SCOPE_UNRESOLVED
+        self.index = None
+
+
+class NewNode(Node):
+    __slots__ = ("class_name", "class_def")
+    kind = NEW
+
+    def __init__(self, line_num, class_name):
+        super().__init__(line_num)
+        self.class_name = class_name
+        self.class_def = None  # set by checker.py when the class exists
+
+
+class BinaryNode(Node):
+    # handler is operations.evaluate_arithmatic or operations.evaluate_logic
+    __slots__ = (
+        "operator",
+        "handler",
+        "left",
+        "right",
+        "specialized",
+        "warmup",
+        "specializations",
+        "deoptimizations",
+    )
+    kind = BINARY
+
+    def __init__(self, line_num, operator, handler, left, right):
+        super().__init__(line_num)
+        self.operator = operator
+        self.handler = handler
+        self.left = left
+        self.right = right
+        # quickening state, see quickening.py
+        self.specialized = None
+        self.warmup = WARMUP
+        self.specializations = 0
+        self.deoptimizations = 0
+
+
+class NotNode(Node):
+    __slots__ = ("operand",)
+    kind = NOT
+
+    def __init__(self, line_num, operand):
+        super().__init__(line_num)
+        self.operand = operand
+
+
+class StatementNode(Node):
+    # a statement used as an expression evaluates to the statement's result
+    __slots__ = ("statement", "expression")
+    kind = STATEMENT
+
+    def __init__(self, line_num, statement, expression):
+        super().__init__(line_num)
+        self.statement = statement
+        self.expression = expression
+
+
+class ConcatNode(Node):
+    # print arguments joined into one string; formatters[i] turns parts[i] into text
+    __slots__ = ("parts", "formatters")
+    kind = CONCAT
+
+    def __init__(self, line_num, parts, formatters):
+        super().__init__(line_num)
+        self.parts = parts
+        self.formatters = formatters
+
+
+class CachedNode(Node):
+    """
+    A loop-invariant expression. It is evaluated the first time the loop
+    reaches it and its value is kept in the frame list at index slot, after
+    the parameters, until the loop starts over.
+    """
+
+    __slots__ = ("expression", "slot")
+    kind = CACHED
+
+    def __init__(self, line_num, expression, slot):
+        super().__init__(line_num)
+        self.expression = expression
+        self.slot = slot
+
+
+def child_statements(statement):
+    kind = statement.kind
+    if kind == WHILE:
+        return [statement.body]
+    elif kind == IF:
+        if statement.else_statement is None:
+            return [statement.then_statement]
+        return [statement.then_statement, statement.else_statement]
+    elif kind == BEGIN:
+        return statement.statements
+    return []
+
+
+def child_expressions(node):
+    kind = node.kind
+    if kind in (PRINT, SET):
+        return [node.value]
+    elif kind in (WHILE, IF):
+        return [node.condition]
+    elif kind == RETURN:
+        return [] if node.value is None else [node.value]
+    elif kind in (CALL, TAIL_CALL):
+        if node.target_kind == CALL_EXPRESSION:
+            return [node.target] + node.args
+        return node.args
+    elif kind == BINARY:
+        return [node.left, node.right]
+    elif kind == NOT:
+        return [node.operand]
+    elif kind == CONCAT:
+        return node.parts
+    elif kind == CACHED:
+        return [node.expression]
+    return []
+
+
+def walk(node):
+    """Every statement and expression reachable from node, in source order."""
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        yield node
+        if node.kind == STATEMENT:
+            pending.append(node.statement)
+        else:
+            pending.extend(reversed(child_statements(node)))
+        pending.extend(reversed(child_expressions(node)))
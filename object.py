@@ -1,467 +1,403 @@
-from intbase import InterpreterBase, ErrorType
-from copy import deepcopy
+from operations import (
+    ARITHMATIC_OPERATIONS,
+    LOGIC_OPERATIONS,
+    arity_error,
+    condition_error,
+    evaluate_not,
+    invalid_expression,
+    malformed_if_error,
+    null_reference_error,
+    to_print_string,
+    unknown_class_error,
+    unknown_method_error,
+    unknown_name_error,
+)
+from inlinecache import lookup_method
+from memoizer import MISSING, get_memo_key
+from quickening import DEOPTIMIZE, quicken
+import nodes
+from nodes import SCOPE_FIELD, SCOPE_PARAMETER, UNSET
+
+
+class TailCall:
+    """Returned by a tail call so that run_method runs it in the same frame."""
+
+    __slots__ = ("receiver", "method", "args", "expression")
+
+    def __init__(self, receiver, method, args, expression):
+        self.receiver = receiver
+        self.method = method
+        self.args = args
+        self.expression = expression  # set when the result must not be None
+
+
 class ObjectDefinition:
     NO_RETURN_VALUE = "N_R_V"
-    LOGIC_OPERATIONS = ["<", ">", "<=", ">=", "!=", "==", "&", "|"]
-    ARITHMATIC_OPERATIONS = ["+", "-", "*", "/", "%"]
+    LOGIC_OPERATIONS = LOGIC_OPERATIONS
+    ARITHMATIC_OPERATIONS = ARITHMATIC_OPERATIONS
 
-    def __init__(self, interpreter_obj, methods, fields):
-        self.fields = {}
-        self.methods = {}
+    # methods live on the class definition; an object only owns its field
+    # values, in the order of ClassDefinition.field_index
+    __slots__ = ("class_def", "fields", "interpreter_obj")
 
+    # subclasses that set HOOKS get enter_method and leave_method around every
+    # method run, tail calls included, and back_edge after every run of a while body
+    HOOKS = False
 
-        for method in methods.values():
-            self.methods[method.get_name()] = deepcopy(method)
-        for field in fields.values():
-            self.fields[field.get_name()] = field.get_initial_value()
-
+    def __init__(self, interpreter_obj, class_def):
+        self.class_def = class_def
+        self.fields = class_def.get_field_template().copy()
         self.interpreter_obj = interpreter_obj
 
+    @property
+    def methods(self):
+        return self.class_def.methods
+
     def create_object(self, class_name):
         if class_name not in self.interpreter_obj.get_classes():
-            self.interpreter_obj.error(
-                ErrorType.TYPE_ERROR, f"Class named {class_name} does not exist"
-            )
+            self.interpreter_obj.error(*unknown_class_error(class_name))
 
         class_def = self.interpreter_obj.get_classes()[class_name]
         obj = class_def.instantiate_object()
         return obj
 
-    def call_method(self, method_name, evaluated_args):
-        if method_name not in self.methods:
-            self.interpreter_obj.error(
-                ErrorType.NAME_ERROR, f"Method {method_name} does not exist"
-            )
+    def get_method(self, method_name, evaluated_args):
+        methods = self.class_def.methods
+        if method_name not in methods:
+            self.interpreter_obj.error(*unknown_method_error(method_name))
 
-        method = self.methods[method_name]
+        method = methods[method_name]
 
         if len(evaluated_args) != len(method.parameters):
             self.interpreter_obj.error(
-                ErrorType.TYPE_ERROR,
-                f"Method {method_name} expected {len(method.parameters)} parameters, but gets only {len(evaluated_args)}",
+                *arity_error(method_name, len(method.parameters), len(evaluated_args))
             )
+        return method
 
-        # Create a dictionary of param_name: param_value pair
-        parameter_values = {
-            param_name: param_value
-            for param_name, param_value in zip(method.get_parameters(), evaluated_args)
-        }
+    def call_method(self, method_name, evaluated_args):
+        return self.run_method(self.get_method(method_name, evaluated_args), evaluated_args)
+
+    def run_method(self, method, evaluated_args):
+        hooks = self.HOOKS
+        obj = self
+        checked_expression = None
+        pending = None  # (memo, key) of the memoized tail calls run in this frame
+        while True:
+            body = method.body
+            if body is None:
+                body = obj.class_def.prepare_method(method)  # its first call
+            # the frame is the argument list, followed by the cache slots if any
+            parameter_values = evaluated_args
+            if method.frame_padding:
+                parameter_values = evaluated_args + method.frame_padding
+
+            if hooks:
+                obj.enter_method(method)
+            try:
+                result = obj.STATEMENT_HANDLERS[body.kind](obj, body, parameter_values)
+            finally:
+                if hooks:
+                    obj.leave_method(method)
+            if result.__class__ is not TailCall:
+                break
+            # run the tail call in this frame instead of nesting another one
+            obj = result.receiver
+            method = result.method
+            evaluated_args = result.args
+            if result.expression is not None:
+                checked_expression = result.expression
+            if method.memo is not None:
+                key = get_memo_key(evaluated_args)
+                if key is not None:
+                    result = method.memo.get(key)
+                    if result is not MISSING:
+                        break
+                    if pending is None:
+                        pending = []
+                    pending.append((method.memo, key))
 
-        statement = method.get_top_level_statement()
-        result = self.execute_statement(statement, parameter_values)
         if result == self.NO_RETURN_VALUE:
-            return
-        return result
-
-    def execute_statement(self, statement, parameter_values=None):
-        if parameter_values is None:
-            parameter_values = {}
-
-        if self.is_print_statement(statement):
-            result = self.execute_print(statement, parameter_values)
-        elif self.is_set_statement(statement):
-            result = self.execute_set_statement(statement, parameter_values)
-        elif self.is_while_statement(statement):
-            result = self.execute_while_statement(statement, parameter_values)
-        elif self.is_input_statement(statement):
-            result = self.execute_input_statement(statement, parameter_values)
-        elif self.is_return_statement(statement):
-            result = self.execute_return_statement(statement, parameter_values)
-        elif self.is_call_statement(statement):
-            result = self.execute_call_statement(statement, parameter_values)
-        elif self.is_if_statement(statement):
-            result = self.execute_if_statement(statement, parameter_values)
-        elif self.is_begin_statement(statement):
-            result = self.execute_all_nested_statements(statement, parameter_values)
-        else:
             result = None
+        if result is None and checked_expression is not None:
+            raise invalid_expression(checked_expression)
+        if pending is not None:
+            # every call of a tail chain returns what its last call returns
+            for memo, key in pending:
+                memo.store(key, result)
         return result
 
-    def is_print_statement(self, statement):
-        return (
-            isinstance(statement, list)
-            and len(statement) != 0
-            and statement[0] == InterpreterBase.PRINT_DEF
-        )
+    def enter_method(self, method):
+        pass
 
-    def execute_print(self, statement, parameter_values):
-        print_flag = statement[0] == InterpreterBase.PRINT_DEF
-        expression = statement[1:]
-        value = self.evaluate_expression(expression, parameter_values, print_flag)
-        if isinstance(value, bool):
-            value = InterpreterBase.TRUE_DEF if value == True else InterpreterBase.FALSE_DEF
-        self.interpreter_obj.output(str(value))
-
-    def is_set_statement(self, statement):
-        return (
-            isinstance(statement, list)
-            and len(statement) != 0
-            and statement[0] == InterpreterBase.SET_DEF
-        )
+    def leave_method(self, method):
+        pass
 
-    def execute_set_statement(self, statement, parameter_values=None):
-        if parameter_values is None:
-            parameter_values = {}
+    def back_edge(self):
+        pass
 
-        value = self.evaluate_expression(statement[2], parameter_values)
+    # Handlers dispatch on node kind through STATEMENT_HANDLERS and
+    # EXPRESSION_HANDLERS directly, which keeps the Python stack shallow.
+    def execute_statement(self, statement, parameter_values):
+        return self.STATEMENT_HANDLERS[statement.kind](self, statement, parameter_values)
 
-        self.set_variable_value(value, statement[1], parameter_values)
+    def execute_print(self, statement, parameter_values):
+        expression = statement.value
+        value = self.EXPRESSION_HANDLERS[expression.kind](self, expression, parameter_values)
+        self.interpreter_obj.output(to_print_string(value))
 
-    def is_input_statement(self, statement):
-        return (
-            isinstance(statement, list)
-            and len(statement) != 0
-            and (
-                statement[0] == InterpreterBase.INPUT_STRING_DEF
-                or statement[0] == InterpreterBase.INPUT_INT_DEF
-            )
-        )
+    def execute_set_statement(self, statement, parameter_values):
+        expression = statement.value
+        value = self.EXPRESSION_HANDLERS[expression.kind](self, expression, parameter_values)
+
+        self.set_variable_value(value, statement, parameter_values)
 
     def execute_input_statement(self, statement, parameter_values):
-        input_value = self.interpreter_obj.get_input()
-        self.set_variable_value(input_value, statement[1], parameter_values)
-
-    def is_call_statement(self, statement):
-        return (
-            isinstance(statement, list)
-            and len(statement) != 0
-            and statement[0] == InterpreterBase.CALL_DEF
-        )
+        if statement.is_int:
+            input_value = self.interpreter_obj.get_int_input()
+        else:
+            input_value = self.interpreter_obj.get_input()
+        self.set_variable_value(input_value, statement, parameter_values)
 
     def execute_call_statement(self, statement, parameter_values):
-        object_name = statement[1]
-        if isinstance(object_name, list):
-            object_name = self.evaluate_expression(object_name, parameter_values)
+        target_kind = statement.target_kind
+        if target_kind == nodes.CALL_EXPRESSION:
+            target = statement.target
+            receiver = self.EXPRESSION_HANDLERS[target.kind](self, target, parameter_values)
 
-        function_name = statement[2] 
-        args = statement[3:]
+        evaluate = self.EXPRESSION_HANDLERS
         evaluated_args = [
-            self.evaluate_expression(arg, parameter_values) for arg in args
+            evaluate[arg.kind](self, arg, parameter_values) for arg in statement.args
         ]
 
-        # Calling the method with the evaluated arguments
-        if object_name == InterpreterBase.ME_DEF:
-            return self.call_method(function_name, evaluated_args)
-        elif object_name in self.fields:
-            if self.fields[object_name] is None:
-                self.interpreter_obj.error(
-                    ErrorType.FAULT_ERROR, f"{object_name} is a null object reference"
-                )
-            return self.fields[object_name].call_method(function_name, evaluated_args)
-        elif object_name in parameter_values:
-            if parameter_values[object_name] is None:
-                self.interpreter_obj.error(
-                    ErrorType.FAULT_ERROR, f"{object_name} is a null object reference"
-                )
-            return parameter_values[object_name].call_method(function_name, evaluated_args)
+        method = statement.static_method
+        if method is not None:
+            receiver = self  # a call on me, checked by checker.py
+        else:
+            if target_kind == nodes.CALL_ME:
+                receiver = self
+            elif target_kind == nodes.CALL_NAME:
+                receiver = self.get_receiver(statement, parameter_values)
+
+            if receiver.class_def is statement.cached_class:
+                method = statement.cached_method
+                statement.hits += 1
+            else:
+                method = lookup_method(statement, receiver, evaluated_args)
+        memo = method.memo
+        if memo is None:
+            result = receiver.run_method(method, evaluated_args)
         else:
-            object_name.call_method(function_name, evaluated_args)
+            key = get_memo_key(evaluated_args)
+            result = MISSING if key is None else memo.get(key)
+            if result is MISSING:
+                result = receiver.run_method(method, evaluated_args)
+                if key is not None:
+                    memo.store(key, result)  # calls that raise are not stored
+        if target_kind != nodes.CALL_EXPRESSION:
+            return result  # the result of calling an evaluated expression is dropped
+
+    def execute_tail_call(self, statement, parameter_values):
+        evaluate = self.EXPRESSION_HANDLERS
+        evaluated_args = [
+            evaluate[arg.kind](self, arg, parameter_values) for arg in statement.args
+        ]
 
-    def is_while_statement(self, statement):
-        return (
-            isinstance(statement, list)
-            and len(statement) > 0
-            and statement[0] == InterpreterBase.WHILE_DEF
-        )
-    
-    def is_if_statement(self, statement):
-        return (
-            isinstance(statement, list)
-            and len(statement) != 0
-            and statement[0] == InterpreterBase.IF_DEF
-        )
-    
-    def is_return_statement(self, statement):
-        return (
-            isinstance(statement, list)
-            and len(statement) > 0
-            and statement[0] == InterpreterBase.RETURN_DEF
-        )
-    
-    def is_begin_statement(self, statement):
-        return (
-            isinstance(statement, list)
-            and len(statement) > 0
-            and statement[0] == InterpreterBase.BEGIN_DEF
-        )
+        receiver = self
+        method = statement.static_method
+        if method is None:
+            if statement.target_kind == nodes.CALL_NAME:
+                receiver = self.get_receiver(statement, parameter_values)
+            if receiver.class_def is statement.cached_class:
+                method = statement.cached_method
+                statement.hits += 1
+            else:
+                method = lookup_method(statement, receiver, evaluated_args)
+
+        expression = statement.expression if statement.check_result else None
+        return TailCall(receiver, method, evaluated_args, expression)
+
+    def get_receiver(self, statement, parameter_values):
+        # the name of an unknown target is returned as is and fails to be called
+        if statement.target_scope == SCOPE_FIELD:
+            receiver = self.fields[statement.target_index]
+        elif statement.target_scope == SCOPE_PARAMETER:
+            receiver = parameter_values[statement.target_index]
+        else:
+            return statement.target
+        if receiver is None:
+            self.interpreter_obj.error(*null_reference_error(statement.target))
+        return receiver
 
     def execute_while_statement(self, statement, parameter_values):
-        condition = statement[1]
-        body = statement[2]
+        condition = statement.condition
+        body = statement.body
+        evaluate_condition = self.EXPRESSION_HANDLERS[condition.kind]
+        execute_body = self.STATEMENT_HANDLERS[body.kind]
+        back_edge = self.back_edge if self.HOOKS else None
+        for slot in statement.cache_slots:
+            parameter_values[slot] = UNSET  # invariants of the previous run
 
-        result = self.evaluate_expression(condition, parameter_values)
+        result = evaluate_condition(self, condition, parameter_values)
 
         if not isinstance(result, bool):
-            self.interpreter_obj.error(
-                ErrorType.TYPE_ERROR,
-                f"The condition in the while statement must be a boolean",
-            )
-
-        while self.evaluate_expression(condition, parameter_values):
-            result = self.execute_statement(body, parameter_values)
+            self.interpreter_obj.error(*condition_error("while"))
+
+        if statement.single_condition:
+            while result:
+                body_result = execute_body(self, body, parameter_values)
+                if body_result is not None:
+                    return body_result
+                if back_edge is not None:
+                    back_edge()
+                result = evaluate_condition(self, condition, parameter_values)
+            return None
+
+        while evaluate_condition(self, condition, parameter_values):
+            result = execute_body(self, body, parameter_values)
             if result is not None:
                 return result
+            if back_edge is not None:
+                back_edge()
 
     def execute_if_statement(self, statement, parameter_values):
-        if len(statement) < 3:  # verify the syntax of if statement
-            self.interpreter_obj.error(ErrorType.SYNTAX_ERROR)
-
-        condition = statement[1]
-        result = self.evaluate_expression(condition, parameter_values)
+        condition = statement.condition
+        result = self.EXPRESSION_HANDLERS[condition.kind](self, condition, parameter_values)
 
         if not isinstance(result, bool):
-            self.interpreter_obj.error(
-                ErrorType.TYPE_ERROR,
-                f"The condition in the if statement must be a boolean",
-            )
+            self.interpreter_obj.error(*condition_error("if"))
 
         if result == True:
-            return self.execute_statement(
-                statement[2], parameter_values
-            )  # execute true statements
-        elif len(statement) > 3:
-            return self.execute_statement(
-                statement[3], parameter_values
-            )  # execute false statements if exists
+            branch = statement.then_statement  # execute true statements
+        elif statement.else_statement is not None:
+            branch = statement.else_statement  # execute false statements if exists
         else:
             return
+        return self.STATEMENT_HANDLERS[branch.kind](self, branch, parameter_values)
 
     def execute_return_statement(self, statement, parameter_values):
-        if len(statement) == 1:
+        expression = statement.value
+        if expression is None:
             return self.NO_RETURN_VALUE
-        return self.evaluate_expression(statement[1], parameter_values)
+        return self.EXPRESSION_HANDLERS[expression.kind](self, expression, parameter_values)
 
     def execute_all_nested_statements(self, statements, parameter_values):
-        if parameter_values is None:
-            parameter_values = {}
-
-        for statement in statements[1:]:
-            result = self.execute_statement(statement, parameter_values)
+        execute = self.STATEMENT_HANDLERS
+        for statement in statements.statements:
+            result = execute[statement.kind](self, statement, parameter_values)
             if result is not None:
                 return result
 
-    def evaluate_expression(self, expression, parameter_values, print_flag = False):
-        if isinstance(expression, str):
-            if expression.startswith('"') and expression.endswith('"'):  # String literal
-                return expression[1:-1]
-            elif expression.isdigit():  # Integer literal
-                return int(expression)
-            elif isinstance(expression, bool):
-                return expression
-            elif expression == InterpreterBase.NULL_DEF:
-                return None
-            elif expression == InterpreterBase.TRUE_DEF:  # Boolean true literal
-                return True
-            elif expression == InterpreterBase.FALSE_DEF:  # Boolean false literal
-                return False
-            else:  # Assume the expression is a variable name
-                return self.get_variable_value(expression, parameter_values)
-
-        elif isinstance(expression, list):
-            operator = expression[0]
-            operands = expression[1:]
-
-            if operator == InterpreterBase.NEW_DEF:
-                class_name = expression[1]
-                if class_name not in self.interpreter_obj.classes:
-                    self.interpreter_obj.error(
-                        ErrorType.TYPE_ERROR, f"class {class_name} does not exist"
-                    )
-                new_object = self.create_object(class_name)
-                return new_object
-
-            if isinstance(expression, list):
-                statement_result = self.execute_statement(expression, parameter_values)
-                if statement_result != None:
-                    return statement_result
-
-            if isinstance(expression[0], list):
-                statement_result = self.evaluate_expression(
-                    expression[0], parameter_values
-                )
-                if statement_result != None:
-                    return statement_result
-
-            if operator in self.ARITHMATIC_OPERATIONS:
-                left_operand = self.evaluate_expression(operands[0], parameter_values)
-                right_operand = self.evaluate_expression(operands[1], parameter_values)
-
-                if isinstance(left_operand, str) and left_operand.isdigit():
-                    left_operand = int(left_operand)
-
-                if isinstance(right_operand, str) and right_operand.isdigit():
-                    right_operand = int(right_operand)
-
-                if type(left_operand) == int and type(right_operand) == int:
-                    if operator == "+":
-                        return left_operand + right_operand
-                    elif operator == "-":
-                        return left_operand - right_operand
-                    elif operator == "*":
-                        return left_operand * right_operand
-                    elif operator == "/":
-                        return left_operand // right_operand
-                    elif operator == "%":
-                        return left_operand % right_operand
-                elif isinstance(left_operand, str) and isinstance(right_operand, str):
-                    if operator == "+":
-                        return left_operand + right_operand
-                    else:
-                        self.interpreter_obj.error(
-                            ErrorType.TYPE_ERROR,
-                            f"Can't use operator {operator} with value {left_operand} and {right_operand}",
-                        )
-                else:
-                    self.interpreter_obj.error(
-                        ErrorType.TYPE_ERROR,
-                        f"Can't use operator {operator} with value {left_operand} and {right_operand}",
-                    )
-
-            elif operator in self.LOGIC_OPERATIONS:
-                left_operand = self.evaluate_expression(operands[0], parameter_values)
-                right_operand = self.evaluate_expression(operands[1], parameter_values)
-
-                if isinstance(left_operand, str) and left_operand.isdigit():
-                    left_operand = int(left_operand)
-
-                if isinstance(right_operand, str) and right_operand.isdigit():
-                    right_operand = int(right_operand)
-
-                if isinstance(left_operand, int) != isinstance(right_operand, int):
-                    self.interpreter_obj.error(
-                        ErrorType.TYPE_ERROR,
-                        f"Can't use operator {operator} with value {left_operand} and {right_operand}",
-                    )
-
-                if operator == "<":
-                    if isinstance(left_operand, bool) or isinstance(
-                        right_operand, bool
-                    ):
-                        self.interpreter_obj.error(
-                            ErrorType.TYPE_ERROR,
-                            f"Can't use operator {operator} with value {left_operand} and {right_operand}",
-                        )
-                    return left_operand < right_operand
-                elif operator == ">":
-                    if isinstance(left_operand, bool) or isinstance(
-                        right_operand, bool
-                    ):
-                        self.interpreter_obj.error(
-                            ErrorType.TYPE_ERROR,
-                            f"Can't use operator {operator} with value {left_operand} and {right_operand}",
-                        )
-                    return left_operand > right_operand
-                elif operator == "<=":
-                    if isinstance(left_operand, bool) or isinstance(
-                        right_operand, bool
-                    ):
-                        self.interpreter_obj.error(
-                            ErrorType.TYPE_ERROR,
-                            f"Can't use operator {operator} with value {left_operand} and {right_operand}",
-                        )
-                    return left_operand <= right_operand
-                elif operator == ">=":
-                    if isinstance(left_operand, bool) or isinstance(
-                        right_operand, bool
-                    ):
-                        self.interpreter_obj.error(
-                            ErrorType.TYPE_ERROR,
-                            f"Can't use operator {operator} with value {left_operand} and {right_operand}",
-                        )
-                    return left_operand >= right_operand
-                elif operator == "!=":
-                    raise_error = False
-                    if isinstance(left_operand, (int, bool, str)):
-                        if not isinstance(right_operand, (int, bool, str)):
-                            raise_error = True
-                        if type(left_operand) != type(right_operand):
-                            raise_error = True
-                    
-                    if isinstance(right_operand, (int, bool, str)):
-                        if not isinstance(left_operand, (int, bool, str)):
-                            raise_error = True
-                        if type(left_operand) != type(right_operand):
-                            raise_error = True
-                    
-                    if raise_error:
-                        self.interpreter_obj.error(
-                            ErrorType.TYPE_ERROR,
-                            f"Can't use operator {operator} with value {left_operand} and {right_operand}",
-                        )
-                    return left_operand != right_operand
-                elif operator == "==":
-                    raise_error = False
-                    if isinstance(left_operand, (int, bool, str)):
-                        if not isinstance(right_operand, (int, bool, str)):
-                            raise_error = True
-                        if type(left_operand) != type(right_operand):
-                            raise_error = True
-                    
-                    if isinstance(right_operand, (int, bool, str)):
-                        if not isinstance(left_operand, (int, bool, str)):
-                            raise_error = True
-                        if type(left_operand) != type(right_operand):
-                            raise_error = True
-                    
-                    if raise_error:
-                        self.interpreter_obj.error(
-                            ErrorType.TYPE_ERROR,
-                            f"Can't use operator {operator} with value {left_operand} and {right_operand}",
-                        )
-                    return left_operand == right_operand
-                elif operator == "&":
-                    if not isinstance(left_operand, bool) or not isinstance(right_operand, bool):
-                        self.interpreter_obj.error(ErrorType.TYPE_ERROR, f"Can't use operator {operator} with value {left_operand} and {right_operand}")
-                    return left_operand & right_operand
-                elif operator == "|":
-                    if not isinstance(left_operand, bool) or not isinstance(right_operand, bool):
-                        self.interpreter_obj.error(ErrorType.TYPE_ERROR, f"Can't use operator {operator} with value {left_operand} and {right_operand}")
-                    return left_operand | right_operand
-
-            elif operator == "!":
-                operand = self.evaluate_expression(operands[0], parameter_values)
-                if isinstance(operand, bool):
-                    return True if operand == False else False
-                else:
-                    self.interpreter_obj.error(ErrorType.TYPE_ERROR, f"Can't use operator {operator} with value {left_operand} and {right_operand}")
-
-            elif print_flag == True:
-                string_value = ""
-                for val in expression:
-                    if isinstance(val, list):
-                        statement_result = self.evaluate_expression(
-                            val, parameter_values
-                        )
-                        if statement_result != None:
-                            string_value += str(statement_result)
-                    elif not (val.startswith('"') and val.endswith('"')):
-                        res = self.evaluate_expression(val, parameter_values)
-                        if isinstance(res, bool):
-                            res = InterpreterBase.TRUE_DEF if res else InterpreterBase.FALSE_DEF
-                        string_value += str(res)
-                    else:
-                        string_value += val[1:-1]
-                return string_value
-            else:
-                raise Exception(f"Invalid expression: {expression}")
+    def execute_noop(self, statement, parameter_values):
+        return None
+
+    def execute_syntax_error(self, statement, parameter_values):
+        self.interpreter_obj.error(*malformed_if_error())
+
+    def execute_invalid(self, statement, parameter_values):
+        raise invalid_expression(statement.expression)
+
+    def evaluate_expression(self, expression, parameter_values):
+        return self.EXPRESSION_HANDLERS[expression.kind](self, expression, parameter_values)
+
+    def evaluate_constant(self, expression, parameter_values):
+        return expression.value
+
+    def evaluate_variable(self, expression, parameter_values):
+        scope = expression.scope
+        if scope == SCOPE_PARAMETER:
+            return parameter_values[expression.index]
+        elif scope == SCOPE_FIELD:
+            return self.fields[expression.index]
+        self.interpreter_obj.error(*unknown_name_error())
+
+    def evaluate_new(self, expression, parameter_values):
+        if expression.class_def is not None:
+            return expression.class_def.instantiate_object()
+        return self.create_object(expression.class_name)
+
+    def evaluate_binary(self, expression, parameter_values):
+        evaluate = self.EXPRESSION_HANDLERS
+        left, right = expression.left, expression.right
+        left_operand = evaluate[left.kind](self, left, parameter_values)
+        right_operand = evaluate[right.kind](self, right, parameter_values)
+        specialized = expression.specialized
+        if specialized is not None:
+            result = specialized(left_operand, right_operand)
+            if result is not DEOPTIMIZE:
+                return result
+        return quicken(expression, self.interpreter_obj, left_operand, right_operand)
 
-        else:
-            raise Exception(f"Invalid expression: {expression}")
+    def evaluate_not_expression(self, expression, parameter_values):
+        operand = expression.operand
+        operand = self.EXPRESSION_HANDLERS[operand.kind](self, operand, parameter_values)
+        return evaluate_not(self.interpreter_obj, operand)
 
+    def evaluate_call(self, expression, parameter_values):
+        result = self.execute_call_statement(expression, parameter_values)
+        if result is None:
+            raise invalid_expression(expression.expression)
+        return result
 
-    def get_variable_value(self, variable_name, parameter_values):
-        if variable_name in parameter_values:
-            return parameter_values[variable_name]
-        elif variable_name in self.fields:
-            return self.fields[variable_name]
-        else:
-            self.interpreter_obj.error(ErrorType.NAME_ERROR)
+    def evaluate_statement(self, expression, parameter_values):
+        statement = expression.statement
+        result = self.STATEMENT_HANDLERS[statement.kind](self, statement, parameter_values)
+        if result is None:
+            raise invalid_expression(expression.expression)
+        return result
 
-    def set_variable_value(self, value, variable_name, parameter_values):
-        if variable_name not in parameter_values and variable_name not in self.fields:
-            self.interpreter_obj.error(ErrorType.NAME_ERROR)
+    def evaluate_cached(self, expression, parameter_values):
+        value = parameter_values[expression.slot]
+        if value is not UNSET:
+            return value
+        cached = expression.expression
+        value = self.EXPRESSION_HANDLERS[cached.kind](self, cached, parameter_values)
+        parameter_values[expression.slot] = value
+        return value
+
+    def evaluate_concat(self, expression, parameter_values):
+        evaluate = self.EXPRESSION_HANDLERS
+        return "".join(
+            [
+                formatter(evaluate[part.kind](self, part, parameter_values))
+                for part, formatter in zip(expression.parts, expression.formatters)
+            ]
+        )
 
-        if variable_name in parameter_values:
-            parameter_values[variable_name] = value
+    STATEMENT_HANDLERS = {
+        nodes.PRINT: execute_print,
+        nodes.SET: execute_set_statement,
+        nodes.WHILE: execute_while_statement,
+        nodes.INPUT: execute_input_statement,
+        nodes.RETURN: execute_return_statement,
+        nodes.CALL: execute_call_statement,
+        nodes.TAIL_CALL: execute_tail_call,
+        nodes.IF: execute_if_statement,
+        nodes.BEGIN: execute_all_nested_statements,
+        nodes.NOOP: execute_noop,
+        nodes.SYNTAX_ERROR: execute_syntax_error,
+        nodes.INVALID: execute_invalid,
+    }
+
+    EXPRESSION_HANDLERS = {
+        nodes.CONST: evaluate_constant,
+        nodes.NAME: evaluate_variable,
+        nodes.NEW: evaluate_new,
+        nodes.BINARY: evaluate_binary,
+        nodes.NOT: evaluate_not_expression,
+        nodes.CALL: evaluate_call,
+        nodes.TAIL_CALL: execute_tail_call,
+        nodes.STATEMENT: evaluate_statement,
+        nodes.CONCAT: evaluate_concat,
+        nodes.CACHED: evaluate_cached,
+        nodes.INVALID: execute_invalid,
+    }
+
+    def set_variable_value(self, value, variable, parameter_values):
+        # variable is a SetNode or InputNode, resolved by resolver.py
+        scope = variable.scope
+        if scope == SCOPE_PARAMETER:
+            parameter_values[variable.index] = value
+        elif scope == SCOPE_FIELD:
+            self.fields[variable.index] = value
         else:
-            self.fields[variable_name] = value
\ No newline at end of file
+            self.interpreter_obj.error(*unknown_name_error())
\ No newline at end of file
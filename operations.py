@@ -0,0 +1,158 @@
+from intbase import InterpreterBase, ErrorType
+from rope import Rope, concat
+
+LOGIC_OPERATIONS = ["<", ">", "<=", ">=", "!=", "==", "&", "|"]
+ARITHMATIC_OPERATIONS = ["+", "-", "*", "/", "%"]
+NOT_OPERATION = "!"
+STRING_TYPES = (str, Rope)
+
+
+def coerce_operand(operand):
+    # strings made only of digits take part in operations as integers; the
+    # result of + never is one, so ropes are left alone
+    if isinstance(operand, str) and operand.isdigit():
+        return int(operand)
+    return operand
+
+
+def operation_error(interpreter_obj, operator, left_operand, right_operand):
+    interpreter_obj.error(
+        ErrorType.TYPE_ERROR,
+        f"Can't use operator {operator} with value {left_operand} and {right_operand}",
+    )
+
+
+# The errors the engines raise at run time, as (ErrorType, message) pairs for
+# interpreter_obj.error; checker.py reports the same pairs ahead of time.
+def unknown_class_error(class_name):
+    return ErrorType.TYPE_ERROR, f"class {class_name} does not exist"
+
+
+def unknown_method_error(method_name):
+    return ErrorType.NAME_ERROR, f"Method {method_name} does not exist"
+
+
+def arity_error(method_name, parameter_count, arg_count):
+    return (
+        ErrorType.TYPE_ERROR,
+        f"Method {method_name} expected {parameter_count} parameters, but gets only {arg_count}",
+    )
+
+
+def null_reference_error(target):
+    return ErrorType.FAULT_ERROR, f"{target} is a null object reference"
+
+
+def condition_error(statement_name):
+    # statement_name is "if" or "while"
+    return (
+        ErrorType.TYPE_ERROR,
+        f"The condition in the {statement_name} statement must be a boolean",
+    )
+
+
+def unknown_name_error(name=None):
+    # the engines raise it without a message, as the original interpreter did
+    return ErrorType.NAME_ERROR, None if name is None else f"Unknown name {name}"
+
+
+def malformed_if_error():
+    return ErrorType.SYNTAX_ERROR, "Malformed if statement"
+
+
+def invalid_expression(expression):
+    # a call whose result is used but that returned nothing; not a Brewin error
+    return Exception(f"Invalid expression: {expression}")
+
+
+def evaluate_arithmatic(interpreter_obj, operator, left_operand, right_operand):
+    left_operand = coerce_operand(left_operand)
+    right_operand = coerce_operand(right_operand)
+
+    if type(left_operand) == int and type(right_operand) == int:
+        if operator == "+":
+            return left_operand + right_operand
+        elif operator == "-":
+            return left_operand - right_operand
+        elif operator == "*":
+            return left_operand * right_operand
+        elif operator == "/":
+            return left_operand // right_operand
+        elif operator == "%":
+            return left_operand % right_operand
+    elif isinstance(left_operand, STRING_TYPES) and isinstance(
+        right_operand, STRING_TYPES
+    ):
+        if operator == "+":
+            return concat(left_operand, right_operand)
+    operation_error(interpreter_obj, operator, left_operand, right_operand)
+
+
+def is_mismatched_equality(left_operand, right_operand):
+    raise_error = False
+    if isinstance(left_operand, (int, bool, str)):
+        if not isinstance(right_operand, (int, bool, str)):
+            raise_error = True
+        if type(left_operand) != type(right_operand):
+            raise_error = True
+
+    if isinstance(right_operand, (int, bool, str)):
+        if not isinstance(left_operand, (int, bool, str)):
+            raise_error = True
+        if type(left_operand) != type(right_operand):
+            raise_error = True
+    return raise_error
+
+
+def evaluate_logic(interpreter_obj, operator, left_operand, right_operand):
+    if left_operand.__class__ is Rope:
+        left_operand = str(left_operand)
+    if right_operand.__class__ is Rope:
+        right_operand = str(right_operand)
+    left_operand = coerce_operand(left_operand)
+    right_operand = coerce_operand(right_operand)
+
+    if isinstance(left_operand, int) != isinstance(right_operand, int):
+        operation_error(interpreter_obj, operator, left_operand, right_operand)
+
+    if operator in ("<", ">", "<=", ">="):
+        if isinstance(left_operand, bool) or isinstance(right_operand, bool):
+            operation_error(interpreter_obj, operator, left_operand, right_operand)
+        if operator == "<":
+            return left_operand < right_operand
+        elif operator == ">":
+            return left_operand > right_operand
+        elif operator == "<=":
+            return left_operand <= right_operand
+        return left_operand >= right_operand
+    elif operator == "!=":
+        if is_mismatched_equality(left_operand, right_operand):
+            operation_error(interpreter_obj, operator, left_operand, right_operand)
+        return left_operand != right_operand
+    elif operator == "==":
+        if is_mismatched_equality(left_operand, right_operand):
+            operation_error(interpreter_obj, operator, left_operand, right_operand)
+        return left_operand == right_operand
+    elif operator == "&":
+        if not isinstance(left_operand, bool) or not isinstance(right_operand, bool):
+            operation_error(interpreter_obj, operator, left_operand, right_operand)
+        return left_operand & right_operand
+    elif operator == "|":
+        if not isinstance(left_operand, bool) or not isinstance(right_operand, bool):
+            operation_error(interpreter_obj, operator, left_operand, right_operand)
+        return left_operand | right_operand
+
+
+def evaluate_not(interpreter_obj, operand):
+    if isinstance(operand, bool):
+        return not operand
+    interpreter_obj.error(
+        ErrorType.TYPE_ERROR,
+        f"Can't use operator {NOT_OPERATION} with value {operand}",
+    )
+
+
+def to_print_string(value):
+    if isinstance(value, bool):
+        return InterpreterBase.TRUE_DEF if value else InterpreterBase.FALSE_DEF
+    return str(value)
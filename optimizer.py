@@ -0,0 +1,306 @@
+"""
+Load-time optimizer for lowered method bodies, enabled with
+Interpreter(optimize=True). The passes keep the output and errors of the
+program the same:
+
+- fold_constants evaluates operators whose operands are constants. A fold
+  that would fail is left in place so the error still happens at runtime.
+- prune_branches drops if/while branches with constant conditions and
+  flattens nested begins.
+- single_condition makes a while loop with a pure condition evaluate it once
+  per iteration instead of twice on the first one.
+- hoist_invariants caches pure expressions that cannot change inside a loop,
+  see nodes.CachedNode.
+"""
+
+from rope import Rope
+import nodes
+from nodes import (
+    BeginNode,
+    CachedNode,
+    ConstNode,
+    NoopNode,
+    child_expressions,
+    child_statements,
+    walk,
+)
+
+
+class FoldingError(Exception):
+    pass
+
+
+class FoldingErrorSink:
+    """Takes the interpreter's place while folding; any error defers the fold."""
+
+    def error(self, error_type, description=None, line_num=None):
+        raise FoldingError(description)
+
+
+# expressions that neither have side effects nor create new values each time
+PURE_KINDS = (
+    nodes.CONST,
+    nodes.NAME,
+    nodes.BINARY,
+    nodes.NOT,
+    nodes.CONCAT,
+    nodes.CACHED,
+)
+CALL_KINDS = (nodes.CALL, nodes.TAIL_CALL)
+
+
+def rewrite_expressions(node, rewrite):
+    """Replaces every direct child expression of node with rewrite(child)."""
+    kind = node.kind
+    if kind in (nodes.PRINT, nodes.SET):
+        node.value = rewrite(node.value)
+    elif kind in (nodes.WHILE, nodes.IF):
+        node.condition = rewrite(node.condition)
+    elif kind == nodes.RETURN:
+        if node.value is not None:
+            node.value = rewrite(node.value)
+    elif kind in CALL_KINDS:
+        if node.target_kind == nodes.CALL_EXPRESSION:
+            node.target = rewrite(node.target)
+        node.args = [rewrite(arg) for arg in node.args]
+    elif kind == nodes.BINARY:
+        node.left = rewrite(node.left)
+        node.right = rewrite(node.right)
+    elif kind == nodes.NOT:
+        node.operand = rewrite(node.operand)
+    elif kind == nodes.CONCAT:
+        node.parts = [rewrite(part) for part in node.parts]
+    elif kind == nodes.CACHED:
+        node.expression = rewrite(node.expression)
+
+
+class Optimizer:
+    PASSES = ("fold_constants", "prune_branches", "single_condition", "hoist_invariants")
+
+    def __init__(self):
+        self.folding_sink = FoldingErrorSink()
+        self.stats = {
+            "folded_expressions": 0,
+            "deferred_folds": 0,
+            "pruned_branches": 0,
+            "flattened_blocks": 0,
+            "single_condition_loops": 0,
+            "hoisted_expressions": 0,
+        }
+
+    def optimize_method(self, method):
+        self.parameters = set(method.get_parameters())
+        self.next_slot = len(method.get_parameters())  # cache slots follow them
+        body = method.get_body()
+        for pass_name in self.PASSES:
+            body = getattr(self, pass_name)(body)
+        method.body = body
+
+    def map_statement(self, statement, rewrite_statement, rewrite_expression):
+        # rewrites children before their parent
+        kind = statement.kind
+        if kind == nodes.WHILE:
+            statement.body = self.map_statement(
+                statement.body, rewrite_statement, rewrite_expression
+            )
+        elif kind == nodes.IF:
+            statement.then_statement = self.map_statement(
+                statement.then_statement, rewrite_statement, rewrite_expression
+            )
+            if statement.else_statement is not None:
+                statement.else_statement = self.map_statement(
+                    statement.else_statement, rewrite_statement, rewrite_expression
+                )
+        elif kind == nodes.BEGIN:
+            statement.statements = [
+                self.map_statement(nested, rewrite_statement, rewrite_expression)
+                for nested in statement.statements
+            ]
+        rewrite_expressions(
+            statement,
+            lambda expression: self.map_expression(
+                expression, rewrite_statement, rewrite_expression
+            ),
+        )
+        return rewrite_statement(statement)
+
+    def map_expression(self, expression, rewrite_statement, rewrite_expression):
+        rewrite_expressions(
+            expression,
+            lambda child: self.map_expression(child, rewrite_statement, rewrite_expression),
+        )
+        if expression.kind == nodes.STATEMENT:
+            expression.statement = self.map_statement(
+                expression.statement, rewrite_statement, rewrite_expression
+            )
+        return rewrite_expression(expression)
+
+    def keep(self, node):
+        return node
+
+    def fold_constants(self, body):
+        return self.map_statement(body, self.keep, self.fold_expression)
+
+    def fold_expression(self, expression):
+        kind = expression.kind
+        try:
+            if kind == nodes.BINARY:
+                left, right = expression.left, expression.right
+                if left.kind != nodes.CONST or right.kind != nodes.CONST:
+                    return expression
+                value = expression.handler(
+                    self.folding_sink, expression.operator, left.value, right.value
+                )
+                if value.__class__ is Rope:
+                    value = str(value)  # constants are plain values
+            elif kind == nodes.NOT:
+                if expression.operand.kind != nodes.CONST:
+                    return expression
+                value = expression.operand.value
+                if not isinstance(value, bool):
+                    raise FoldingError("not a boolean")
+                value = not value
+            elif kind == nodes.CONCAT:
+                return self.fold_concat(expression)
+            else:
+                return expression
+        except Exception:
+            # the same error has to happen when the program gets here
+            self.stats["deferred_folds"] += 1
+            return expression
+
+        self.stats["folded_expressions"] += 1
+        return ConstNode(expression.line_num, value)
+
+    def fold_concat(self, expression):
+        # neighbouring constant parts are joined into one string
+        parts = []
+        formatters = []
+        for part, formatter in zip(expression.parts, expression.formatters):
+            if part.kind == nodes.CONST and parts and parts[-1].kind == nodes.CONST:
+                text = parts[-1].value + formatter(part.value)
+                parts[-1] = ConstNode(parts[-1].line_num, text)
+                self.stats["folded_expressions"] += 1
+            elif part.kind == nodes.CONST:
+                parts.append(ConstNode(part.line_num, formatter(part.value)))
+                formatters.append(str)
+            else:
+                parts.append(part)
+                formatters.append(formatter)
+
+        if len(parts) == 1 and parts[0].kind == nodes.CONST:
+            return parts[0]
+        expression.parts = parts
+        expression.formatters = formatters
+        return expression
+
+    def prune_branches(self, body):
+        return self.map_statement(body, self.prune_statement, self.keep)
+
+    def prune_statement(self, statement):
+        kind = statement.kind
+        if kind == nodes.IF and statement.condition.kind == nodes.CONST:
+            condition = statement.condition.value
+            if condition is True:
+                self.stats["pruned_branches"] += 1
+                return statement.then_statement
+            elif condition is False:
+                self.stats["pruned_branches"] += 1
+                if statement.else_statement is None:
+                    return NoopNode(statement.line_num)
+                return statement.else_statement
+        elif kind == nodes.WHILE and statement.condition.kind == nodes.CONST:
+            if statement.condition.value is False:
+                self.stats["pruned_branches"] += 1
+                return NoopNode(statement.line_num)
+        elif kind == nodes.BEGIN:
+            return self.flatten_begin(statement)
+        return statement
+
+    def flatten_begin(self, statement):
+        # a nested begin returns the first result of its statements, exactly as
+        # if they were part of the enclosing begin; no-ops return nothing
+        statements = []
+        for nested in statement.statements:
+            if nested.kind == nodes.BEGIN:
+                statements.extend(nested.statements)
+            elif nested.kind != nodes.NOOP:
+                statements.append(nested)
+        if len(statements) != len(statement.statements):
+            self.stats["flattened_blocks"] += 1
+        if not statements:
+            return NoopNode(statement.line_num)
+        if len(statements) == 1:
+            return statements[0]
+        return BeginNode(statement.line_num, statements)
+
+    def single_condition(self, body):
+        return self.map_statement(body, self.mark_single_condition, self.keep)
+
+    def mark_single_condition(self, statement):
+        # with a pure condition the second evaluation can only give the same value
+        if statement.kind == nodes.WHILE and self.is_pure(statement.condition):
+            statement.single_condition = True
+            self.stats["single_condition_loops"] += 1
+        return statement
+
+    def is_pure(self, expression):
+        return all(node.kind in PURE_KINDS for node in walk(expression))
+
+    def hoist_invariants(self, body):
+        # outer loops first, so an expression is cached for as long as possible
+        pending = [body]
+        while pending:
+            node = pending.pop()
+            if node.kind == nodes.WHILE:
+                self.hoist_loop(node)
+            pending.extend(child_expressions(node))
+            if node.kind == nodes.STATEMENT:
+                pending.append(node.statement)
+            else:
+                pending.extend(child_statements(node))
+        return body
+
+    def hoist_loop(self, loop):
+        assigned = set()
+        has_calls = False
+        for node in walk(loop):
+            if node.kind in (nodes.SET, nodes.INPUT):
+                assigned.add(node.name)
+            elif node.kind in CALL_KINDS:
+                has_calls = True
+
+        def is_invariant_name(name):
+            if name in assigned:
+                return False
+            # a method called from the loop can change fields, but not parameters
+            return name in self.parameters or not has_calls
+
+        slots = []
+
+        def hoist(expression):
+            if expression.kind in (nodes.BINARY, nodes.NOT, nodes.CONCAT):
+                if self.is_pure(expression) and all(
+                    is_invariant_name(node.name)
+                    for node in walk(expression)
+                    if node.kind == nodes.NAME
+                ):
+                    slots.append(self.next_slot)
+                    self.next_slot += 1
+                    self.stats["hoisted_expressions"] += 1
+                    return CachedNode(expression.line_num, expression, slots[-1])
+            if expression.kind == nodes.STATEMENT:
+                self.map_loop_statement(expression.statement, hoist)
+            elif expression.kind != nodes.CACHED:
+                rewrite_expressions(expression, hoist)
+            return expression
+
+        loop.condition = hoist(loop.condition)
+        self.map_loop_statement(loop.body, hoist)
+        if slots:
+            loop.cache_slots = loop.cache_slots + tuple(slots)
+
+    def map_loop_statement(self, statement, hoist):
+        rewrite_expressions(statement, hoist)
+        for nested in child_statements(statement):
+            self.map_loop_statement(nested, hoist)
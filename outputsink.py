@@ -0,0 +1,77 @@
+"""
+Destinations for the lines a Brewin program prints, used through
+Interpreter(output_sink=...) instead of one print() call per line.
+"""
+
+import sys
+from abc import ABC, abstractmethod
+
+DEFAULT_FLUSH_LINES = 4096
+
+
+class OutputSink(ABC):
+    """A sink only has to write lines; flush and close do nothing by default."""
+
+    @abstractmethod
+    def write(self, line):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class BufferedSink(OutputSink):
+    """
+    Collects lines and writes them to a file object, or to a file path opened
+    on first write, once flush_lines of them are waiting. The interpreter
+    closes the sink at the end of every run, which flushes the rest and
+    closes the file it opened; the next run appends to that file.
+    """
+
+    def __init__(self, target=None, flush_lines=DEFAULT_FLUSH_LINES):
+        self.path = None
+        self.stream = None
+        self.opened = False  # reopened files are appended to, not truncated
+        if isinstance(target, str):
+            self.path = target
+        else:
+            self.stream = target if target is not None else sys.stdout
+        self.flush_lines = max(1, flush_lines)
+        self.buffer = []
+
+    def write(self, line):
+        buffer = self.buffer
+        buffer.append(line)
+        if len(buffer) >= self.flush_lines:
+            self.flush()
+
+    def flush(self):
+        if self.stream is None:
+            if not self.buffer:
+                return
+            self.stream = open(self.path, "a" if self.opened else "w")
+            self.opened = True
+        if self.buffer:
+            self.buffer.append("")  # trailing newline
+            self.stream.write("\n".join(self.buffer))
+            self.buffer.clear()
+        self.stream.flush()
+
+    def close(self):
+        self.flush()
+        if self.path is not None and self.stream is not None:
+            self.stream.close()  # only close the files this sink opened
+            self.stream = None
+
+
+class CallbackSink(OutputSink):
+    """Hands every line to callback as soon as it is printed."""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, line):
+        self.callback(line)
@@ -0,0 +1,97 @@
+"""
+Deterministic profiler for the tree-walking engine, turned on with
+Interpreter(trace_output=True).
+
+Profiled objects are instances of ProfiledObjectDefinition, whose statement
+handlers count a hit for the statement's source line before running it and
+whose method hooks time every call. Unprofiled runs use ObjectDefinition and
+its handlers unchanged, so they pay nothing for the profiler.
+"""
+
+import time
+from collections import defaultdict
+
+from object import ObjectDefinition
+
+
+class MethodStats:
+    __slots__ = ("calls", "inclusive_time", "exclusive_time", "active")
+
+    def __init__(self):
+        self.calls = 0
+        self.inclusive_time = 0.0
+        self.exclusive_time = 0.0
+        self.active = 0  # recursive calls only count once towards inclusive time
+
+
+class Profiler:
+    def __init__(self):
+        self.methods = defaultdict(MethodStats)  # "class.method" -> MethodStats
+        self.line_hits = defaultdict(int)  # 1-based source line -> statements run
+        self.call_stack = []  # [stats, start time, time spent in callees]
+
+    def enter(self, class_name, method_name):
+        stats = self.methods[f"{class_name}.{method_name}"]
+        stats.calls += 1
+        stats.active += 1
+        self.call_stack.append([stats, time.perf_counter(), 0.0])
+
+    def leave(self):
+        stats, start_time, callee_time = self.call_stack.pop()
+        elapsed = time.perf_counter() - start_time
+        stats.active -= 1
+        if stats.active == 0:
+            stats.inclusive_time += elapsed
+        stats.exclusive_time += elapsed - callee_time
+        if self.call_stack:
+            self.call_stack[-1][2] += elapsed
+
+    def hit_line(self, line_num):
+        if line_num is not None:
+            self.line_hits[line_num + 1] += 1
+
+    def report(self, limit=None):
+        lines = [
+            f"{'method':30s} {'calls':>9s} {'inclusive ms':>13s} {'exclusive ms':>13s}"
+        ]
+        methods = sorted(
+            self.methods.items(), key=lambda item: item[1].exclusive_time, reverse=True
+        )
+        for name, stats in methods[:limit]:
+            lines.append(
+                f"{name:30s} {stats.calls:9d} {stats.inclusive_time * 1000:13.3f}"
+                f" {stats.exclusive_time * 1000:13.3f}"
+            )
+
+        lines.append("")
+        lines.append(f"{'line':>6s} {'hits':>10s}")
+        line_hits = sorted(self.line_hits.items(), key=lambda item: (-item[1], item[0]))
+        for line, hits in line_hits[:limit]:
+            lines.append(f"{line:6d} {hits:10d}")
+        return "\n".join(lines)
+
+
+def count_line_hits(handler):
+    def profiled_handler(self, statement, parameter_values):
+        self.interpreter_obj.profiler.hit_line(statement.line_num)
+        return handler(self, statement, parameter_values)
+
+    return profiled_handler
+
+
+class ProfiledObjectDefinition(ObjectDefinition):
+    __slots__ = ()
+
+    HOOKS = True
+
+    # every method that runs in a frame, tail calls included, is timed on its own
+    def enter_method(self, method):
+        self.interpreter_obj.profiler.enter(self.class_def.name, method.name)
+
+    def leave_method(self, method):
+        self.interpreter_obj.profiler.leave()
+
+    STATEMENT_HANDLERS = {
+        kind: count_line_hits(handler)
+        for kind, handler in ObjectDefinition.STATEMENT_HANDLERS.items()
+    }
@@ -0,0 +1,149 @@
+"""
+On-disk cache of parsed and lowered Brewin programs, similar to __pycache__.
+
+Entries are keyed by a hash of the program source and of the interpreter
+version, written atomically, and evicted least recently used first once the
+directory grows past its size limit. Entries are pickles, so only point the
+cache at a directory you trust.
+"""
+
+import copyreg
+import gc
+import hashlib
+import os
+import pickle
+import tempfile
+
+from bparser import StringWithLineNumber
+from programsource import ProgramSource
+
+ENTRY_SUFFIX = ".brewincache"
+
+# the modules whose output ends up in a cache entry, and the modules they import
+CACHED_MODULES = (
+    "bparser.py",
+    "fastparser.py",
+    "intbase.py",
+    "lowering.py",
+    "nodes.py",
+    "operations.py",
+    "optimizer.py",
+    "quickening.py",
+    "rope.py",
+)
+
+
+def pickle_string_with_line_number(string):
+    # rebuilt like FastParser does, without going through StringWithLineNumber.__new__
+    return (
+        str.__new__,
+        (StringWithLineNumber, str(string)),
+        {"line_num": string.line_num},
+    )
+
+
+copyreg.pickle(StringWithLineNumber, pickle_string_with_line_number)
+
+
+class ProgramCache:
+    FORMAT_VERSION = 1  # bump when the layout of an entry changes
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    version_fingerprint = None
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.version = f"{self.FORMAT_VERSION}:{self.get_version_fingerprint()}"
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def get_version_fingerprint(cls):
+        # entries built by different parser or lowering code must never be reused
+        if cls.version_fingerprint is None:
+            digest = hashlib.sha256()
+            package_dir = os.path.dirname(os.path.abspath(__file__))
+            for module in CACHED_MODULES:
+                with open(os.path.join(package_dir, module), "rb") as module_file:
+                    digest.update(module_file.read())
+            cls.version_fingerprint = digest.hexdigest()[:16]
+        return cls.version_fingerprint
+
+    def get_key(self, program, variant=""):
+        # variant tells apart entries built with different interpreter options
+        digest = hashlib.sha256(f"{self.version}:{variant}".encode("utf-8"))
+        if isinstance(program, ProgramSource):
+            for buffer, start, end in program.get_windows():
+                digest.update(buffer[start:end])
+            return digest.hexdigest()
+        for line in program:
+            digest.update(line.encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def load(self, key):
+        path = self.get_path(key)
+        # an entry is a large acyclic tree, see FastParser.parse
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, "rb") as entry_file:
+                version, value = pickle.load(entry_file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self.remove(path)  # unreadable or truncated entry
+            return None
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        if version != self.version:
+            self.remove(path)
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return value
+
+    def store(self, key, value):
+        data = pickle.dumps((self.version, value), pickle.HIGHEST_PROTOCOL)
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, self.get_path(key))  # atomic on the same filesystem
+        except BaseException:
+            self.remove(temp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        entries = []
+        total_size = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(ENTRY_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        entries.sort()  # least recently used first
+        for _, size, path in entries:
+            if total_size <= self.max_bytes:
+                break
+            self.remove(path)
+            total_size -= size
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
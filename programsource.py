@@ -0,0 +1,111 @@
+"""
+Brewin programs read from a file path (an os.PathLike such as pathlib.Path)
+or a binary file object, which Interpreter.run takes besides source text and
+a list of lines. A regular file is
+memory-mapped and tokenized in place by FastParser.parse_buffers; other
+files are read in blocks. Either way the source is never copied into a
+list of lines, nor decoded as a whole.
+"""
+
+import mmap
+import os
+
+from fastparser import FastParser
+
+WINDOW_SIZE = 1 << 20  # bytes tokenized at a time, rounded to whole lines
+
+
+def open_program(program):
+    """
+    A ProgramSource for a path or a binary file. A str is source text, never a
+    path, and is split into lines; anything else, such as a list, is returned as is.
+    """
+    if isinstance(program, os.PathLike) or hasattr(program, "read"):
+        return ProgramSource(program)
+    if isinstance(program, str):
+        return program.split("\n")
+    return program
+
+
+class ProgramSource:
+    def __init__(self, source, window_size=WINDOW_SIZE):
+        self.window_size = window_size
+        self.path = None
+        self.file = None
+        self.start = 0
+        if isinstance(source, (str, os.PathLike)):
+            self.path = source
+        else:
+            self.file = source
+            if source.seekable():
+                self.start = source.tell()
+
+    def is_rereadable(self):
+        # a pipe or socket can only be read once
+        return self.file is None or self.file.seekable()
+
+    def parse(self):
+        """Same result as FastParser.parse on the lines of the source."""
+        windows = self.get_windows()
+        try:
+            return FastParser.parse_buffers(windows)
+        finally:
+            windows.close()  # unmaps the file, even after a syntax error
+
+    def get_windows(self):
+        """Yields (buffer, start, end) for consecutive runs of whole lines."""
+        if self.path is not None:
+            with open(self.path, "rb") as source_file:
+                yield from self.read_file(source_file)
+        else:
+            if self.file.seekable():
+                self.file.seek(self.start)
+            yield from self.read_file(self.file)
+
+    def read_file(self, source_file):
+        buffer = self.map_file(source_file)
+        if buffer is None:
+            yield from self.read_blocks(source_file)
+            return
+        try:
+            size = len(buffer)
+            start = 0
+            while start < size:
+                end = min(start + self.window_size, size)
+                if end < size:
+                    # a window ends after a newline, or after a very long line
+                    line_end = buffer.rfind(b"\n", start, end)
+                    if line_end == -1:
+                        line_end = buffer.find(b"\n", end)
+                    end = size if line_end == -1 else line_end + 1
+                yield buffer, start, end
+                start = end
+        finally:
+            buffer.close()
+
+    def map_file(self, source_file):
+        try:
+            if source_file.tell() != 0:
+                return None  # only part of the file is the program
+            descriptor = source_file.fileno()
+            if os.fstat(descriptor).st_size == 0:
+                return None  # an empty file cannot be mapped
+            return mmap.mmap(descriptor, 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None  # not a regular file, such as a pipe or io.BytesIO
+
+    def read_blocks(self, source_file):
+        partial_line = b""
+        while True:
+            block = source_file.read(self.window_size)
+            if not block:
+                break
+            complete, separator, rest = block.rpartition(b"\n")
+            if separator:
+                block = partial_line + complete + separator
+                partial_line = rest
+                yield block, 0, len(block)
+            else:
+                partial_line += block
+        if partial_line:
+            yield partial_line, 0, len(partial_line)
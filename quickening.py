@@ -0,0 +1,167 @@
+"""
+Adaptive specialization ("quickening") of binary operators. A BinaryNode
+starts on the generic evaluate_arithmatic/evaluate_logic path. Once it has
+run WARMUP times it installs a function specialized for the operand types of
+that execution, such as int < int or str + str.
+
+A specialized function checks its guard first and returns DEOPTIMIZE when
+the operands have other types. The node then falls back to the generic path,
+which raises exactly the same errors as before, and only tries again after a
+longer warmup. A node that keeps deoptimizing stays generic.
+"""
+
+import operator as python_operator
+
+from rope import Rope, concat
+
+WARMUP = 8
+MAX_DEOPTIMIZATIONS = 4
+NEVER = -1  # warmup of a node that is not specialized again
+
+DEOPTIMIZE = object()
+OBJECT = object()  # operand kind of objects and null
+
+
+def int_operation(name, function):
+    def specialized(left, right):
+        if left.__class__ is int and right.__class__ is int:
+            return function(left, right)
+        return DEOPTIMIZE
+
+    specialized.__name__ = name
+    return specialized
+
+
+def bool_operation(name, function):
+    def specialized(left, right):
+        if left.__class__ is bool and right.__class__ is bool:
+            return function(left, right)
+        return DEOPTIMIZE
+
+    specialized.__name__ = name
+    return specialized
+
+
+def string_comparison(name, function):
+    # strings of digits are compared as integers by the generic path
+    def specialized(left, right):
+        if (
+            left.__class__ is str
+            and right.__class__ is str
+            and not left.isdigit()
+            and not right.isdigit()
+        ):
+            return function(left, right)
+        return DEOPTIMIZE
+
+    specialized.__name__ = name
+    return specialized
+
+
+def reference_comparison(name, function):
+    def specialized(left, right):
+        if not isinstance(left, (int, str, Rope)) and not isinstance(
+            right, (int, str, Rope)
+        ):
+            return function(left, right)
+        return DEOPTIMIZE
+
+    specialized.__name__ = name
+    return specialized
+
+
+def string_add(left, right):
+    if (left.__class__ is Rope or left.__class__ is str and not left.isdigit()) and (
+        right.__class__ is Rope or right.__class__ is str and not right.isdigit()
+    ):
+        return concat(left, right)
+    return DEOPTIMIZE
+
+
+string_add.__name__ = "str +"
+
+INT_OPERATIONS = {
+    "+": python_operator.add,
+    "-": python_operator.sub,
+    "*": python_operator.mul,
+    "/": python_operator.floordiv,
+    "%": python_operator.mod,
+    "<": python_operator.lt,
+    ">": python_operator.gt,
+    "<=": python_operator.le,
+    ">=": python_operator.ge,
+    "==": python_operator.eq,
+    "!=": python_operator.ne,
+}
+BOOL_OPERATIONS = {
+    "==": python_operator.eq,
+    "!=": python_operator.ne,
+    "&": python_operator.and_,
+    "|": python_operator.or_,
+}
+STRING_COMPARISONS = {
+    "<": python_operator.lt,
+    ">": python_operator.gt,
+    "<=": python_operator.le,
+    ">=": python_operator.ge,
+    "==": python_operator.eq,
+    "!=": python_operator.ne,
+}
+REFERENCE_COMPARISONS = {"==": python_operator.eq, "!=": python_operator.ne}
+
+# (operator, left kind, right kind) -> specialized function
+SPECIALIZATIONS = {}
+for name, function in INT_OPERATIONS.items():
+    SPECIALIZATIONS[name, int, int] = int_operation(f"int {name}", function)
+for name, function in BOOL_OPERATIONS.items():
+    SPECIALIZATIONS[name, bool, bool] = bool_operation(f"bool {name}", function)
+for name, function in STRING_COMPARISONS.items():
+    SPECIALIZATIONS[name, str, str] = string_comparison(f"str {name}", function)
+for name, function in REFERENCE_COMPARISONS.items():
+    SPECIALIZATIONS[name, OBJECT, OBJECT] = reference_comparison(
+        f"object {name}", function
+    )
+for left_kind in (str, Rope):
+    for right_kind in (str, Rope):
+        SPECIALIZATIONS["+", left_kind, right_kind] = string_add
+
+
+def operand_kind(value):
+    value_class = value.__class__
+    if value_class in (int, bool, str, Rope):
+        if value_class is str and value.isdigit():
+            return None  # taken as an int by the generic path
+        return value_class
+    if isinstance(value, (int, str)):
+        return None  # subclasses, such as the tokens of field initial values
+    return OBJECT
+
+
+def find_specialization(operator, left_operand, right_operand):
+    key = (operator, operand_kind(left_operand), operand_kind(right_operand))
+    return SPECIALIZATIONS.get(key)
+
+
+def quicken(node, interpreter_obj, left_operand, right_operand):
+    """
+    The generic path of a BinaryNode, taken while it is not specialized or
+    when the guard of its specialized function failed.
+    """
+    if node.specialized is not None:
+        node.specialized = None
+        node.deoptimizations += 1
+        if node.deoptimizations < MAX_DEOPTIMIZATIONS:
+            node.warmup = WARMUP << node.deoptimizations
+        else:
+            node.warmup = NEVER
+    elif node.warmup > 0:
+        node.warmup -= 1
+        if node.warmup == 0:
+            node.specialized = find_specialization(
+                node.operator, left_operand, right_operand
+            )
+            if node.specialized is None:
+                node.warmup = NEVER  # no specialization for these operands
+            else:
+                node.specializations += 1
+    return node.handler(interpreter_obj, node.operator, left_operand, right_operand)
@@ -0,0 +1,66 @@
+"""
+Resolves the variables of a lowered method body (see nodes.py) once, when its
+class is loaded. A parameter becomes an index into the frame, which is a list
+of the argument values followed by the method's cache slots, and a field an
+index into the object's list of field values.
+
+A name that is neither is marked SCOPE_UNRESOLVED and reported by
+resolve_method; it still only fails once the program reaches it.
+"""
+
+from nodes import (
+    CACHED,
+    CALL,
+    CALL_NAME,
+    INPUT,
+    NAME,
+    SET,
+    TAIL_CALL,
+    SCOPE_FIELD,
+    SCOPE_PARAMETER,
+    SCOPE_UNRESOLVED,
+    UNSET,
+    walk,
+)
+
+
+class Resolver:
+    def __init__(self, field_index):
+        self.field_index = field_index  # field name -> index into the field list
+
+    def resolve_method(self, method):
+        """Resolves method.body in place and returns its unresolved names."""
+        # with repeated parameter names the last argument wins, as in a dict
+        parameter_index = {
+            name: index for index, name in enumerate(method.get_parameters())
+        }
+        frame_size = len(method.get_parameters())
+        unresolved = []
+        for node in walk(method.get_body()):
+            kind = node.kind
+            if kind in (NAME, SET, INPUT):
+                # variables are looked up in the parameters first
+                if node.name in parameter_index:
+                    node.scope, node.index = SCOPE_PARAMETER, parameter_index[node.name]
+                elif node.name in self.field_index:
+                    node.scope, node.index = SCOPE_FIELD, self.field_index[node.name]
+                else:
+                    node.scope, node.index = SCOPE_UNRESOLVED, None
+                    unresolved.append((node.name, node.line_num))
+            elif kind in (CALL, TAIL_CALL) and node.target_kind == CALL_NAME:
+                # and call targets in the fields first
+                target = node.target
+                if target in self.field_index:
+                    node.target_scope = SCOPE_FIELD
+                    node.target_index = self.field_index[target]
+                elif target in parameter_index:
+                    node.target_scope = SCOPE_PARAMETER
+                    node.target_index = parameter_index[target]
+                else:
+                    node.target_scope, node.target_index = SCOPE_UNRESOLVED, None
+                    unresolved.append((target, node.line_num))
+            elif kind == CACHED:
+                frame_size = max(frame_size, node.slot + 1)
+
+        method.frame_padding = [UNSET] * (frame_size - len(method.get_parameters()))
+        return unresolved
@@ -0,0 +1,52 @@
+"""
+Lazily joined strings for Brewin's string +. Building a string with
+(set s (+ s "x")) in a loop would copy the whole string every iteration;
+a Rope appends the new piece to a list instead and only joins the pieces
+when the value is observed, so building it is linear in its length.
+
+Ropes stand in for str inside operations.py. They are turned into str by
+str() whenever a value is printed, compared or shown in an error message.
+"""
+
+# shorter results are plain str, which is faster to build and to compare
+MIN_ROPE_LENGTH = 256
+
+
+class Rope:
+    __slots__ = ("pieces", "count", "text")
+
+    def __init__(self, pieces, count):
+        # pieces may be shared with the ropes built on top of this one, which
+        # append to it; only the first count of them belong to this rope
+        self.pieces = pieces
+        self.count = count
+        self.text = None
+
+    def __str__(self):
+        if self.text is None:
+            pieces = self.pieces
+            if self.count != len(pieces):
+                pieces = pieces[: self.count]
+            self.text = "".join(pieces)
+            # later appends start from the joined text
+            self.pieces = [self.text]
+            self.count = 1
+        return self.text
+
+    def __repr__(self):
+        return f"Rope({str(self)!r})"
+
+
+def concat(left, right):
+    """left + right for two strings or ropes."""
+    if right.__class__ is Rope:
+        right = str(right)
+    if left.__class__ is Rope:
+        pieces = left.pieces
+        if left.count != len(pieces):
+            pieces = pieces[: left.count]  # a string was already built on left
+        pieces.append(right)
+        return Rope(pieces, len(pieces))
+    if len(left) + len(right) < MIN_ROPE_LENGTH:
+        return left + right
+    return Rope([left, right], 2)
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from asyncinterpreter import AsyncInterpreter
+from interpreterv1 import Interpreter
+from meter import StepLimitExceeded
+
+
+def counter(name, count):
+    return [
+        "(class main",
+        "  (field i 0)",
+        "  (method main ()",
+        f"    (while (< i {count}) (begin (print \"{name}\" i) (set i (+ i 1))))",
+        "  )",
+        ")",
+    ]
+
+
+FOREVER = ["(class main (method main () (while true (print 1))))"]
+
+
+def session(written, name, **options):
+    async def write_output(line):
+        written.append((name, line))
+
+    return AsyncInterpreter(write_output=write_output, **options)
+
+
+def test_sessions_take_turns_at_every_pause():
+    written = []
+
+    async def main():
+        await asyncio.gather(
+            session(written, "a", yield_interval=5).run_async(counter("a", 20)),
+            session(written, "b", yield_interval=5).run_async(counter("b", 20)),
+        )
+
+    asyncio.run(main())
+    turns = []
+    for name, _ in written:
+        if not turns or turns[-1][0] != name:
+            turns.append([name, 0])
+        turns[-1][1] += 1
+    # the main call is the first step, then each loop body run is one
+    assert turns == [["a", 4], ["b", 4]] + [["a", 5], ["b", 5]] * 3 + [["a", 1], ["b", 1]]
+    assert [line for name, line in written if name == "a"] == [f"a{i}" for i in range(20)]
+
+
+def test_step_budget_stops_only_its_session():
+    written = []
+
+    async def main():
+        return await asyncio.gather(
+            session(written, "a", yield_interval=10, max_steps=50).run_async(FOREVER),
+            session(written, "b", yield_interval=10).run_async(counter("b", 100)),
+            return_exceptions=True,
+        )
+
+    stopped, finished = asyncio.run(main())
+    assert isinstance(stopped, StepLimitExceeded)
+    assert finished is None
+    assert len([name for name, _ in written if name == "a"]) == 50
+    assert [line for name, line in written if name == "b"] == [f"b{i}" for i in range(100)]
+
+
+def test_input_suspends_the_session_until_a_value_arrives():
+    program = [
+        "(class main",
+        "  (field n 0)",
+        "  (field s null)",
+        '  (method main () (begin (print "number?") (inputi n) (print "text?")',
+        '    (inputs s) (print "got " (+ n 1) " " s)))',
+        ")",
+    ]
+    written = []
+    values = asyncio.Queue()
+
+    async def main():
+        interpreter = session(written, "a", read_input=values.get)
+        task = asyncio.ensure_future(interpreter.run_async(program))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        # what was printed before the input is flushed while the session waits
+        assert not task.done()
+        assert written == [("a", "number?")]
+
+        await values.put("41")
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert not task.done()
+        assert written[-1] == ("a", "text?")
+
+        await values.put("hello")
+        await task
+
+    asyncio.run(main())
+    assert written == [("a", "number?"), ("a", "text?"), ("a", "got 42 hello")]
+
+
+def test_input_from_an_async_iterator_runs_out_like_a_list():
+    async def values():
+        yield "7"
+
+    program = [
+        "(class main",
+        "  (field n 0)",
+        "  (field s 0)",
+        '  (method main () (begin (inputi n) (inputs s) (print "n " n " s " s)))',
+        ")",
+    ]
+    written = []
+    asyncio.run(session(written, "a", read_input=values()).run_async(program))
+    interpreter = Interpreter(console_output=False, inp=["7"])
+    interpreter.run(program)
+    assert [line for _, line in written] == interpreter.get_output()
+
+
+def test_async_interpreter_needs_the_bytecode_engine():
+    with pytest.raises(ValueError):
+        AsyncInterpreter(engine="tree")
@@ -0,0 +1,27 @@
+import pytest
+
+from batchrunner import BatchCase, BatchRunner, CaseTimeout, run_case
+
+HELLO = '(class main (method main () (print "hello")))'
+FOREVER = "(class main (method main () (while true (print 1))))"
+
+
+def test_case_timeout_is_not_an_exception():
+    # handlers for Exception inside the interpreter must not swallow it
+    assert not issubclass(CaseTimeout, Exception)
+
+
+def test_timeout_stops_a_runaway_case():
+    result = run_case(BatchCase("forever", FOREVER), "tree", 0.2)
+    assert result.timed_out
+    assert not result.passed
+
+
+@pytest.mark.parametrize("engine", ["tree", "bytecode", "python"])
+def test_runner_returns_a_result_for_every_case(engine):
+    cases = [BatchCase(f"hello {index}", HELLO, expected_output=["hello"]) for index in range(5)]
+    cases.append(BatchCase("forever", FOREVER))
+    results = {result.name: result for result in BatchRunner(2, 0.5, engine).run(cases)}
+    assert len(results) == len(cases)
+    assert all(results[f"hello {index}"].passed for index in range(5))
+    assert results["forever"].timed_out
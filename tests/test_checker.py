@@ -0,0 +1,82 @@
+import pytest
+
+from intbase import ErrorType
+from interpreterv1 import Interpreter
+
+
+def check(*body, extra=()):
+    program = [
+        "(class main",
+        "  (field x 0)",
+        "  (field o null)",
+        "  (method f (a) (return a))",
+        "  (method main ()",
+        "    (begin",
+        *body,
+        "    )",
+        "  )",
+        ")",
+        *extra,
+    ]
+    return Interpreter(console_output=False).check_program(program)
+
+
+def test_clean_program_has_no_diagnostics():
+    diagnostics = check(
+        "      (set o (new other))",
+        "      (print (call o get 1))",  # calls on other objects are checked when run
+        "      (print (call me f x))",
+        "      (if (== x 0) (print x) (print 1))",
+        extra=["(class other (method get (a) (return a)))"],
+    )
+    assert diagnostics == []
+
+
+# line numbers count from 0, so the first line of the body is line 6
+@pytest.mark.parametrize(
+    "statement, error_type, message",
+    [
+        ("(set o (new nothing))", ErrorType.TYPE_ERROR, "class nothing does not exist"),
+        ("(call me g)", ErrorType.NAME_ERROR, "Method g does not exist"),
+        (
+            "(call me f 1 2)",
+            ErrorType.TYPE_ERROR,
+            "Method f expected 1 parameters, but gets only 2",
+        ),
+        ("(call zz get)", ErrorType.NAME_ERROR, "Unknown name zz"),
+        ("(print y)", ErrorType.NAME_ERROR, "Unknown name y"),
+        ("(set y 1)", ErrorType.NAME_ERROR, "Unknown name y"),
+        ("(inputi y)", ErrorType.NAME_ERROR, "Unknown name y"),
+        ("(if x)", ErrorType.SYNTAX_ERROR, "Malformed if statement"),
+    ],
+)
+def test_each_kind_of_diagnostic(statement, error_type, message):
+    diagnostics = check(f"      {statement}")
+    assert diagnostics == [(6, error_type, message, "main", "main")]
+
+
+def test_diagnostics_of_all_methods_come_sorted_by_line():
+    diagnostics = check(
+        "      (print y)",
+        "      (call me g)",
+        extra=["(class other (method get () (return (new nothing))))"],
+    )
+    found = [(line, message, class_name) for line, _, message, class_name, _ in diagnostics]
+    assert found == [
+        (6, "Unknown name y", "main"),
+        (7, "Method g does not exist", "main"),
+        (11, "class nothing does not exist", "other"),
+    ]
+
+
+def test_reported_sites_fail_the_same_way_when_run():
+    program = [
+        "(class main",
+        '  (method main () (begin (print "before") (call me g)))',
+        ")",
+    ]
+    interpreter = Interpreter(console_output=False)
+    with pytest.raises(RuntimeError, match="Method g does not exist"):
+        interpreter.run(program)
+    assert interpreter.get_output() == ["before"]
+    assert interpreter.get_error_type_and_line()[0] == ErrorType.NAME_ERROR
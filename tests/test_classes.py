@@ -0,0 +1,114 @@
+import pytest
+
+from intbase import ErrorType
+from interpreterv1 import Interpreter
+from lowering import Lowerer
+
+PROGRAM = [
+    "(class main",
+    "  (field o null)",
+    "  (method used () (return 1))",
+    "  (method never_called () (return (+ 1 true)))",
+    '  (method main () (begin (set o (new helper)) (print "got " (call me used) (call o get))))',
+    ")",
+    "(class helper (method get () (return 2)) (method unused () (return 3)))",
+    "(class never_created (method broken () (return (call me missing))))",
+]
+
+
+@pytest.fixture
+def lowered(monkeypatch):
+    names = []
+    lower_method = Lowerer.lower_method
+
+    def recording_lower_method(self, method):
+        names.append(method.get_name())
+        return lower_method(self, method)
+
+    monkeypatch.setattr(Lowerer, "lower_method", recording_lower_method)
+    return names
+
+
+@pytest.mark.parametrize("engine", [Interpreter.TREE_ENGINE, Interpreter.BYTECODE_ENGINE])
+def test_only_the_methods_that_run_are_lowered(engine, lowered):
+    interpreter = Interpreter(console_output=False, engine=engine)
+    interpreter.run(PROGRAM)
+    assert interpreter.get_output() == ["got 12"]
+    assert sorted(lowered) == ["get", "main", "used"]
+
+    classes = interpreter.get_classes()
+    assert not classes["never_created"].loaded
+    assert classes["never_created"].get_methods() == {}
+    assert classes["helper"].get_methods()["unused"].body is None
+
+
+def test_check_program_prepares_every_method(lowered):
+    Interpreter(console_output=False).check_program(PROGRAM)
+    assert sorted(lowered) == ["broken", "get", "main", "never_called", "unused", "used"]
+
+
+# ErrorType and line as reported by the original interpreter, before anything runs
+@pytest.mark.parametrize(
+    "program, error_type, message",
+    [
+        (
+            ["(class main", " (field a 1)", " (field a 2)", ' (method main () (print "ran")))'],
+            ErrorType.NAME_ERROR,
+            "Field name a already exist in class main",
+        ),
+        (
+            [
+                "(class main",
+                " (method f () (print 1))",
+                " (method f () (print 2))",
+                ' (method main () (print "ran")))',
+            ],
+            ErrorType.NAME_ERROR,
+            "Method name f already exist in class main",
+        ),
+        (
+            ["(class main", " (method f () (print 1)))"],
+            ErrorType.SYNTAX_ERROR,
+            "Main Class must have a main method",
+        ),
+        (
+            ['(class other (method main () (print "ran")))'],
+            ErrorType.SYNTAX_ERROR,
+            "There must be an Main class",
+        ),
+        (
+            [
+                '(class main (method main () (print "ran")))',
+                "(class main (method main () (print 2)))",
+            ],
+            ErrorType.TYPE_ERROR,
+            "Duplicate class name main",
+        ),
+        (
+            # in a class the program never creates
+            [
+                '(class main (method main () (print "ran")))',
+                "(class other (field a 1) (field a 1))",
+            ],
+            ErrorType.NAME_ERROR,
+            "Field name a already exist in class other",
+        ),
+        (
+            [
+                '(class main (method main () (print "ran")))',
+                "(class other (method f () (print 1)) (method f () (print 1)))",
+            ],
+            ErrorType.NAME_ERROR,
+            "Method name f already exist in class other",
+        ),
+    ],
+)
+@pytest.mark.parametrize("engine", Interpreter.ENGINES)
+def test_declaration_errors_are_reported_before_the_program_runs(
+    program, error_type, message, engine
+):
+    interpreter = Interpreter(console_output=False, engine=engine)
+    with pytest.raises(RuntimeError, match=message):
+        interpreter.run(program)
+    assert interpreter.get_error_type_and_line() == (error_type, None)
+    assert interpreter.get_output() == []
@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from interpreterv1 import Interpreter
+
+PROGRAMS = sorted((Path(__file__).parent / "programs").glob("*.brewin"))
+
+# output, ErrorType name, error line and exception class of every program,
+# captured by running the original interpreter with INPUTS
+EXPECTED = json.loads((Path(__file__).parent / "programs" / "expected.json").read_text())
+
+INPUTS = {
+    "input": ["41", "hello"],
+    "inputi_bad": ["forty-one"],
+    "inputi_neg": ["7"],
+}
+
+VARIANTS = [
+    {"engine": engine, "optimize": optimize, "memoize": memoize, "meter": meter}
+    for engine in (Interpreter.TREE_ENGINE, Interpreter.BYTECODE_ENGINE)
+    for optimize in (False, True)
+    for memoize in (False, True)
+    for meter in (False, True)
+] + [
+    # the python engine does not memoize
+    {"engine": Interpreter.PYTHON_ENGINE, "optimize": optimize, "meter": meter}
+    for optimize in (False, True)
+    for meter in (False, True)
+]
+
+# where every engine deliberately differs from the original interpreter
+CHANGED = {
+    # inputi rejects input that is not a number instead of storing the string
+    "inputi_bad": {"output": [], "error": "TYPE_ERROR", "line": None, "exception": "RuntimeError"},
+    # the original interpreter ran out of Python stack on these
+    "recurse_deeper": {"output": ["120"], "error": None, "line": None, "exception": None},
+    "tail_deep": {"output": ["20000"], "error": None, "line": None, "exception": None},
+}
+
+# CPython has no tail calls, so the python engine runs out of stack where the
+# other engines reuse the frame
+KNOWN_DIFFERENCES = {
+    ("tail_deep", Interpreter.PYTHON_ENGINE): "RecursionError",
+}
+
+
+def run(path, **options):
+    interpreter = Interpreter(console_output=False, inp=INPUTS.get(path.stem), **options)
+    exception = message = None
+    try:
+        interpreter.run(path.read_text().split("\n"))
+    except Exception as e:
+        exception = type(e).__name__
+        if interpreter.get_error_type_and_line()[0] is not None or type(e) is Exception:
+            # every engine builds these messages with the helpers in operations.py,
+            # other exceptions name engine internals
+            message = str(e)
+    error_type, line_num = interpreter.get_error_type_and_line()
+    result = {
+        "output": list(interpreter.get_output()),
+        "error": None if error_type is None else error_type.name,
+        "line": line_num,
+        "exception": exception,
+    }
+    return result, message
+
+
+@pytest.fixture(scope="module")
+def messages():
+    return {}
+
+
+def variant_id(options):
+    return "-".join(
+        option if value is True else str(value)
+        for option, value in options.items()
+        if value is not False
+    )
+
+
+def test_expectations_cover_every_program():
+    assert sorted(EXPECTED) == [path.stem for path in PROGRAMS]
+
+
+@pytest.mark.parametrize("options", VARIANTS, ids=variant_id)
+@pytest.mark.parametrize("path", PROGRAMS, ids=lambda path: path.stem)
+def test_matches_original_interpreter(path, options, messages):
+    if path not in messages:
+        messages[path] = run(path)[1]
+    result, message = run(path, **options)
+    known = KNOWN_DIFFERENCES.get((path.stem, options["engine"]))
+    if known is not None:
+        assert result["exception"] == known
+        return
+    assert result == CHANGED.get(path.stem, EXPECTED[path.stem])
+    # messages are not pinned, as some gained text, but every engine gives the same
+    assert message == messages[path]
@@ -0,0 +1,62 @@
+import io
+
+import pytest
+
+from bparser import BParser
+from fastparser import FastParser
+from programsource import ProgramSource
+
+SOURCES = [
+    '(class main (method main () (print "hi")))',
+    # line numbers across nested lists
+    '(class main\n  (field x 0)\n  (method main ()\n    (begin\n      (set x 1)\n      (print x))))',
+    # comments, including quotes and parentheses inside them
+    '# leading comment\n(class main # trailing ( comment\n (method main () (print "a")) # "quoted"\n)',
+    # string literals holding comment marks, parentheses and spaces
+    '(class main (method main () (print "# not a comment" "(a b)" "  x  " "")))',
+    'x"y"z "a#b" # c\n(  )\n\n\t(q\r)\n',
+    '(f "a""b")',
+    # malformed input
+    '(a b\nc) d e)',
+    '(a "unclosed',
+    '(a b))',
+    '(a\n(b',
+    '(bad ") (still string"\n)',
+    ')',
+    '',
+    '"',
+]
+
+
+def line_numbers(tokens):
+    if isinstance(tokens, list):
+        return [line_numbers(token) for token in tokens]
+    return tokens.line_num
+
+
+def assert_same_parse(expected, actual):
+    assert actual == expected
+    if expected[0]:
+        assert line_numbers(actual[1]) == line_numbers(expected[1])
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_parse_matches_bparser(source):
+    lines = source.split("\n")
+    assert_same_parse(BParser.parse(lines), FastParser.parse(lines))
+
+
+@pytest.mark.parametrize("source", SOURCES)
+@pytest.mark.parametrize("window_size", [1, 7, 1 << 20])
+def test_parse_buffers_matches_bparser(source, window_size):
+    expected = BParser.parse(source.split("\n"))
+    data = source.encode("utf-8")
+    program = ProgramSource(io.BytesIO(data), window_size)
+    assert_same_parse(expected, program.parse())
+
+
+def test_parse_buffers_of_a_mapped_file_matches_bparser(tmp_path):
+    source = "\n".join(SOURCES[:6])
+    path = tmp_path / "program.brewin"
+    path.write_bytes(source.encode("utf-8"))
+    assert_same_parse(BParser.parse(source.split("\n")), ProgramSource(str(path), 16).parse())
@@ -0,0 +1,39 @@
+import socket
+
+import pytest
+
+from forkclient import receive_message, send_message
+from forkserver import REUSE_MODE, ForkServer, check_request
+
+PROGRAM = '(class main (field x 0) (method main () (begin (inputs x) (print x))))'
+
+
+def serve_one(request):
+    server = ForkServer(mode=REUSE_MODE)
+    client, connection = socket.socketpair()
+    with client, connection:
+        send_message(client, request)
+        server.serve(connection)
+        return receive_message(client)
+
+
+def test_runs_a_program_with_a_list_of_inputs():
+    response = serve_one({"program": PROGRAM, "inputs": ["hello"]})
+    assert "error" not in response
+    assert response["output"] == ["hello"]
+
+
+@pytest.mark.parametrize("inputs", ["/etc/passwd", {"path": "/etc/passwd"}, [["nested"]]])
+def test_rejects_inputs_that_are_not_a_list_of_values(inputs):
+    response = serve_one({"program": PROGRAM, "inputs": inputs})
+    assert response["error"].startswith("ValueError")
+    assert "output" not in response
+
+
+@pytest.mark.parametrize(
+    "request_",
+    [["not", "an", "object"], {"program": 5}, {"program": [1]}, {"preloaded": ["fib"]}],
+)
+def test_rejects_malformed_requests(request_):
+    with pytest.raises(ValueError):
+        check_request(request_)
@@ -0,0 +1,55 @@
+import pytest
+
+from inlinecache import POLYMORPHIC_LIMIT
+from interpreterv1 import Interpreter
+
+CLASS_NAMES = ["a", "b", "c", "d", "e"]  # one more than POLYMORPHIC_LIMIT
+
+PROGRAM = [
+    f"(class {name} (method get () (return {index})))"
+    for index, name in enumerate(CLASS_NAMES)
+] + [
+    "(class main",
+    "  (field x null)",
+    "  (field i 0)",
+    "  (method poly (p) (return (call p get)))",
+    "  (method mega (p) (return (call p get)))",
+    "  (method main ()",
+    "    (begin",
+    "      (set x (new a))",
+    "      (while (< i 5) (begin (print (call x get)) (set i (+ i 1))))",
+    *[f"      (print (call me poly (new {name})))" for name in "ababab"],
+    *[f"      (print (call me mega (new {name})))" for name in CLASS_NAMES * 2],
+    "    )",
+    "  )",
+    ")",
+]
+
+
+@pytest.mark.parametrize("engine", [Interpreter.TREE_ENGINE, Interpreter.BYTECODE_ENGINE])
+def test_counts_hits_and_misses_per_call_site(engine):
+    interpreter = Interpreter(console_output=False, engine=engine)
+    interpreter.run(PROGRAM)
+    assert interpreter.get_output() == ["0"] * 5 + ["0", "1"] * 3 + ["0", "1", "2", "3", "4"] * 2
+
+    stats = interpreter.get_inline_cache_stats()
+    # calls on me are bound by the checker and skip the cache
+    sites = {site["method"]: site for site in stats["sites"]}
+    assert set(sites) == {"main", "poly", "mega"}
+
+    # one receiver class: only the first call looks the method up
+    assert (sites["main"]["hits"], sites["main"]["misses"]) == (4, 1)
+    assert sites["main"]["receiver_classes"] == 1
+
+    # two classes in turn: each is looked up once, then found in receiver_classes
+    assert (sites["poly"]["hits"], sites["poly"]["misses"]) == (4, 2)
+    assert sites["poly"]["receiver_classes"] == 2
+
+    # past the limit, the class that did not fit misses every time
+    assert (sites["mega"]["hits"], sites["mega"]["misses"]) == (POLYMORPHIC_LIMIT, 6)
+    assert sites["mega"]["receiver_classes"] == POLYMORPHIC_LIMIT
+
+    assert stats["hits"] == 4 + 4 + POLYMORPHIC_LIMIT
+    assert stats["misses"] == 1 + 2 + 6
+    assert [site["misses"] for site in stats["sites"]] == [6, 2, 1]
+
@@ -0,0 +1,78 @@
+import io
+
+import pytest
+
+from intbase import ErrorType
+from inputsource import InputSource
+from interpreterv1 import Interpreter
+
+
+def drain(source):
+    values = []
+    while (value := source.next_value()) is not None:
+        values.append(value)
+    return values
+
+
+def run(program, inp):
+    interpreter = Interpreter(console_output=False, inp=inp)
+    interpreter.run(program)
+    return interpreter.get_output()
+
+
+ECHO = [
+    "(class main",
+    "  (field s null)",
+    "  (field i 0)",
+    "  (method main ()",
+    "    (while (< i 3) (begin (inputs s) (print s) (set i (+ i 1))))",
+    "  )",
+    ")",
+]
+
+
+def test_streams_a_generator_one_value_at_a_time():
+    drawn = []
+
+    def values():
+        for value in ["a", "b", "c", "never read"]:
+            drawn.append(value)
+            yield value
+
+    assert run(ECHO, values()) == ["a", "b", "c"]
+    assert drawn == ["a", "b", "c"]
+
+
+def test_iterator_values_are_read_as_strings():
+    program = [
+        "(class main",
+        "  (field s null)",
+        '  (method main () (begin (inputs s) (print (== s "True")) (inputs s) (print "got " s)))',
+        ")",
+    ]
+    assert run(program, iter([True, 2.5])) == ["true", "got 2.5"]
+    assert drain(InputSource(iter([1, "x", False]))) == ["1", "x", "False"]
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 1 << 16])
+def test_strips_crlf_line_endings(block_size, tmp_path):
+    data = b"first\r\nsecond\r\n\r\nlast"
+    expected = ["first", "second", "", "last"]
+    assert drain(InputSource(io.BytesIO(data), block_size)) == expected
+    path = tmp_path / "input.txt"
+    path.write_bytes(data)
+    assert drain(InputSource(str(path), block_size)) == expected
+
+
+def test_reads_utf8_split_across_blocks():
+    data = "é\r\nü€\n".encode("utf-8")
+    assert drain(InputSource(io.BytesIO(data), 1)) == ["é", "ü€"]
+
+
+@pytest.mark.parametrize("inp", [["forty"], iter(["forty"]), io.BytesIO(b"forty\n")])
+def test_inputi_of_a_non_number_is_a_type_error(inp):
+    program = ["(class main (field n 0) (method main () (begin (inputi n) (print n))))"]
+    interpreter = Interpreter(console_output=False, inp=inp)
+    with pytest.raises(RuntimeError, match="Invalid integer input forty"):
+        interpreter.run(program)
+    assert interpreter.get_error_type_and_line()[0] == ErrorType.TYPE_ERROR
@@ -0,0 +1,22 @@
+import pytest
+
+from interpreterv1 import Interpreter
+
+GCD = [
+    "(class main",
+    "  (method gcd (a b) (if (== b 0) (return a) (return (call me gcd b (% a b)))))",
+    "  (method main ()",
+    "    (begin (print (call me gcd 1071 462)) (print (call me gcd 462 21)))",
+    "  )",
+    ")",
+]
+
+
+@pytest.mark.parametrize("engine", [Interpreter.TREE_ENGINE, Interpreter.BYTECODE_ENGINE])
+def test_tail_calls_to_memoized_methods_are_cached(engine):
+    interpreter = Interpreter(console_output=False, engine=engine, memoize=True)
+    interpreter.run(GCD)
+    assert interpreter.get_output() == ["21", "21"]
+    stats = interpreter.get_memo_stats()["main.gcd"]
+    # every step of the first recursion is stored, so the second one hits gcd 21 0
+    assert (stats["misses"], stats["hits"]) == (5, 1)
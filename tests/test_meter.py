@@ -0,0 +1,83 @@
+import pytest
+
+from interpreterv1 import Interpreter
+from meter import StepLimitExceeded, TimeLimitExceeded
+
+# main and ten calls of inc are 11 calls, the ten runs of the loop body 10
+# loops and the main object and ten more 11 allocations
+PROGRAM = [
+    "(class main",
+    "  (field i 0)",
+    "  (field o null)",
+    "  (method inc (x) (return (+ x 1)))",
+    "  (method main ()",
+    "    (begin",
+    "      (while (< i 10)",
+    "        (begin (set i (call me inc i)) (set o (new main)) (print i))",
+    "      )",
+    '      (print "done")',
+    "    )",
+    "  )",
+    ")",
+]
+STEPS = 21
+
+FOREVER = ["(class main (method main () (while true (print 1))))"]
+
+ENGINES = [
+    {"engine": Interpreter.TREE_ENGINE},
+    {"engine": Interpreter.TREE_ENGINE, "optimize": True},
+    {"engine": Interpreter.BYTECODE_ENGINE},
+    {"engine": Interpreter.BYTECODE_ENGINE, "optimize": True},
+    {"engine": Interpreter.PYTHON_ENGINE},
+    {"engine": Interpreter.PYTHON_ENGINE, "optimize": True},
+]
+
+
+def run(program, **options):
+    interpreter = Interpreter(console_output=False, **options)
+    exception = None
+    try:
+        interpreter.run(program)
+    except (StepLimitExceeded, TimeLimitExceeded) as e:
+        exception = type(e)
+    report = interpreter.get_meter_report()
+    del report["elapsed"]
+    return list(interpreter.get_output()), exception, report
+
+
+def test_the_optimizer_marks_the_loop_single_condition():
+    interpreter = Interpreter(console_output=False, optimize=True)
+    interpreter.run(PROGRAM)
+    assert interpreter.get_optimizer_stats()["single_condition_loops"] == 1
+
+
+@pytest.mark.parametrize("options", ENGINES)
+def test_report_counts_calls_loops_and_allocations(options):
+    output, exception, report = run(PROGRAM, meter=True, **options)
+    assert output == [str(i) for i in range(1, 11)] + ["done"]
+    assert exception is None
+    assert report == {"steps": STEPS, "loops": 10, "calls": 11, "allocations": 11}
+
+
+@pytest.mark.parametrize("options", ENGINES)
+def test_a_run_of_exactly_max_steps_finishes(options):
+    _, exception, report = run(PROGRAM, max_steps=STEPS, **options)
+    assert exception is None
+    assert report["steps"] == STEPS
+
+
+@pytest.mark.parametrize("max_steps", [0, 1, 2, 12, STEPS - 1])
+def test_every_engine_stops_at_the_same_step(max_steps):
+    results = [run(PROGRAM, max_steps=max_steps, **options) for options in ENGINES]
+    output, exception, report = results[0]
+    assert exception is StepLimitExceeded
+    assert report["steps"] == max_steps + 1
+    assert all(result == results[0] for result in results)
+
+
+@pytest.mark.parametrize("options", ENGINES)
+def test_time_limit_stops_an_endless_loop(options):
+    _, exception, report = run(FOREVER, time_limit=0.05, **options)
+    assert exception is TimeLimitExceeded
+    assert report["loops"] > 0
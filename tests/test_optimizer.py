@@ -0,0 +1,109 @@
+import pytest
+
+from interpreterv1 import Interpreter
+
+PROGRAM = [
+    "(class main",
+    "  (field i 0)",
+    "  (field k 3)",
+    "  (field total 0)",
+    "  (method main ()",
+    "    (begin",
+    "      (print (* (+ 2 3) 4))",
+    '      (if false (print "dead") (print "alive"))',
+    '      (if true (print "yes"))',
+    '      (while false (print "never"))',
+    "      (while (< i 3)",
+    "        (begin",
+    "          (set total (+ total (* k k)))",
+    "          (set i (+ i 1))))",
+    "      (print total))))",
+]
+
+
+def run(program, engine=Interpreter.TREE_ENGINE, optimize=True):
+    interpreter = Interpreter(console_output=False, engine=engine, optimize=optimize)
+    exception = None
+    try:
+        interpreter.run(program)
+    except RuntimeError as e:
+        exception = str(e)
+    stats = interpreter.get_optimizer_stats()
+    return interpreter.get_output(), exception, stats
+
+
+def expected_stats(**counts):
+    stats = {
+        "folded_expressions": 0,
+        "deferred_folds": 0,
+        "pruned_branches": 0,
+        "flattened_blocks": 0,
+        "single_condition_loops": 0,
+        "hoisted_expressions": 0,
+    }
+    stats.update(counts)
+    return stats
+
+
+def test_folds_prunes_and_hoists():
+    output, _, stats = run(PROGRAM)
+    assert output == ["20", "alive", "yes", "27"]
+    assert stats == expected_stats(
+        folded_expressions=2,  # (+ 2 3), then (* 5 4)
+        pruned_branches=3,  # if false, if true and while false
+        flattened_blocks=1,  # the begin that held the pruned while
+        single_condition_loops=1,
+        hoisted_expressions=1,  # (* k k)
+    )
+
+
+@pytest.mark.parametrize("engine", Interpreter.ENGINES)
+def test_output_is_unchanged(engine):
+    assert run(PROGRAM, engine)[:2] == run(PROGRAM, engine, optimize=False)[:2]
+
+
+def test_no_stats_without_optimize():
+    assert run(PROGRAM, optimize=False)[2] is None
+
+
+def test_failing_fold_is_left_for_run_time():
+    program = [
+        "(class main",
+        '  (method main () (begin (print "before") (print (+ 1 true))))',
+        ")",
+    ]
+    output, exception, stats = run(program)
+    assert stats == expected_stats(deferred_folds=1)
+    assert (output, exception) == run(program, optimize=False)[:2]
+    assert output == ["before"]
+    assert exception.startswith("ErrorType.TYPE_ERROR")
+
+
+def test_joins_constant_print_arguments():
+    program = [
+        "(class main",
+        "  (field x 1)",
+        '  (method main () (print "a" "b" x "c" true))',
+        ")",
+    ]
+    output, _, stats = run(program)
+    assert output == ["ab1ctrue"]
+    assert stats["folded_expressions"] == 2  # "a" with "b", and "c" with true
+    assert output == run(program, optimize=False)[0]
+
+
+def test_calls_in_a_loop_keep_fields_but_not_parameters_from_being_hoisted():
+    program = [
+        "(class main",
+        "  (field k 2)",
+        "  (field i 0)",
+        "  (method bump () (set k (+ k 1)))",
+        "  (method loop (p)",
+        "    (while (< i 3)",
+        '      (begin (print "k " (* k k) " p " (* p p)) (call me bump) (set i (+ i 1)))))',
+        "  (method main () (call me loop 5))",
+        ")",
+    ]
+    output, _, stats = run(program)
+    assert stats["hoisted_expressions"] == 1  # (* p p) only
+    assert output == run(program, optimize=False)[0] == ["k 4 p 25", "k 9 p 25", "k 16 p 25"]
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from asyncinterpreter import AsyncInterpreter
+from interpreterv1 import Interpreter
+from outputsink import BufferedSink, OutputSink
+
+PROGRAM = ["(class main (method main () (begin (print 1) (print 2))))"]
+FAILING = ["(class main (method main () (begin (print 1) (print (+ 1 true)))))"]
+
+
+def test_run_closes_the_file_a_sink_opened(tmp_path):
+    path = tmp_path / "out.txt"
+    sink = BufferedSink(str(path))
+    Interpreter(console_output=False, output_sink=sink).run(PROGRAM)
+    assert sink.stream is None
+    assert path.read_text() == "1\n2\n"
+
+    # a second run appends to the file the first one closed
+    Interpreter(console_output=False, output_sink=sink).run(PROGRAM)
+    assert sink.stream is None
+    assert path.read_text() == "1\n2\n1\n2\n"
+
+
+def test_failed_run_closes_the_sink(tmp_path):
+    path = tmp_path / "out.txt"
+    sink = BufferedSink(str(path))
+    interpreter = Interpreter(console_output=False, output_sink=sink)
+    try:
+        interpreter.run(FAILING)
+    except Exception:
+        pass
+    assert interpreter.get_error_type_and_line()[0] is not None
+    assert sink.stream is None
+    assert path.read_text() == "1\n"
+
+
+def test_run_leaves_a_given_stream_open(tmp_path):
+    with open(tmp_path / "out.txt", "w") as stream:
+        sink = BufferedSink(stream)
+        Interpreter(console_output=False, output_sink=sink).run(PROGRAM)
+        assert not stream.closed
+
+
+def test_run_async_closes_the_sink(tmp_path):
+    path = tmp_path / "out.txt"
+    sink = BufferedSink(str(path))
+    asyncio.run(AsyncInterpreter(output_sink=sink).run_async(PROGRAM))
+    assert sink.stream is None
+    assert path.read_text() == "1\n2\n"
+
+
+def test_a_sink_must_define_write():
+    class NoWrite(OutputSink):
+        pass
+
+    with pytest.raises(TypeError):
+        NoWrite()
+
+
+def test_subclass_only_needs_write():
+    class ListSink(OutputSink):
+        def __init__(self):
+            self.lines = []
+
+        def write(self, line):
+            self.lines.append(line)
+
+    sink = ListSink()
+    Interpreter(console_output=False, output_sink=sink).run(PROGRAM)
+    assert sink.lines == ["1", "2"]
@@ -0,0 +1,92 @@
+import pytest
+
+from interpreterv1 import Interpreter
+
+PROGRAM = [
+    "(class main",
+    "  (field i 0)",
+    "  (method twice (x) (return (* x 2)))",
+    "  (method down (n) (if (== n 0) (return n) (return (call me down (- n 1)))))",
+    "  (method main ()",
+    "    (begin",
+    "      (while (< i 3)",
+    "        (begin",
+    "          (print (call me twice i))",
+    "          (set i (+ i 1))))",
+    "      (print (call me down 4))))",
+    ")",
+]
+
+
+def profile(program, **options):
+    interpreter = Interpreter(console_output=False, trace_output=True, **options)
+    interpreter.run(program)
+    return interpreter
+
+
+def parse_report(report):
+    method_lines, line_lines = report.split("\n\n")
+    calls = {}
+    for line in method_lines.split("\n")[1:]:
+        name, method_calls, _, _ = line.split()
+        calls[name] = int(method_calls)
+    hits = {}
+    for line in line_lines.split("\n")[1:]:
+        line_num, line_hits = line.split()
+        hits[int(line_num)] = int(line_hits)
+    return calls, hits
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_output_is_the_same_with_and_without_profiling(optimize):
+    plain = Interpreter(console_output=False, optimize=optimize)
+    plain.run(PROGRAM)
+    assert profile(PROGRAM, optimize=optimize).get_output() == plain.get_output()
+    assert plain.get_output() == ["0", "2", "4", "0"]
+
+
+def test_counts_calls_per_method_tail_calls_included():
+    calls, _ = parse_report(profile(PROGRAM).get_profile_report())
+    assert calls == {"main.main": 1, "main.twice": 3, "main.down": 5}
+
+
+def test_counts_statements_per_source_line():
+    _, hits = parse_report(profile(PROGRAM).get_profile_report())
+    assert hits == {
+        3: 3,  # the return of twice
+        4: 10,  # the if and the return of every call of down
+        6: 1,  # the begin of main
+        7: 1,  # the while
+        8: 3,  # the begin of the loop body
+        9: 3,
+        10: 3,
+        11: 1,
+    }
+
+
+def test_report_is_sorted_and_limited():
+    report = profile(PROGRAM).get_profile_report(limit=2)
+    method_lines, line_lines = report.split("\n\n")
+    header, *methods = method_lines.split("\n")
+    assert header.split() == ["method", "calls", "inclusive", "ms", "exclusive", "ms"]
+    assert len(methods) == 2
+    assert line_lines.split("\n")[1:] == [f"{4:6d} {10:10d}", f"{3:6d} {3:10d}"]
+
+
+def test_each_run_gets_a_fresh_profile():
+    interpreter = profile(PROGRAM)
+    interpreter.reset()
+    interpreter.run(PROGRAM)
+    calls, _ = parse_report(interpreter.get_profile_report())
+    assert calls["main.twice"] == 3
+
+
+def test_no_report_without_trace_output():
+    interpreter = Interpreter(console_output=False)
+    interpreter.run(PROGRAM)
+    assert interpreter.get_profile_report() is None
+
+
+def test_trace_output_needs_the_tree_engine():
+    with pytest.raises(ValueError):
+        Interpreter(console_output=False, trace_output=True, engine=Interpreter.BYTECODE_ENGINE)
@@ -0,0 +1,121 @@
+import ast
+import os
+import shutil
+
+import pytest
+
+import programcache
+from interpreterv1 import Interpreter
+from programcache import CACHED_MODULES, ENTRY_SUFFIX, ProgramCache
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(programcache.__file__))
+
+PROGRAM = [
+    "(class main",
+    "  (field x 5)",
+    '  (method main () (begin (print "x is " x) (print (* x x))))',
+    ")",
+]
+
+
+def imported_modules(module):
+    with open(os.path.join(PACKAGE_DIR, module)) as module_file:
+        tree = ast.parse(module_file.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module:
+            yield node.module + ".py"
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name + ".py"
+
+
+def test_fingerprint_covers_every_module_the_cached_modules_import():
+    for module in CACHED_MODULES:
+        for imported in imported_modules(module):
+            if os.path.exists(os.path.join(PACKAGE_DIR, imported)):
+                assert imported in CACHED_MODULES, f"{module} imports {imported}"
+
+
+def entries(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(ENTRY_SUFFIX))
+
+
+def run(cache_dir, **options):
+    interpreter = Interpreter(console_output=False, cache_dir=str(cache_dir), **options)
+    interpreter.run(PROGRAM)
+    return interpreter.get_output()
+
+
+def test_hit_gives_the_output_of_a_cold_run(tmp_path, monkeypatch):
+    cold = run(tmp_path)
+    assert len(entries(tmp_path)) == 1
+
+    def no_parse(program):
+        raise AssertionError("a cache hit must not parse the program")
+
+    monkeypatch.setattr(Interpreter, "parse_program", staticmethod(no_parse))
+    assert run(tmp_path) == cold == ["x is 5", "25"]
+
+
+def test_options_that_change_lowering_get_their_own_entry(tmp_path):
+    assert run(tmp_path) == run(tmp_path, optimize=True)
+    assert len(entries(tmp_path)) == 2
+
+
+@pytest.mark.parametrize("damage", ["truncate", "garbage", "empty"])
+def test_damaged_entry_is_a_miss(tmp_path, damage):
+    cold = run(tmp_path)
+    [name] = entries(tmp_path)
+    path = tmp_path / name
+    data = path.read_bytes()
+    if damage == "truncate":
+        path.write_bytes(data[: len(data) // 2])
+    elif damage == "garbage":
+        path.write_bytes(b"not a pickle" * 10)
+    else:
+        path.write_bytes(b"")
+
+    cache = ProgramCache(str(tmp_path))
+    assert cache.load(name[: -len(ENTRY_SUFFIX)]) is None
+    assert not path.exists()  # removed so the next run stores a good one
+    assert run(tmp_path) == cold
+    assert entries(tmp_path) == [name]
+
+
+def test_changed_cached_module_invalidates_entries(tmp_path, monkeypatch):
+    package = tmp_path / "package"
+    package.mkdir()
+    for module in CACHED_MODULES:
+        shutil.copy(os.path.join(PACKAGE_DIR, module), package / module)
+    # the fingerprint hashes the modules next to programcache.py
+    monkeypatch.setattr(programcache, "__file__", str(package / "programcache.py"))
+    monkeypatch.setattr(ProgramCache, "version_fingerprint", None)
+
+    cache_dir = str(tmp_path / "cache")
+    cache = ProgramCache(cache_dir)
+    cache.store("key", "value")
+    assert cache.load("key") == "value"
+
+    with open(package / "quickening.py", "a") as module_file:
+        module_file.write("\n# changed\n")
+    monkeypatch.setattr(ProgramCache, "version_fingerprint", None)
+    assert ProgramCache(cache_dir).load("key") is None
+    assert entries(cache_dir) == []
+
+
+def test_eviction_removes_the_least_recently_used_entries(tmp_path):
+    cache = ProgramCache(str(tmp_path))
+    value = "x" * 1000
+    for index, key in enumerate(["a", "b", "c"]):
+        cache.store(key, value)
+        os.utime(cache.get_path(key), (1000 + index, 1000 + index))
+    entry_size = os.path.getsize(cache.get_path("a"))
+
+    assert cache.load("a") == value  # now the most recently used
+    cache.max_bytes = 3 * entry_size
+    cache.store("d", value)
+    assert entries(tmp_path) == sorted(key + ENTRY_SUFFIX for key in "acd")
+
+    cache.max_bytes = 2 * entry_size
+    cache.store("e", value)
+    assert entries(tmp_path) == sorted(key + ENTRY_SUFFIX for key in "de")
@@ -0,0 +1,43 @@
+import io
+
+import pytest
+
+from intbase import ErrorType
+from interpreterv1 import Interpreter
+from programsource import ProgramSource, open_program
+
+SOURCE = '(class main\n  (method main () (print "from " "source")))\n'
+
+
+def run(program):
+    interpreter = Interpreter(console_output=False)
+    interpreter.run(program)
+    return interpreter.get_output()
+
+
+def test_str_is_source_text():
+    assert open_program(SOURCE) == SOURCE.split("\n")
+    assert run(SOURCE) == run(SOURCE.split("\n")) == ["from source"]
+
+
+def test_str_is_never_opened_as_a_path(tmp_path):
+    path = tmp_path / "program.brewin"
+    path.write_text(SOURCE)
+    assert open_program(str(path)) == [str(path)]
+    interpreter = Interpreter(console_output=False)
+    with pytest.raises(RuntimeError):
+        interpreter.run(str(path))  # a program without a main class
+    assert interpreter.get_error_type_and_line() == (ErrorType.SYNTAX_ERROR, None)
+
+
+def test_paths_and_files_are_read_as_a_program_source(tmp_path):
+    path = tmp_path / "program.brewin"
+    path.write_text(SOURCE)
+    assert isinstance(open_program(path), ProgramSource)
+    assert run(path) == ["from source"]
+    assert run(io.BytesIO(SOURCE.encode("utf-8"))) == ["from source"]
+
+
+def test_lists_are_returned_as_is():
+    lines = SOURCE.split("\n")
+    assert open_program(lines) is lines
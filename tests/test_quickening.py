@@ -0,0 +1,78 @@
+import pytest
+
+from interpreterv1 import Interpreter
+from quickening import MAX_DEOPTIMIZATIONS, WARMUP
+
+INTS = ("1", "1", "true")
+STRINGS = ('"a"', '"b"', "false")
+
+
+def program(calls):
+    # op holds the only operator of the program, so its node is the only one counted
+    return (
+        [
+            "(class main",
+            "  (method op (x y) (return (== x y)))",
+            "  (method main ()",
+            "    (begin",
+        ]
+        + [f"      (print (call me op {left} {right}))" for left, right, _ in calls]
+        + ["    )", "  )", ")"]
+    )
+
+
+def run(engine, calls):
+    interpreter = Interpreter(console_output=False, engine=engine)
+    interpreter.run(program(calls))
+    assert interpreter.get_output() == [expected for _, _, expected in calls]
+    return interpreter.get_quickening_stats()
+
+
+def stats(specializations, deoptimizations, specialized):
+    return {
+        "specializations": specializations,
+        "deoptimizations": deoptimizations,
+        "specialized": {"int ==": 1} if specialized else {},
+    }
+
+
+ENGINES = [Interpreter.TREE_ENGINE, Interpreter.BYTECODE_ENGINE]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_specializes_after_warmup(engine):
+    assert run(engine, [INTS] * (WARMUP - 1)) == stats(0, 0, False)
+    assert run(engine, [INTS] * WARMUP) == stats(1, 0, True)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_deoptimizes_on_a_type_change_and_warms_up_longer(engine):
+    calls = [INTS] * WARMUP + [STRINGS]
+    assert run(engine, calls) == stats(1, 1, False)
+    calls += [INTS] * (2 * WARMUP - 1)
+    assert run(engine, calls) == stats(1, 1, False)
+    calls += [INTS]
+    assert run(engine, calls) == stats(2, 1, True)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_stays_generic_after_max_deoptimizations(engine):
+    calls = []
+    for deoptimizations in range(MAX_DEOPTIMIZATIONS):
+        calls += [INTS] * (WARMUP << deoptimizations) + [STRINGS]
+    assert run(engine, calls) == stats(MAX_DEOPTIMIZATIONS, MAX_DEOPTIMIZATIONS, False)
+    calls += [INTS] * (WARMUP << MAX_DEOPTIMIZATIONS)
+    assert run(engine, calls) == stats(MAX_DEOPTIMIZATIONS, MAX_DEOPTIMIZATIONS, False)
+
+
+def test_errors_are_the_same_once_specialized():
+    calls = [INTS] * WARMUP
+    source = program(calls)
+    source.insert(-3, "      (print (call me op 1 true))")
+    outputs = []
+    for engine in ENGINES + [Interpreter.PYTHON_ENGINE]:
+        interpreter = Interpreter(console_output=False, engine=engine)
+        with pytest.raises(RuntimeError, match="Can't use operator == with value 1 and True"):
+            interpreter.run(source)
+        outputs.append(interpreter.get_output())
+    assert outputs == [["true"] * WARMUP] * 3
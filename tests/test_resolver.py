@@ -0,0 +1,56 @@
+from intbase import ErrorType
+from interpreterv1 import Interpreter
+
+PROGRAM = [
+    "(class counter",
+    "  (field count 0)",
+    "  (method bump (step) (set cuont (+ count step)))",
+    "  (method get () (return count))",
+    ")",
+    "(class main",
+    "  (field c null)",
+    "  (method show (count) (print count))",
+    "  (method main ()",
+    "    (begin",
+    "      (set c (new counter))",
+    "      (call me show 3)",
+    '      (if false (print "never " missing))',
+    "      (call c bump 2)))",
+    ")",
+]
+
+
+def test_reports_undefined_variables_and_field_typos():
+    interpreter = Interpreter(console_output=False)
+    interpreter.check_program(PROGRAM)
+    # a parameter that shadows a field resolves, so show reports nothing
+    assert sorted(interpreter.get_unresolved_names()) == [
+        ("counter", "bump", "cuont", 2),
+        ("main", "main", "missing", 12),
+    ]
+
+
+def test_unresolved_names_only_fail_when_reached():
+    interpreter = Interpreter(console_output=False)
+    try:
+        interpreter.run(PROGRAM)
+    except RuntimeError:
+        pass
+    assert interpreter.get_output() == ["3"]
+    # the original interpreter reports the error without a line
+    assert interpreter.get_error_type_and_line() == (ErrorType.NAME_ERROR, None)
+    assert ("main", "main", "missing", 12) in interpreter.get_unresolved_names()
+
+
+def test_methods_never_called_are_not_resolved():
+    interpreter = Interpreter(console_output=False)
+    interpreter.run(
+        [
+            "(class main",
+            "  (method unused () (print nowhere))",
+            '  (method main () (print "ok"))',
+            ")",
+        ]
+    )
+    assert interpreter.get_output() == ["ok"]
+    assert interpreter.get_unresolved_names() == []
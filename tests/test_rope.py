@@ -0,0 +1,91 @@
+import pytest
+
+from interpreterv1 import Interpreter
+from operations import evaluate_logic, to_print_string
+from rope import MIN_ROPE_LENGTH, Rope, concat
+
+HALF = "x" * (MIN_ROPE_LENGTH // 2)
+
+
+def test_short_results_stay_plain_strings():
+    result = concat("a" * (MIN_ROPE_LENGTH - 2), "b")
+    assert result.__class__ is str
+    assert result == "a" * (MIN_ROPE_LENGTH - 2) + "b"
+
+
+def test_results_from_min_rope_length_on_are_ropes():
+    result = concat(HALF, HALF)
+    assert result.__class__ is Rope
+    assert str(result) == HALF * 2
+
+    longer = concat(concat(result, "y"), Rope(["z", "z"], 2))
+    assert longer.__class__ is Rope
+    assert str(longer) == HALF * 2 + "yzz"
+
+
+def test_ropes_built_on_the_same_rope_stay_apart():
+    base = concat(HALF, HALF)
+    left = concat(base, "left")
+    right = concat(base, "right")
+    assert str(right) == HALF * 2 + "right"
+    assert str(left) == HALF * 2 + "left"
+    assert str(base) == HALF * 2
+
+
+def test_str_joins_once_and_later_appends_start_from_the_text():
+    rope = concat(concat(HALF, HALF), "a")
+    text = str(rope)
+    assert rope.pieces == [text] and rope.count == 1
+    assert str(rope) is text
+    assert str(concat(rope, "b")) == text + "b"
+
+
+@pytest.mark.parametrize(
+    "operator, other, expected",
+    [
+        ("==", HALF * 2, True),
+        ("==", HALF, False),
+        ("!=", HALF * 2, False),
+        ("!=", HALF, True),
+        ("<", HALF * 2 + "a", True),
+        ("<", HALF, False),
+    ],
+)
+def test_compares_with_strings_by_value(operator, other, expected):
+    rope = concat(HALF, HALF)
+    assert evaluate_logic(None, operator, rope, other) is expected
+    assert evaluate_logic(None, operator, rope, Rope([other], 1)) is expected
+    if operator in ("==", "!="):
+        assert evaluate_logic(None, operator, other, rope) is expected
+
+
+def test_prints_as_a_plain_string():
+    printed = to_print_string(concat(HALF, HALF))
+    assert printed.__class__ is str
+    assert printed == HALF * 2
+
+
+PROGRAM = [
+    "(class main",
+    '  (field s "")',
+    "  (field i 0)",
+    "  (method main ()",
+    "    (begin",
+    '      (while (< i 300) (begin (set s (+ s "ab")) (set i (+ i 1))))',
+    "      (print s)",
+    '      (print "same " (== s (+ s "")) " " s)',
+    '      (print (< s (+ s "c")))',
+    "    )",
+    "  )",
+    ")",
+]
+
+
+@pytest.mark.parametrize("engine", Interpreter.ENGINES)
+def test_programs_see_ropes_as_strings(engine):
+    interpreter = Interpreter(console_output=False, engine=engine)
+    interpreter.run(PROGRAM)
+    output = interpreter.get_output()
+    built = "ab" * 300
+    assert output == [built, "same True " + built, "true"]
+    assert all(line.__class__ is str for line in output)
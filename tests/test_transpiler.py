@@ -0,0 +1,23 @@
+from interpreterv1 import Interpreter
+from transpiler import mangle
+
+COLLIDING_NAMES = ["a-b", "a_2d_b", "a_b", "a__b", "_", "__", "a?", "a_3f_"]
+
+
+def test_mangle_is_one_to_one():
+    mangled = [mangle(name) for name in COLLIDING_NAMES]
+    assert len(set(mangled)) == len(mangled)
+    assert all(name.isidentifier() for name in mangled)
+
+
+def test_fields_with_colliding_names_stay_apart():
+    program = [
+        "(class main",
+        "  (field a-b 1)",
+        "  (field a_2d_b 2)",
+        '  (method main () (print a-b " " a_2d_b))',
+        ")",
+    ]
+    interpreter = Interpreter(console_output=False, engine=Interpreter.PYTHON_ENGINE)
+    interpreter.run(program)
+    assert interpreter.get_output() == ["1 2"]
@@ -0,0 +1,452 @@
+"""
+Backend that translates every Brewin class into Python source, compiles it
+with compile() and lets CPython run the methods directly.
+
+Brewin classes become Python classes whose fields are slot attributes, and
+methods become Python functions. Operator sites get an inline fast path for
+the common operand types and fall back to the shared helpers in
+operations.py, so type errors are reported exactly as in the other engines.
+"""
+
+from collections import OrderedDict
+import hashlib
+
+from object import ObjectDefinition
+from operations import (
+    arity_error,
+    condition_error,
+    evaluate_arithmatic,
+    evaluate_logic,
+    evaluate_not,
+    invalid_expression,
+    malformed_if_error,
+    null_reference_error,
+    to_print_string,
+    unknown_class_error,
+    unknown_method_error,
+    unknown_name_error,
+)
+import nodes
+
+# fast paths for operators, used when both operands have the listed type
+INT_OPERATIONS = {
+    "+": "+",
+    "-": "-",
+    "*": "*",
+    "/": "//",
+    "%": "%",
+    "<": "<",
+    ">": ">",
+    "<=": "<=",
+    ">=": ">=",
+    "==": "==",
+    "!=": "!=",
+}
+BOOL_OPERATIONS = {"&": "&", "|": "|"}
+
+
+def mangle(name):
+    # one-to-one: "_" is doubled, so "a-b" (a_2d_b) and "a_2d_b" (a__2d__b) differ
+    return "".join(mangle_char(char) for char in name)
+
+
+def mangle_char(char):
+    if char.isascii() and char.isalnum():
+        return char
+    if char == "_":
+        return "__"
+    return f"_{ord(char):x}_"
+
+
+class BrewinObject:
+    __slots__ = ()
+    METHODS = {}
+
+
+class Runtime:
+    """Names the generated code uses, bound to one interpreter."""
+
+    def __init__(self, interpreter_obj):
+        self.interpreter_obj = interpreter_obj
+        self.classes = {}
+
+    def namespace(self):
+        interpreter_obj = self.interpreter_obj
+        names = {
+            "_BrewinObject": BrewinObject,
+            "_classes": self.classes,
+            "_NRV": ObjectDefinition.NO_RETURN_VALUE,
+            "_out": interpreter_obj.output,
+            "_in": interpreter_obj.get_input,
+            "_ini": interpreter_obj.get_int_input,
+            "_ps": to_print_string,
+            "_arith": lambda operator, left, right: evaluate_arithmatic(
+                interpreter_obj, operator, left, right
+            ),
+            "_logic": lambda operator, left, right: evaluate_logic(
+                interpreter_obj, operator, left, right
+            ),
+            "_not": lambda operand: evaluate_not(interpreter_obj, operand),
+            "_invoke": self.invoke,
+            "_invoke_dropped": self.invoke_dropped,
+            "_new": self.new,
+            "_check": self.check,
+            "_invalid": self.invalid,
+            "_name_error": self.name_error,
+            "_if_error": self.if_error,
+            "_while_error": self.while_error,
+            "_syntax_error": self.syntax_error,
+        }
+        meter = interpreter_obj.meter
+        if meter is not None:
+            # called only by the code of a metered run, see meter.py
+            names["_call"] = meter.count_call
+            names["_step"] = meter.count_step
+            names["_alloc"] = meter.count_allocation
+        return names
+
+    def invoke(self, method_name, evaluated_args, receiver, receiver_name):
+        if receiver is None:
+            self.interpreter_obj.error(*null_reference_error(receiver_name))
+        method = receiver.METHODS.get(method_name)
+        if method is None:
+            self.interpreter_obj.error(*unknown_method_error(method_name))
+        function, parameter_count = method
+        if len(evaluated_args) != parameter_count:
+            self.interpreter_obj.error(
+                *arity_error(method_name, parameter_count, len(evaluated_args))
+            )
+        return function(receiver, *evaluated_args)
+
+    def invoke_dropped(self, receiver, method_name, evaluated_args):
+        # the result of calling an evaluated expression is dropped
+        self.invoke(method_name, evaluated_args, receiver, receiver)
+
+    def new(self, class_name):
+        if class_name not in self.classes:
+            self.interpreter_obj.error(*unknown_class_error(class_name))
+        return self.classes[class_name]()
+
+    def check(self, value, constant_index):
+        if value is None:
+            self.invalid(constant_index)
+        return value
+
+    def invalid(self, constant_index):
+        raise invalid_expression(self.constants[constant_index])
+
+    def name_error(self, *_evaluated):
+        self.interpreter_obj.error(*unknown_name_error())
+
+    def if_error(self):
+        self.interpreter_obj.error(*condition_error("if"))
+
+    def while_error(self):
+        self.interpreter_obj.error(*condition_error("while"))
+
+    def syntax_error(self):
+        self.interpreter_obj.error(*malformed_if_error())
+
+
+class MethodTranspiler:
+    def __init__(self, classes, class_def, method, constants, metering=False):
+        self.classes = classes
+        self.class_def = class_def
+        self.method = method
+        self.constants = constants
+        self.metering = metering  # counts calls and loops as the other engines do
+        self.lines = []
+        self.temp_count = 0
+        self.parameters = {}
+        parameters = method.get_parameters()
+        for index, name in enumerate(parameters):
+            if name in parameters[index + 1 :]:
+                continue  # a repeated parameter name binds the last argument
+            self.parameters[name] = "p_" + mangle(name)
+
+    def python_parameters(self):
+        names = []
+        parameters = self.method.get_parameters()
+        for index, name in enumerate(parameters):
+            if name in parameters[index + 1 :]:
+                names.append(f"_unused{index}")
+            else:
+                names.append(self.parameters[name])
+        return names
+
+    def transpile(self):
+        arguments = ", ".join(["self"] + self.python_parameters())
+        self.emit(1, f"def m_{mangle(self.method.get_name())}({arguments}):")
+        if self.metering:
+            self.emit(2, "_call()")
+        self.statement(self.method.get_body(), 2, True)
+        self.emit(2, "return None")
+        return self.lines
+
+    def emit(self, depth, line):
+        self.lines.append("    " * depth + line)
+
+    def temp(self):
+        self.temp_count += 1
+        return f"_t{self.temp_count}"
+
+    def constant(self, value):
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def emit_result(self, depth, value, method_level):
+        # a statement that produces a value ends the method or the enclosing
+        # statement-as-expression
+        result = self.temp()
+        self.emit(depth, f"{result} = {value}")
+        self.emit(depth, f"if {result} is not None:")
+        if method_level:
+            self.emit(depth + 1, f"return None if {result} == _NRV else {result}")
+        else:
+            self.emit(depth + 1, f"return {result}")
+
+    def store(self, depth, name, value):
+        if name in self.parameters:
+            self.emit(depth, f"{self.parameters[name]} = {value}")
+        elif name in self.class_def.get_fields():
+            self.emit(depth, f"self.f_{mangle(name)} = {value}")
+        else:
+            self.emit(depth, f"_name_error({value})")
+
+    def statement(self, statement, depth, method_level):
+        kind = statement.kind
+
+        if kind == nodes.PRINT:
+            self.emit(depth, f"_out(_ps({self.expression(statement.value, depth)}))")
+        elif kind == nodes.SET:
+            self.store(depth, statement.name, self.expression(statement.value, depth))
+        elif kind == nodes.WHILE and statement.single_condition:
+            condition = self.temp()
+            self.emit(depth, f"{condition} = {self.expression(statement.condition, depth)}")
+            self.emit(depth, f"if type({condition}) is not bool:")
+            self.emit(depth + 1, "_while_error()")
+            self.emit(depth, f"while {condition}:")
+            self.loop_body(statement.body, depth + 1, method_level)
+            value = self.expression(statement.condition, depth + 1)
+            self.emit(depth + 1, f"{condition} = {value}")
+        elif kind == nodes.WHILE:
+            condition = self.expression(statement.condition, depth)
+            self.emit(depth, f"if type({condition}) is not bool:")
+            self.emit(depth + 1, "_while_error()")
+            self.emit(depth, f"while {self.expression(statement.condition, depth)}:")
+            self.loop_body(statement.body, depth + 1, method_level)
+        elif kind == nodes.INPUT:
+            self.store(depth, statement.name, "_ini()" if statement.is_int else "_in()")
+        elif kind == nodes.RETURN:
+            if statement.value is None:
+                self.emit(depth, "return None" if method_level else "return _NRV")
+            else:
+                self.emit_result(
+                    depth, self.expression(statement.value, depth), method_level
+                )
+        elif kind == nodes.CALL or kind == nodes.TAIL_CALL:
+            # CPython has no tail calls, tail calls are plain calls here
+            self.emit_result(depth, self.call(statement, depth), method_level)
+        elif kind == nodes.IF:
+            condition = self.temp()
+            self.emit(depth, f"{condition} = {self.expression(statement.condition, depth)}")
+            self.emit(depth, f"if type({condition}) is not bool:")
+            self.emit(depth + 1, "_if_error()")
+            self.emit(depth, f"if {condition}:")
+            self.block(statement.then_statement, depth + 1, method_level)
+            if statement.else_statement is not None:
+                self.emit(depth, "else:")
+                self.block(statement.else_statement, depth + 1, method_level)
+        elif kind == nodes.BEGIN:
+            for nested_statement in statement.statements:
+                self.statement(nested_statement, depth, method_level)
+        elif kind == nodes.SYNTAX_ERROR:
+            self.emit(depth, "_syntax_error()")
+        elif kind == nodes.INVALID:
+            self.emit(depth, f"_invalid({self.constant(statement.expression)})")
+
+    def block(self, statement, depth, method_level):
+        line_count = len(self.lines)
+        self.statement(statement, depth, method_level)
+        if len(self.lines) == line_count:
+            self.emit(depth, "pass")
+
+    def loop_body(self, statement, depth, method_level):
+        self.block(statement, depth, method_level)
+        if self.metering:
+            self.emit(depth, "_step()")  # after every run of the body
+
+    def call(self, call, depth):
+        method_name = str(call.method_name)
+        if call.target_kind == nodes.CALL_EXPRESSION:
+            target = self.expression(call.target, depth)  # evaluated before the args
+        args = [self.expression(arg, depth) for arg in call.args]
+        arg_tuple = f"({', '.join(args)},)" if args else "()"
+
+        if call.target_kind == nodes.CALL_EXPRESSION:
+            return f"_invoke_dropped({target}, {method_name!r}, {arg_tuple})"
+        if call.target_kind == nodes.CALL_ME:
+            if call.static_method is not None:  # checked by checker.py
+                return f"self.m_{mangle(method_name)}({', '.join(args)})"
+            return f"_invoke({method_name!r}, {arg_tuple}, self, 'me')"
+
+        target = call.target
+        if target in self.class_def.get_fields():
+            receiver = f"self.f_{mangle(target)}"
+        elif target in self.parameters:
+            receiver = self.parameters[target]
+        else:
+            receiver = repr(str(target))
+        return f"_invoke({method_name!r}, {arg_tuple}, {receiver}, {str(target)!r})"
+
+    def expression(self, expression, depth):
+        kind = expression.kind
+
+        if kind == nodes.CONST:
+            return repr(expression.value)
+        elif kind == nodes.NAME:
+            name = expression.name
+            if name in self.parameters:
+                return self.parameters[name]
+            elif name in self.class_def.get_fields():
+                return f"self.f_{mangle(name)}"
+            return "_name_error()"
+        elif kind == nodes.BINARY:
+            return self.binary(expression, depth)
+        elif kind == nodes.NOT:
+            operand = self.temp()
+            value = self.expression(expression.operand, depth)
+            return f"(not {operand} if type({operand} := {value}) is bool else _not({operand}))"
+        elif kind == nodes.CALL or kind == nodes.TAIL_CALL:
+            index = self.constant(expression.expression)
+            return f"_check({self.call(expression, depth)}, {index})"
+        elif kind == nodes.NEW:
+            class_name = str(expression.class_name)
+            if expression.class_def is not None:
+                return f"Brewin_{mangle(class_name)}()"
+            return f"_new({class_name!r})"
+        elif kind == nodes.STATEMENT:
+            return self.statement_expression(expression, depth)
+        elif kind == nodes.CACHED:
+            # loop invariants are left to CPython
+            return self.expression(expression.expression, depth)
+        elif kind == nodes.CONCAT:
+            pieces = []
+            for part, formatter in zip(expression.parts, expression.formatters):
+                value = self.expression(part, depth)
+                pieces.append(f"_ps({value})" if formatter is to_print_string else f"str({value})")
+            return f"''.join(({', '.join(pieces)},))"
+        return f"_invalid({self.constant(expression.expression)})"
+
+    def binary(self, expression, depth):
+        operator = expression.operator
+        left, right = self.temp(), self.temp()
+        left_value = self.expression(expression.left, depth)
+        right_value = self.expression(expression.right, depth)
+        if expression.handler is evaluate_arithmatic:
+            fallback = f"_arith({operator!r}, {left}, {right})"
+        else:
+            fallback = f"_logic({operator!r}, {left}, {right})"
+
+        if operator in INT_OPERATIONS:
+            fast_type, fast_operator = "int", INT_OPERATIONS[operator]
+        else:
+            fast_type, fast_operator = "bool", BOOL_OPERATIONS[operator]
+        # & evaluates both sides so the operands are assigned left to right
+        guard = (
+            f"(type({left} := {left_value}) is {fast_type})"
+            f" & (type({right} := {right_value}) is {fast_type})"
+        )
+        return f"({left} {fast_operator} {right} if {guard} else {fallback})"
+
+    def statement_expression(self, expression, depth):
+        # statements used as expressions run in a nested function so that the
+        # first value they produce can be returned to the expression
+        function_name = f"_s{self.temp_count + 1}"
+        self.temp_count += 1
+        self.emit(depth, f"def {function_name}():")
+        if self.parameters:
+            self.emit(depth + 1, f"nonlocal {', '.join(self.parameters.values())}")
+        self.statement(expression.statement, depth + 1, False)
+        self.emit(depth + 1, "return None")
+        return f"_check({function_name}(), {self.constant(expression.expression)})"
+
+
+class Transpiler:
+    def __init__(self, interpreter_obj):
+        self.interpreter_obj = interpreter_obj
+        self.classes = {}
+        self.constants = []
+        self.metering = interpreter_obj.meter is not None
+
+    def transpile(self, classes):
+        self.classes = classes
+        lines = ["# Generated from Brewin source by transpiler.py", ""]
+        for class_name, class_def in classes.items():
+            lines.extend(self.transpile_class(class_name, class_def))
+        return "\n".join(lines) + "\n"
+
+    def transpile_class(self, class_name, class_def):
+        python_name = f"Brewin_{mangle(class_name)}"
+        field_names = [f"f_{mangle(name)}" for name in class_def.get_fields()]
+        lines = [f"class {python_name}(_BrewinObject):"]
+        lines.append(f"    __slots__ = {tuple(field_names)!r}")
+        lines.append("")
+        lines.append("    def __init__(self):")
+        if self.metering:
+            lines.append("        _alloc()")
+        for name, field in class_def.get_fields().items():
+            lines.append(f"        self.f_{mangle(name)} = {field.get_initial_value()!r}")
+        if not class_def.get_fields() and not self.metering:
+            lines.append("        pass")
+        for method in class_def.get_methods().values():
+            lines.append("")
+            lines.extend(MethodTranspiler(
+                    self.classes, class_def, method, self.constants, self.metering
+                ).transpile())
+
+        methods = ", ".join(
+            f"{str(name)!r}: ({python_name}.m_{mangle(name)}, {len(method.get_parameters())})"
+            for name, method in class_def.get_methods().items()
+        )
+        lines.append("")
+        lines.append("")
+        lines.append(f"{python_name}.METHODS = {{{methods}}}")
+        lines.append(f"_classes[{str(class_name)!r}] = {python_name}")
+        lines.append("")
+        lines.append("")
+        return lines
+
+
+class PythonProgram:
+    # compiled code objects, keyed by a hash of the generated source
+    CODE_CACHE = OrderedDict()
+    CODE_CACHE_SIZE = 64
+
+    def __init__(self, interpreter_obj, classes):
+        transpiler = Transpiler(interpreter_obj)
+        self.source = transpiler.transpile(classes)
+        self.runtime = Runtime(interpreter_obj)
+        self.runtime.constants = transpiler.constants
+        exec(self.get_code(), self.runtime.namespace())
+
+    def get_code(self):
+        key = hashlib.sha256(self.source.encode("utf-8")).hexdigest()
+        code = self.CODE_CACHE.get(key)
+        if code is None:
+            code = compile(self.source, "<brewin>", "exec")
+            self.CODE_CACHE[key] = code
+            if len(self.CODE_CACHE) > self.CODE_CACHE_SIZE:
+                self.CODE_CACHE.popitem(last=False)
+        else:
+            self.CODE_CACHE.move_to_end(key)
+        return code
+
+    def get_source(self):
+        return self.source
+
+    def instantiate_object(self, class_name):
+        return self.runtime.classes[class_name]()
+
+    def call_method(self, obj, method_name, evaluated_args):
+        return self.runtime.invoke(method_name, evaluated_args, obj, method_name)
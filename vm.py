@@ -0,0 +1,449 @@
+"""
+Virtual machine that runs the flat instruction lists produced by bytecode.py.
+It is an alternative to the tree-walking execution in ObjectDefinition and
+produces the same output and errors.
+"""
+
+from object import ObjectDefinition
+from operations import (
+    arity_error,
+    condition_error,
+    evaluate_not,
+    invalid_expression,
+    malformed_if_error,
+    null_reference_error,
+    to_print_string,
+    unknown_class_error,
+    unknown_method_error,
+    unknown_name_error,
+)
+from bytecode import (
+    LOAD_PARAMETER,
+    LOAD_FIELD,
+    LOAD_CONST,
+    STORE_PARAMETER,
+    STORE_FIELD,
+    BINARY,
+    JUMP,
+    JUMP_IF_FALSE,
+    CALL,
+    RETURN,
+    JUMP_IF_NOT_NONE,
+    CHECK_VALUE,
+    NOT,
+    NEW,
+    PRINT,
+    TO_STRING,
+    TO_PRINT_STRING,
+    BUILD_STRING,
+    INPUT,
+    INPUT_INT,
+    CHECK_IF_CONDITION,
+    CHECK_WHILE_CONDITION,
+    POP,
+    SYNTAX_ERROR,
+    INVALID_EXPRESSION,
+    TAIL_CALL,
+    LOOP_IF_TRUE,
+    LOAD_CACHED,
+    STORE_CACHED,
+    CLEAR_CACHED,
+    NAME_ERROR,
+    LOOP,
+)
+from inlinecache import lookup_method
+from quickening import DEOPTIMIZE, quicken
+from memoizer import MISSING, get_memo_key
+from nodes import CALL_ME, CALL_NAME, SCOPE_FIELD, SCOPE_PARAMETER, UNSET
+
+
+DEFAULT_MAX_CALL_DEPTH = 100000
+
+# what execute yields to the code running it
+PAUSE = "pause"  # answered with the number of ticks until the next pause
+READ_INPUT = "read input"  # answered with the next input value
+NEVER = -1  # ticks of an execution that never pauses, as it never counts down to 0
+
+
+class VirtualMachine:
+    """
+    Brewin calls do not recurse on the Python stack: the caller's state is
+    saved on a list of frames and the callee runs in the same loop, so the
+    depth of Brewin recursion is only bounded by max_call_depth.
+    """
+
+    def __init__(self, interpreter_obj, max_call_depth=DEFAULT_MAX_CALL_DEPTH):
+        self.interpreter_obj = interpreter_obj
+        self.max_call_depth = max_call_depth
+        self.ticks = NEVER  # left when the last execution stopped
+        self.calls = 0  # made by the last execution
+
+    def get_code(self, method, class_def):
+        if method.code is None:
+            class_def.prepare_method(method)  # lowered and compiled on its first call
+        return method.code
+
+    def call_method(self, obj, method_name, evaluated_args):
+        return self.run(self.start(obj, method_name, evaluated_args))
+
+    def start(self, obj, method_name, evaluated_args):
+        """The execution of a method, a generator; see execute."""
+        code, parameter_values = self.enter_method(obj, method_name, evaluated_args)
+        meter = self.interpreter_obj.meter
+        ticks = NEVER
+        if meter is not None:
+            meter.count_call()  # the method itself, the others are counted by execute
+            ticks = meter.countdown
+        self.ticks = ticks
+        self.calls = 0
+        return self.execute(code, obj, parameter_values, ticks)
+
+    def run(self, execution):
+        # pauses only come from the meter, which checks its budgets
+        meter = self.interpreter_obj.meter
+        try:
+            request = execution.send(None)
+            while True:
+                if request is PAUSE:
+                    request = execution.send(meter.check())
+                else:
+                    request = execution.send(self.interpreter_obj.get_input())
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            self.close(execution)
+
+    def close(self, execution):
+        """Stops execution and adds what it counted to the interpreter's meter."""
+        execution.close()
+        meter = self.interpreter_obj.meter
+        if meter is not None:
+            meter.countdown = self.ticks
+            meter.calls += self.calls
+
+    def enter_method(self, obj, method_name, evaluated_args):
+        methods = obj.class_def.methods
+        if method_name not in methods:
+            self.interpreter_obj.error(*unknown_method_error(method_name))
+
+        method = methods[method_name]
+
+        if len(evaluated_args) != len(method.parameters):
+            self.interpreter_obj.error(
+                *arity_error(method_name, len(method.parameters), len(evaluated_args))
+            )
+
+        return self.get_code(method, obj.class_def), evaluated_args + method.frame_padding
+
+    def execute(self, code, obj, parameter_values, ticks):
+        """
+        Runs code and returns its result, as a generator so that the caller
+        can suspend it. Every run of a loop body and every call counts down
+        ticks; when they reach 0 it yields PAUSE and goes on with the ticks it
+        is sent.
+        An input instruction yields READ_INPUT and stores the value it is sent.
+        """
+        interpreter_obj = self.interpreter_obj
+        max_call_depth = self.max_call_depth
+        no_return_value = ObjectDefinition.NO_RETURN_VALUE
+        # saved callers: (instructions, pc, obj, parameter_values, drop_result,
+        # checked_expression, memo_call); all frames share the operand stack,
+        # a call leaves it as it found it
+        frames = []
+        checked_expression = None  # a tail call in this frame must produce a value
+        memo_call = None  # (memo, key) the result of this frame is stored under
+        instructions = code.instructions
+        fields = obj.fields
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        calls = 0
+
+        try:
+            while True:
+                opcode, argument = instructions[pc]
+                pc += 1
+
+                if opcode == LOAD_PARAMETER:
+                    push(parameter_values[argument])
+                elif opcode == LOAD_FIELD:
+                    push(fields[argument])
+                elif opcode == LOAD_CONST:
+                    push(argument)
+                elif opcode == STORE_PARAMETER:
+                    parameter_values[argument] = pop()
+                elif opcode == STORE_FIELD:
+                    fields[argument] = pop()
+                elif opcode == LOAD_CACHED:
+                    slot, cached_end = argument
+                    value = parameter_values[slot]
+                    if value is not UNSET:
+                        push(value)
+                        pc = cached_end
+                elif opcode == BINARY:
+                    right_operand = pop()
+                    specialized = argument.specialized
+                    if specialized is not None:
+                        result = specialized(stack[-1], right_operand)
+                        if result is not DEOPTIMIZE:
+                            stack[-1] = result
+                            continue
+                    stack[-1] = quicken(argument, interpreter_obj, stack[-1], right_operand)
+                elif opcode == JUMP:
+                    pc = argument
+                elif opcode == JUMP_IF_FALSE:
+                    if not pop():
+                        pc = argument
+                elif opcode == LOOP_IF_TRUE:
+                    # ticks after every run of the body, as LOOP does
+                    ticks -= 1
+                    if ticks == 0:
+                        ticks = yield PAUSE
+                    if pop():
+                        pc = argument
+                elif opcode == LOOP:
+                    pc = argument
+                    ticks -= 1
+                    if ticks == 0:
+                        ticks = yield PAUSE
+                elif opcode == CALL:
+                    target_kind, target, scope, index, arg_count, call = argument
+                    if arg_count:
+                        evaluated_args = stack[-arg_count:]
+                        del stack[-arg_count:]
+                    else:
+                        evaluated_args = []
+
+                    drop_result = False
+                    method = call.static_method
+                    if method is not None:
+                        receiver = obj  # a call on me, checked by checker.py
+                    else:
+                        if target_kind == CALL_ME:
+                            receiver = obj
+                        elif target_kind == CALL_NAME:
+                            receiver = self.get_receiver(
+                                target, scope, index, fields, parameter_values
+                            )
+                        else:
+                            # the result of calling an evaluated expression is dropped
+                            receiver = pop()
+                            drop_result = True
+
+                        if receiver.class_def is call.cached_class:
+                            method = call.cached_method
+                            call.hits += 1
+                        else:
+                            method = lookup_method(call, receiver, evaluated_args)
+                    callee_memo_call = None
+                    if method.memo is not None:
+                        key = get_memo_key(evaluated_args)
+                        if key is not None:
+                            result = method.memo.get(key)
+                            if result is not MISSING:
+                                push(None if drop_result else result)
+                                continue
+                            callee_memo_call = (method.memo, key)
+                    calls += 1
+                    ticks -= 1
+                    if ticks == 0:
+                        ticks = yield PAUSE
+                    if len(frames) >= max_call_depth:
+                        raise RecursionError(
+                            f"Brewin call depth exceeded {max_call_depth} calls"
+                        )
+                    frames.append(
+                        (
+                            instructions,
+                            pc,
+                            obj,
+                            parameter_values,
+                            drop_result,
+                            checked_expression,
+                            memo_call,
+                        )
+                    )
+                    instructions = (
+                        method.code or self.get_code(method, receiver.class_def)
+                    ).instructions
+                    pc = 0
+                    obj = receiver
+                    fields = obj.fields
+                    parameter_values = evaluated_args
+                    if method.frame_padding:
+                        parameter_values = evaluated_args + method.frame_padding
+                    checked_expression = None
+                    memo_call = callee_memo_call
+                elif opcode == RETURN:
+                    result = pop()
+                    if result == no_return_value:
+                        result = None
+                    if result is None and checked_expression is not None:
+                        raise invalid_expression(checked_expression)
+                    if memo_call is not None:
+                        memo, key = memo_call
+                        memo.store(key, result)
+                    if not frames:
+                        return result
+                    (
+                        instructions,
+                        pc,
+                        obj,
+                        parameter_values,
+                        drop_result,
+                        checked_expression,
+                        memo_call,
+                    ) = frames.pop()
+                    fields = obj.fields
+                    push(None if drop_result else result)
+                elif opcode == TAIL_CALL:
+                    # reuses the current frame, so loop-style recursion stays flat
+                    (
+                        target_kind,
+                        target,
+                        scope,
+                        index,
+                        arg_count,
+                        call,
+                        expression,
+                    ) = argument
+                    if arg_count:
+                        evaluated_args = stack[-arg_count:]
+                        del stack[-arg_count:]
+                    else:
+                        evaluated_args = []
+
+                    receiver = obj
+                    method = call.static_method
+                    if method is None:
+                        if target_kind == CALL_NAME:
+                            receiver = self.get_receiver(
+                                target, scope, index, fields, parameter_values
+                            )
+
+                        if receiver.class_def is call.cached_class:
+                            method = call.cached_method
+                            call.hits += 1
+                        else:
+                            method = lookup_method(call, receiver, evaluated_args)
+                    if expression is not None:
+                        checked_expression = expression
+                    if method.memo is not None:
+                        # a memoized callee runs as a plain call, so its result is
+                        # stored; the RETURN after this instruction returns it
+                        callee_memo_call = None
+                        key = get_memo_key(evaluated_args)
+                        if key is not None:
+                            result = method.memo.get(key)
+                            if result is not MISSING:
+                                push(result)
+                                continue
+                            callee_memo_call = (method.memo, key)
+                        if len(frames) >= max_call_depth:
+                            raise RecursionError(
+                                f"Brewin call depth exceeded {max_call_depth} calls"
+                            )
+                        frames.append(
+                            (
+                                instructions,
+                                pc,
+                                obj,
+                                parameter_values,
+                                False,
+                                checked_expression,
+                                memo_call,
+                            )
+                        )
+                        checked_expression = None
+                        memo_call = callee_memo_call
+                    calls += 1
+                    ticks -= 1
+                    if ticks == 0:
+                        ticks = yield PAUSE
+                    instructions = (
+                        method.code or self.get_code(method, receiver.class_def)
+                    ).instructions
+                    pc = 0
+                    obj = receiver
+                    fields = obj.fields
+                    parameter_values = evaluated_args
+                    if method.frame_padding:
+                        parameter_values = evaluated_args + method.frame_padding
+                elif opcode == JUMP_IF_NOT_NONE:
+                    if stack[-1] is not None:
+                        pc = argument
+                    else:
+                        pop()
+                elif opcode == CHECK_VALUE:
+                    if stack[-1] is None:
+                        raise invalid_expression(argument)
+                elif opcode == NOT:
+                    stack[-1] = evaluate_not(interpreter_obj, stack[-1])
+                elif opcode == NEW:
+                    class_def = argument.class_def  # the node, see checker.py
+                    if class_def is None:
+                        classes = interpreter_obj.get_classes()
+                        if argument.class_name not in classes:
+                            interpreter_obj.error(*unknown_class_error(argument.class_name))
+                        class_def = classes[argument.class_name]
+                    push(class_def.instantiate_object())
+                elif opcode == PRINT:
+                    interpreter_obj.output(to_print_string(pop()))
+                elif opcode == TO_STRING:
+                    stack[-1] = str(stack[-1])
+                elif opcode == TO_PRINT_STRING:
+                    stack[-1] = to_print_string(stack[-1])
+                elif opcode == BUILD_STRING:
+                    pieces = stack[-argument:]
+                    del stack[-argument:]
+                    push("".join(pieces))
+                elif opcode == INPUT:
+                    input_value = yield READ_INPUT
+                    self.store_input(argument, input_value, fields, parameter_values)
+                elif opcode == INPUT_INT:
+                    input_value = interpreter_obj.to_int_input((yield READ_INPUT))
+                    self.store_input(argument, input_value, fields, parameter_values)
+                elif opcode == CHECK_IF_CONDITION:
+                    if not isinstance(stack[-1], bool):
+                        interpreter_obj.error(*condition_error("if"))
+                elif opcode == CHECK_WHILE_CONDITION:
+                    if not isinstance(stack[-1], bool):
+                        interpreter_obj.error(*condition_error("while"))
+                elif opcode == POP:
+                    pop()
+                elif opcode == STORE_CACHED:
+                    parameter_values[argument] = stack[-1]
+                elif opcode == CLEAR_CACHED:
+                    for slot in argument:
+                        parameter_values[slot] = UNSET
+                elif opcode == NAME_ERROR:
+                    interpreter_obj.error(*unknown_name_error())
+                elif opcode == SYNTAX_ERROR:
+                    interpreter_obj.error(*malformed_if_error())
+                elif opcode == INVALID_EXPRESSION:
+                    raise invalid_expression(argument)
+        finally:
+            # read by close, after the execution returns or fails
+            self.ticks = ticks
+            self.calls = calls
+
+    def get_receiver(self, target, scope, index, fields, parameter_values):
+        if scope == SCOPE_FIELD:
+            receiver = fields[index]
+        elif scope == SCOPE_PARAMETER:
+            receiver = parameter_values[index]
+        else:
+            return target
+        if receiver is None:
+            self.interpreter_obj.error(*null_reference_error(target))
+        return receiver
+
+    def store_input(self, variable, value, fields, parameter_values):
+        scope, index = variable
+        if scope == SCOPE_PARAMETER:
+            parameter_values[index] = value
+        elif scope == SCOPE_FIELD:
+            fields[index] = value
+        else:
+            self.interpreter_obj.error(*unknown_name_error())